@@ -0,0 +1,281 @@
+"""
+Risk of ruin, N0 and bankroll trajectories for a bet ramp.
+
+Both halves start from the flat-bet bucket statistics of ramp_optimizer.py
+(the engine playing the table's rules and strategy, simulated once and
+cached):
+
+- analytic: EV and variance per round for the ramp give N0 (rounds needed for
+  the expected win to equal one standard deviation, variance / EV^2), the
+  classic infinite-session risk of ruin exp(-2 * EV * bankroll / variance)
+  and the finite-session risk of ruin of a Brownian motion with the same
+  drift and variance;
+- simulated: sessions are replayed by drawing each round's (true count
+  bucket, result per unit bet) from the simulated joint distribution and
+  betting the ramp on it, including the balance cap of the top bet.
+  Trajectories run as numpy lanes in fixed-size batches spread across a
+  process pool. Every batch only adds to one fixed histogram of balances per
+  checkpoint, and the percentile trajectories are read from the merged
+  histograms, so memory stays flat however many trajectories are asked for.
+
+Rounds are drawn independently: the persistence of the count within a shoe
+is not modelled, so streaks of favorable rounds are slightly understated.
+
+Usage:
+    python bankroll.py --decks 6 --bankroll 1000 --rounds 5000 --trajectories 200000
+    python bankroll.py --decks 2 --rules s17-ls --ramp ramp.json
+    python bankroll.py --decks 6 --system hi_lo --ramp hi_lo_ramp.json
+"""
+import argparse
+import math
+import random
+import time
+from bisect import bisect_left
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from bet_ramp import DEFAULT_RAMP, TOP_BUCKET, load_ramp
+from count_systems import DEFAULT_SYSTEM, SYSTEM_NAMES
+from engine import STARTING_BALANCE, TC_RESOLUTIONS
+from ramp_optimizer import collect_bucket_stats, load_cached_stats, ramp_metrics, stats_config
+from rules import RULESET_NAMES, get_ruleset
+from strategy_table import find_indices
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Histogram bins per checkpoint
+HISTOGRAM_BINS = 4000
+# Standard deviations of the session result covered by the histogram range
+HISTOGRAM_SIGMAS = 8
+
+
+def _normal_cdf(x):
+    return 0.5 * math.erfc(-x / math.sqrt(2))
+
+
+def analytic_summary(stats, ramp, bankroll, rounds):
+    """EV, SD, N0 and risk of ruin for the ramp from the bucket moments"""
+    metrics = ramp_metrics(ramp.bucket_units(bankroll), stats.moments(), bankroll)
+    ev, sd = metrics['ev_per_round'], metrics['std_dev']
+    variance = sd * sd
+    if ev > 0:
+        n0 = variance / (ev * ev)
+    else:
+        n0 = math.inf
+    # First passage of a drifting Brownian motion below -bankroll within the session
+    spread = sd * math.sqrt(rounds)
+    session_ror = (_normal_cdf((-bankroll - ev * rounds) / spread)
+                   + math.exp(min(700.0, -2 * ev * bankroll / variance))
+                   * _normal_cdf((-bankroll + ev * rounds) / spread))
+    return {
+        'ev_per_round': ev,
+        'std_dev': sd,
+        'average_bet': metrics['average_bet'],
+        'n0': n0,
+        'risk_of_ruin': metrics['risk_of_ruin'],
+        'session_risk_of_ruin': min(1.0, session_ror),
+    }
+
+
+class RoundModel:
+    """Joint distribution of (bucket, result per unit bet) for drawing rounds, and the ramp's bets"""
+
+    def __init__(self, stats, ramp):
+        buckets, results, counts = [], [], []
+        for bucket, outcome in enumerate(stats.outcomes):
+            for result, count in sorted(outcome.items()):
+                buckets.append(bucket)
+                results.append(result)
+                counts.append(count)
+        if not counts:
+            raise ValueError("Bucket statistics have no recorded outcomes; simulate them again")
+        self.bucket = np.array(buckets, dtype=np.int64)
+        self.result = np.array(results, dtype=np.float64)
+        self.cdf = np.cumsum(counts, dtype=np.float64) / sum(counts)
+        self.cdf[-1] = 1.0
+        # Bet of every bucket, and which buckets fall past the last step (the balance-capped top bet)
+        steps = [bisect_left(ramp.thresholds, count) for count in list(range(TOP_BUCKET)) + [math.inf]]
+        self.units = np.array([ramp.steps[i].units if i < len(ramp.steps) else ramp.top_units for i in steps],
+                              dtype=np.float64)
+        self.capped = np.array([i >= len(ramp.steps) for i in steps])
+        self.top_balance_divisor = ramp.top_balance_divisor
+        self.min_bet = float(self.units.min())
+
+    def draw(self, rng, balance):
+        """Money won or lost by every lane in one round"""
+        index = np.searchsorted(self.cdf, rng.random(balance.size), side='right')
+        bucket = self.bucket[index]
+        bet = self.units[bucket]
+        if self.top_balance_divisor:
+            top = np.minimum(bet, np.floor(balance / self.top_balance_divisor))
+            bet = np.where(self.capped[bucket], top, bet)
+        return bet * self.result[index]
+
+
+class TrajectoryStats:
+    """Balance histograms per checkpoint plus ruin counts; mergeable across workers"""
+
+    def __init__(self, checkpoints, low, high, bins=HISTOGRAM_BINS):
+        self.checkpoints = list(checkpoints)
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.histograms = np.zeros((len(self.checkpoints), bins), dtype=np.int64)
+        self.ruined = np.zeros(len(self.checkpoints), dtype=np.int64)
+        self.trajectories = 0
+
+    def add(self, point, balance, ruined):
+        width = (self.high - self.low) / self.bins
+        index = np.clip(((balance - self.low) / width).astype(np.int64), 0, self.bins - 1)
+        self.histograms[point] += np.bincount(index, minlength=self.bins)
+        self.ruined[point] += int(ruined.sum())
+
+    def merge(self, other):
+        """Fold another worker's histograms into this one"""
+        self.histograms += other.histograms
+        self.ruined += other.ruined
+        self.trajectories += other.trajectories
+
+    def percentile(self, point, q):
+        """Balance at percentile q (0-100) at a checkpoint, interpolated within its bin"""
+        counts = self.histograms[point]
+        total = counts.sum()
+        if not total:
+            return None
+        target = total * q / 100
+        cumulative = np.cumsum(counts)
+        i = int(np.searchsorted(cumulative, target, side='left'))
+        i = min(i, self.bins - 1)
+        before = cumulative[i - 1] if i else 0
+        fraction = (target - before) / counts[i] if counts[i] else 0.0
+        width = (self.high - self.low) / self.bins
+        return self.low + (i + fraction) * width
+
+    def ruin_rate(self, point):
+        return self.ruined[point] / self.trajectories if self.trajectories else 0.0
+
+
+def simulate_batch(args):
+    """Worker entry point: (model, bankroll, rounds, checkpoints, low, high, lanes, seed) -> TrajectoryStats"""
+    model, bankroll, rounds, checkpoints, low, high, lanes, seed = args
+    rng = np.random.default_rng(seed)
+    stats = TrajectoryStats(checkpoints, low, high)
+    balance = np.full(lanes, float(bankroll))
+    ruined = np.zeros(lanes, dtype=bool)
+    point = 0
+    for round_number in range(1, rounds + 1):
+        won = model.draw(rng, balance)
+        balance += np.where(ruined, 0.0, won)
+        # Ruined once the smallest bet can no longer be placed; the balance then stays frozen
+        ruined |= balance < model.min_bet
+        while point < len(checkpoints) and checkpoints[point] == round_number:
+            stats.add(point, balance, ruined)
+            point += 1
+    stats.trajectories = lanes
+    return stats
+
+
+def session_checkpoints(rounds, points=20):
+    """Round numbers at which the balance distribution is recorded"""
+    step = max(1, rounds // points)
+    checkpoints = list(range(step, rounds + 1, step))
+    if checkpoints[-1] != rounds:
+        checkpoints.append(rounds)
+    return checkpoints
+
+
+def simulate_trajectories(stats, ramp, bankroll, rounds, trajectories, workers=None, seed=None,
+                          batch_lanes=20000, points=20):
+    """Replay `trajectories` sessions of `rounds` rounds; returns merged TrajectoryStats"""
+    workers = workers or cpu_count()
+    base_seed = seed if seed is not None else random.randrange(2 ** 32)
+    model = RoundModel(stats, ramp)
+    summary = analytic_summary(stats, ramp, bankroll, rounds)
+    checkpoints = session_checkpoints(rounds, points)
+    spread = HISTOGRAM_SIGMAS * summary['std_dev'] * math.sqrt(rounds)
+    low = min(0.0, bankroll - spread)
+    high = bankroll + max(0.0, summary['ev_per_round']) * rounds + spread
+
+    tasks = []
+    remaining = trajectories
+    while remaining > 0:
+        lanes = min(batch_lanes, remaining)
+        tasks.append((model, bankroll, rounds, checkpoints, low, high, lanes, base_seed + len(tasks)))
+        remaining -= lanes
+
+    totals = TrajectoryStats(checkpoints, low, high)
+    if workers == 1:
+        for task in tasks:
+            totals.merge(simulate_batch(task))
+    else:
+        with Pool(workers) as pool:
+            for result in pool.imap_unordered(simulate_batch, tasks):
+                totals.merge(result)
+    return totals
+
+
+def print_report(summary, trajectories, bankroll, rounds, elapsed):
+    """Print the analytic figures and the simulated percentile trajectories"""
+    print("=" * 70)
+    print(f"BANKROLL ANALYSIS - bankroll {bankroll}, {rounds} rounds per session")
+    print("=" * 70)
+    print(f"EV per round:          {summary['ev_per_round']:+.4f} units")
+    print(f"SD per round:          {summary['std_dev']:.3f} units")
+    print(f"Average bet:           {summary['average_bet']:.3f} units")
+    print(f"N0:                    {summary['n0']:,.0f} rounds")
+    print(f"Risk of ruin (ever):   {summary['risk_of_ruin'] * 100:.2f}%")
+    print(f"Risk of ruin (session, analytic):  {summary['session_risk_of_ruin'] * 100:.2f}%")
+    print(f"Risk of ruin (session, simulated): {trajectories.ruin_rate(-1) * 100:.2f}% "
+          f"of {trajectories.trajectories:,} trajectories in {elapsed:.1f}s")
+    print("-" * 70)
+    print(f"{'Round':>7} " + " ".join(f"{'P' + str(q):>9}" for q in PERCENTILES) + f" {'Ruined':>8}")
+    for point, round_number in enumerate(trajectories.checkpoints):
+        values = " ".join(f"{trajectories.percentile(point, q):>9.1f}" for q in PERCENTILES)
+        print(f"{round_number:>7} {values} {trajectories.ruin_rate(point) * 100:>7.2f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Risk of ruin and bankroll trajectories for a bet ramp")
+    parser.add_argument('--decks', type=int, default=6, help="number of decks in the shoe")
+    parser.add_argument('--players', type=int, default=1, help="number of seats at the table")
+    parser.add_argument('--shoes', type=int, default=10000, help="shoes to simulate when no cached stats exist")
+    parser.add_argument('--penetration', type=float, default=0.75, help="fraction dealt before reshuffle")
+    parser.add_argument('--tc-resolution', choices=TC_RESOLUTIONS, default='exact',
+                        help="decks-remaining estimate used for the true count")
+    parser.add_argument('--rules', choices=RULESET_NAMES, default='h17', help="table rules, rules.py")
+    parser.add_argument('--system', choices=SYSTEM_NAMES, default=DEFAULT_SYSTEM,
+                        help="count system whose true counts the ramp is bet on")
+    parser.add_argument('--stats', default=None,
+                        help="bucket statistics cache (default: ramp_stats_<decks>d.json); simulated if missing "
+                             "or collected with other settings")
+    parser.add_argument('--ramp', default=None, help="bet ramp JSON (default: the engine's ramp)")
+    parser.add_argument('--bankroll', type=int, default=STARTING_BALANCE, help="starting bankroll in units")
+    parser.add_argument('--rounds', type=int, default=5000, help="rounds per session")
+    parser.add_argument('--trajectories', type=int, default=100000, help="sessions to simulate")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=None, help="base random seed")
+    args = parser.parse_args()
+
+    rules = get_ruleset(args.rules, args.decks)
+    path = args.stats or f"ramp_stats_{args.decks}d.json"
+    stats = load_cached_stats(path, stats_config(args.decks, args.players, args.penetration, args.tc_resolution,
+                                                 rules, args.system))
+    if stats is None:
+        stats = collect_bucket_stats(args.decks, args.players, args.shoes, args.penetration, args.workers,
+                                     args.seed, tc_resolution=args.tc_resolution,
+                                     indices=find_indices(args.decks, args.system, rules), rules=rules,
+                                     count_system=args.system)
+        stats.save(path)
+    ramp = load_ramp(args.ramp) if args.ramp else DEFAULT_RAMP
+
+    start = time.perf_counter()
+    trajectories = simulate_trajectories(stats, ramp, args.bankroll, args.rounds, args.trajectories,
+                                         args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+    summary = analytic_summary(stats, ramp, args.bankroll, args.rounds)
+    print_report(summary, trajectories, args.bankroll, args.rounds, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,509 @@
+"""
+NumPy-vectorized batch shoe simulator.
+
+Thousands of independent shoes ("lanes") are advanced in lock-step. Each
+lane's shoe composition is a row of an (n_lanes x 13) count array, the
+running counts of every count system an (n_lanes x systems) array updated
+with one row of the tag matrix per card, and every hand is kept as
+raw-total / ace-count arrays, so dealing a card or evaluating a hand is one
+array operation for all lanes instead of per-card dict updates and string
+parsing.
+
+One system (count_system) drives the bets and deviations. With compare=True
+every system also bets its own ramp on the same shoes and hands: the played
+hands are settled once more per system with that system's bets, which costs
+a few array operations per round, and the per-system results are reported
+side by side.
+
+The table plays a Ruleset (rules.py) exactly like BlackjackEngine: the
+dealer's soft 17, doubling after splits, resplits up to max_hands (each
+seat has max_hands hand slots, and a resplit moves the later hands one slot
+along so slots stay in playing order), late surrender and the blackjack
+payout. Other seats split once, like simulator.choose_other_action. True
+counts are rounded like the engine's, decisions are read from the same
+compiled strategy table, and the results come back as a
+simulator.SimulationStats so both simulators share the same report.
+
+Usage:
+    python batch_simulator.py --decks 6 --players 1 --shoes 20000 --lanes 4000
+    python batch_simulator.py --decks 6 --shoes 20000 --system hi_lo --compare
+    python batch_simulator.py --decks 2 --shoes 20000 --rules s17-ls
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from bet_ramp import DEFAULT_RAMP, load_ramp
+from cards import ACE, NUM_RANKS, RANK_VALUES as CARD_VALUES
+from count_systems import DEFAULT_SYSTEM, SYSTEM_NAMES, get_count_matrix
+from engine import STARTING_BALANCE, TC_RESOLUTIONS, true_count_divisors
+from rules import DEFAULT_RULES, RULESET_NAMES, get_ruleset
+from simulator import MIN_TC_BUCKET, MAX_TC_BUCKET, SimulationStats, print_report
+from strategy_table import (ACTION_CODES, HARD, SOFT, PAIR, MIN_BUCKET, MAX_BUCKET, NUM_BUCKETS, NUM_DEALER,
+                            find_indices, get_strategy_table, load_indices, table_index)
+
+RANK_VALUES = np.array(CARD_VALUES, dtype=np.int64)
+# Rank x system tag matrix, with each system's imbalance per deck and ace side count weight
+COUNT_MATRIX = get_count_matrix()
+TAG_MATRIX = np.array(COUNT_MATRIX.tags, dtype=np.int64)
+IMBALANCE = np.array(COUNT_MATRIX.imbalance, dtype=np.float64)
+ACE_WEIGHTS = np.array([system.ace_weight for system in COUNT_MATRIX.systems], dtype=np.float64)
+
+# Action codes of the compiled strategy table
+HIT, STAND, DOUBLE, SPLIT, SURRENDER = (ACTION_CODES[action]
+                                        for action in ("HIT", "STAND", "DOUBLE", "SPLIT", "SURRENDER"))
+
+# Hand result codes
+ACTIVE, STOOD, BUSTED, DOUBLED, BLACKJACK, SURRENDERED = 0, 1, 2, 3, 4, 5
+
+
+class StrategyLookup:
+    """Vectorized reads of the shared compiled strategy table for a set of indices and a ruleset"""
+
+    def __init__(self, indices=None, rules=None):
+        table = get_strategy_table(indices, rules)
+        self.codes = np.array(table.codes, dtype=np.int8)
+        self.surrender = None if table.surrender is None else np.array(table.surrender, dtype=bool)
+
+    def lookup(self, soft, value, dealer, can_double, split_rank, true_count, can_surrender=None):
+        """Recommendation codes for arrays of hand states (split_rank is -1 when not splittable)"""
+        pair = split_rank >= 0
+        state = np.where(pair, PAIR, np.where(soft, SOFT, HARD))
+        total = np.where(pair, split_rank, value)
+        dealer_value = RANK_VALUES[dealer]
+        bucket = np.clip(np.floor(true_count), MIN_BUCKET, MAX_BUCKET).astype(np.int64) - MIN_BUCKET
+        index = table_index(state, total, dealer_value, can_double.astype(np.int64),
+                            pair.astype(np.int64), bucket)
+        codes = self.codes[index]
+        if can_surrender is not None and self.surrender is not None:
+            # Late surrender of hard two-card hands, as in StrategyTable.recommend
+            surrender = self.surrender[(total * NUM_DEALER + dealer_value - 2) * NUM_BUCKETS + bucket]
+            codes = np.where(can_surrender & (state == HARD) & surrender, SURRENDER, codes)
+        return codes
+
+
+class BatchShoes:
+    """Lock-step state of n_lanes independent shoes"""
+
+    def __init__(self, n_lanes, total_decks, num_players, penetration, rng, tc_resolution='exact', ramp=None,
+                 count_system=DEFAULT_SYSTEM, rules=None):
+        if rules is None:
+            rules = DEFAULT_RULES._replace(decks=total_decks)
+        elif rules.decks != total_decks:
+            raise ValueError(f"Ruleset is for {rules.decks} decks, not {total_decks}")
+        self.rules = rules
+        self.hands = rules.max_hands     # hand slots per seat
+        self.n = n_lanes
+        self.total_decks = total_decks
+        self.num_players = num_players
+        self.total_cards = 52 * total_decks
+        self.cut_card = int(self.total_cards * penetration)
+        self.rng = rng
+        self.lanes = np.arange(n_lanes)
+        self.tc_divisors = np.array(true_count_divisors(total_decks, tc_resolution), dtype=np.float64)
+        self.ramp = ramp or DEFAULT_RAMP
+        self.system = COUNT_MATRIX.index[COUNT_MATRIX.system(count_system).name]
+
+        self.composition = np.zeros((n_lanes, NUM_RANKS), dtype=np.int64)
+        self.running_counts = np.zeros((n_lanes, len(COUNT_MATRIX.systems)), dtype=np.int64)
+        self.running_count = self.running_counts[:, self.system]     # view of the selected system
+        self.remaining = np.zeros(n_lanes, dtype=np.int64)
+        self.balance = np.zeros(n_lanes, dtype=np.int64)
+        # Balance of every system betting its own ramp on the same hands (compare mode)
+        self.system_balance = np.zeros((n_lanes, len(COUNT_MATRIX.systems)), dtype=np.int64)
+        self.void = np.zeros(n_lanes, dtype=bool)
+        self.reshuffle(np.ones(n_lanes, dtype=bool))
+
+        # max_hands slots per seat, in playing order (all but the first are only used after splits)
+        slots = self.hands * num_players
+        self.raw = np.zeros((n_lanes, slots), dtype=np.int64)       # aces counted as 11
+        self.aces = np.zeros((n_lanes, slots), dtype=np.int64)
+        self.ncards = np.zeros((n_lanes, slots), dtype=np.int64)
+        self.first_rank = np.zeros((n_lanes, slots), dtype=np.int64)
+        self.pair = np.zeros((n_lanes, slots), dtype=bool)
+        self.split = np.zeros((n_lanes, slots), dtype=bool)
+        self.result = np.zeros((n_lanes, slots), dtype=np.int64)
+        self.used = np.zeros((n_lanes, slots), dtype=bool)
+        self.dealer_raw = np.zeros(n_lanes, dtype=np.int64)
+        self.dealer_aces = np.zeros(n_lanes, dtype=np.int64)
+        self.dealer_ncards = np.zeros(n_lanes, dtype=np.int64)
+
+    def reshuffle(self, mask):
+        """Start a fresh shoe (and fresh session balance) in the masked lanes"""
+        self.composition[mask] = 4 * self.total_decks
+        self.running_counts[mask] = 0
+        self.remaining[mask] = self.total_cards
+        self.balance[mask] = STARTING_BALANCE
+        self.system_balance[mask] = STARTING_BALANCE
+
+    def true_count(self):
+        """Vector of BlackjackEngine.get_true_count() for every lane"""
+        i = self.system
+        count = self.running_count
+        if IMBALANCE[i]:
+            count = count - IMBALANCE[i] * (self.total_cards - self.remaining) / 52
+        if ACE_WEIGHTS[i]:
+            count = count + ACE_WEIGHTS[i] * (self.composition[:, ACE] - self.remaining / 13)
+        decks_remaining = self.tc_divisors[self.remaining]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tc = np.where(decks_remaining > 0, count / decks_remaining, 0.0)
+        return round_count(tc)
+
+    def true_counts(self):
+        """(lanes x systems) true counts of every count system"""
+        dealt = (self.total_cards - self.remaining) / 52
+        surplus_aces = self.composition[:, ACE] - self.remaining / 13
+        count = self.running_counts - IMBALANCE * dealt[:, None] + ACE_WEIGHTS * surplus_aces[:, None]
+        decks_remaining = self.tc_divisors[self.remaining][:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tc = np.where(decks_remaining > 0, count / decks_remaining, 0.0)
+        return round_count(tc)
+
+    def bet_amount(self, true_count, balance=None, ramp=None):
+        """Vector of BlackjackEngine.get_bet_amount() (default: this batch's ramp and balance)"""
+        ramp = ramp or self.ramp
+        balance = self.balance if balance is None else balance
+        # Padded so the index of the top bet is valid (np.where picks the top bet there)
+        units = np.array([step.units for step in ramp.steps] + [0], dtype=np.int64)
+        step = np.searchsorted(np.array(ramp.thresholds, dtype=np.float64), true_count, side='left')
+        top = ramp.top_units
+        if ramp.top_balance_divisor:
+            top = np.minimum(top, balance // ramp.top_balance_divisor)
+        return np.where(step < len(ramp.steps), units[step], top)
+
+    def draw(self, mask):
+        """Deal one card in every masked lane; returns rank indexes (-1 where unmasked)"""
+        ranks = np.full(self.n, -1, dtype=np.int64)
+        lanes = self.lanes[mask]
+        if lanes.size == 0:
+            return ranks
+
+        # A lane that runs dry mid-round voids the round, like the per-hand simulator
+        empty = lanes[self.remaining[lanes] == 0]
+        if empty.size:
+            self.void[empty] = True
+            refill = np.zeros(self.n, dtype=bool)
+            refill[empty] = True
+            self.reshuffle(refill)
+
+        target = self.rng.random(lanes.size) * self.remaining[lanes]
+        cumulative = np.cumsum(self.composition[lanes], axis=1)
+        drawn = (cumulative > target[:, None]).argmax(axis=1)
+
+        self.composition[lanes, drawn] -= 1
+        self.running_counts[lanes] += TAG_MATRIX[drawn]
+        self.remaining[lanes] -= 1
+        ranks[lanes] = drawn
+        return ranks
+
+    def add_to_slot(self, slot, ranks, mask):
+        """Append drawn cards to a hand slot"""
+        rank = ranks[mask]
+        self.raw[mask, slot] += RANK_VALUES[rank]
+        self.aces[mask, slot] += rank == ACE
+        self.ncards[mask, slot] += 1
+
+    def open_slot(self, slot, end, mask):
+        """Move the hands after slot (up to the seat's end slot) one slot along in the masked lanes"""
+        if slot + 2 < end:
+            for hands in (self.raw, self.aces, self.ncards, self.first_rank, self.pair, self.split,
+                          self.result, self.used):
+                hands[mask, slot + 2:end] = hands[mask, slot + 1:end - 1]
+
+    def add_to_dealer(self, ranks, mask):
+        rank = ranks[mask]
+        self.dealer_raw[mask] += RANK_VALUES[rank]
+        self.dealer_aces[mask] += rank == ACE
+        self.dealer_ncards[mask] += 1
+
+
+def round_count(values, digits=2):
+    """np.round(values, digits), with near-ties rounded by round() like the engine's true count
+
+    np.round scales by 10 ** digits first, which can tip a value such as
+    -0.975 the other way from Python's correctly rounded round().
+    """
+    scaled = values * 10 ** digits
+    rounded = np.round(scaled) / 10 ** digits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(value, digits) for value in values[near_tie].tolist()]
+    return rounded
+
+
+def hand_value(raw, aces):
+    """Vectorized calculate_hand_value from raw totals and ace counts"""
+    reductions = np.clip(-(-(raw - 21) // 10), 0, aces)
+    return raw - 10 * reductions
+
+
+def is_soft(raw, aces):
+    """Vectorized is_soft_hand: every ace can count as 11 without busting"""
+    return (raw <= 21) & (aces > 0)
+
+
+def play_round(shoes, strategy, alive):
+    """Play one round in every alive lane; returns (true_count, bet, payout) arrays"""
+    players = shoes.num_players
+    hands = shoes.hands
+    shoes.void[:] = False
+    shoes.raw[:] = 0
+    shoes.aces[:] = 0
+    shoes.ncards[:] = 0
+    shoes.split[:] = False
+    shoes.result[:] = ACTIVE
+    shoes.used[:] = False
+    shoes.dealer_raw[:] = 0
+    shoes.dealer_aces[:] = 0
+    shoes.dealer_ncards[:] = 0
+
+    true_count = shoes.true_count()
+    bet = shoes.bet_amount(true_count)
+
+    # First card to each player, second card to each player, dealer upcard
+    for seat in range(players):
+        ranks = shoes.draw(alive)
+        shoes.add_to_slot(hands * seat, ranks, alive)
+        shoes.first_rank[alive, hands * seat] = ranks[alive]
+        shoes.used[alive, hands * seat] = True
+    for seat in range(players):
+        ranks = shoes.draw(alive)
+        shoes.add_to_slot(hands * seat, ranks, alive)
+        shoes.pair[alive, hands * seat] = ranks[alive] == shoes.first_rank[alive, hands * seat]
+    upcard = shoes.draw(alive)
+    shoes.add_to_dealer(upcard, alive)
+
+    for seat in range(players):
+        slot = hands * seat
+        value = hand_value(shoes.raw[:, slot], shoes.aces[:, slot])
+        natural = alive & (value == 21)
+        shoes.result[natural, slot] = BLACKJACK
+        for sub in range(hands):
+            play_slot(shoes, strategy, upcard, seat, slot + sub, alive)
+
+    # Dealer hole card, then hit while below 17 (or on soft 17 under H17)
+    hit_soft_17 = shoes.rules.hit_soft_17
+    shoes.add_to_dealer(shoes.draw(alive), alive)
+    while True:
+        value = hand_value(shoes.dealer_raw, shoes.dealer_aces)
+        soft_17 = (value == 17) & is_soft(shoes.dealer_raw, shoes.dealer_aces)
+        hits = alive & ((value < 17) | (soft_17 & hit_soft_17))
+        if not hits.any():
+            break
+        shoes.add_to_dealer(shoes.draw(hits), hits)
+
+    payout = settle(shoes, bet, alive)
+    shoes.balance += np.where(alive, payout, 0)
+    return true_count, bet, payout
+
+
+def settle(shoes, bet, alive):
+    """Payout of the main player's hands (the first seat's slots) for a vector of bets"""
+    n = shoes.n
+    dealer_value = hand_value(shoes.dealer_raw, shoes.dealer_aces)
+    dealer_natural = (shoes.dealer_ncards == 2) & (dealer_value == 21)
+    payout = np.zeros(n, dtype=np.int64)
+    for slot in range(shoes.hands):
+        used = alive & shoes.used[:, slot]
+        result = shoes.result[:, slot]
+        value = hand_value(shoes.raw[:, slot], shoes.aces[:, slot])
+        stake = bet * np.where(result == DOUBLED, 2, 1)
+        win = (value <= 21) & ((dealer_value > 21) | (value > dealer_value))
+        lose = (value > 21) | ((dealer_value <= 21) & (dealer_value > value))
+        hand = np.where(win, stake, np.where(lose, -stake, 0))
+        natural = np.where(dealer_natural, 0, (bet * shoes.rules.blackjack_payout).astype(np.int64))
+        hand = np.where(result == BLACKJACK, natural, hand)
+        # Half the bet (an odd unit goes to the house), the whole bet against a dealer blackjack
+        surrender = np.where(dealer_natural, -bet, bet // 2 - bet)
+        hand = np.where(result == SURRENDERED, surrender, hand)
+        payout += np.where(used, hand, 0)
+    return payout
+
+
+def start_hand(shoes, slot, seat, mask):
+    """BlackjackEngine._start_hand in the masked lanes: (playing, can_double, can_split, can_surrender)
+
+    The main player's split hands can be dealt a natural, which settles them.
+    Other seats double any two cards and split only the hand they were dealt.
+    """
+    rules = shoes.rules
+    two = mask & (shoes.ncards[:, slot] == 2)
+    split = shoes.split[:, slot]
+    if seat:
+        return mask, two, two & shoes.pair[:, slot] & ~split, np.zeros(shoes.n, dtype=bool)
+    natural = two & (hand_value(shoes.raw[:, slot], shoes.aces[:, slot]) == 21)
+    shoes.result[natural, slot] = BLACKJACK
+    two &= ~natural
+    hands = shoes.used[:, :shoes.hands].sum(axis=1)
+    can_double = two & (rules.double_after_split | ~split)
+    can_split = (two & shoes.pair[:, slot] & (hands < rules.max_hands)
+                 & (~split | (shoes.first_rank[:, slot] != ACE) | rules.resplit_aces))
+    can_surrender = two & ~split & rules.late_surrender
+    return mask & ~natural, can_double, can_split, can_surrender
+
+
+def play_slot(shoes, strategy, upcard, seat, slot, alive):
+    """Play one hand slot of a seat to completion in every lane where it is in use"""
+    end = (seat + 1) * shoes.hands
+    playing = alive & shoes.used[:, slot] & (shoes.result[:, slot] == ACTIVE)
+    playing, can_double, can_split, can_surrender = start_hand(shoes, slot, seat, playing)
+
+    while playing.any():
+        raw, aces = shoes.raw[:, slot], shoes.aces[:, slot]
+        value = hand_value(raw, aces)
+        bust = playing & (value > 21)
+        shoes.result[bust, slot] = BUSTED
+        playing &= ~bust
+        if not playing.any():
+            break
+
+        lanes = shoes.lanes[playing]
+        split_rank = np.where(can_split[lanes], shoes.first_rank[lanes, slot], -1)
+        actions = np.full(shoes.n, -1, dtype=np.int64)
+        actions[lanes] = strategy.lookup(is_soft(raw[lanes], aces[lanes]), value[lanes], upcard[lanes],
+                                         can_double[lanes], split_rank, shoes.true_count()[lanes],
+                                         can_surrender[lanes])
+
+        stand = actions == STAND
+        shoes.result[stand, slot] = STOOD
+        playing &= ~stand
+
+        surrender = actions == SURRENDER
+        shoes.result[surrender, slot] = SURRENDERED
+        playing &= ~surrender
+
+        draws = (actions == HIT) | (actions == DOUBLE)
+        if draws.any():
+            shoes.add_to_slot(slot, shoes.draw(draws), draws)
+            doubled = actions == DOUBLE
+            shoes.result[doubled, slot] = DOUBLED
+            playing &= ~doubled
+            can_double &= ~draws
+            can_split &= ~draws
+            can_surrender &= ~draws
+
+        splits = actions == SPLIT
+        if splits.any():
+            # The second card starts the next hand; later hands move one slot along
+            shoes.open_slot(slot, end, splits)
+            rank = shoes.first_rank[splits, slot]
+            for target in (slot, slot + 1):
+                shoes.raw[splits, target] = RANK_VALUES[rank]
+                shoes.aces[splits, target] = rank == ACE
+                shoes.ncards[splits, target] = 1
+                shoes.first_rank[splits, target] = rank
+                shoes.split[splits, target] = True
+                shoes.result[splits, target] = ACTIVE
+            shoes.used[splits, slot + 1] = True
+            for target in (slot, slot + 1):
+                ranks = shoes.draw(splits)
+                shoes.add_to_slot(target, ranks, splits)
+                shoes.pair[splits, target] = ranks[splits] == rank
+            started, doubles, resplits, surrenders = start_hand(shoes, slot, seat, splits)
+            playing = (playing & ~splits) | started
+            can_double = np.where(splits, doubles, can_double)
+            can_split = np.where(splits, resplits, can_split)
+            can_surrender = np.where(splits, surrenders, can_surrender)
+
+
+def run_batch_simulation(total_decks=6, num_players=1, num_shoes=10000, penetration=0.75,
+                         lanes=4000, seed=None, tc_resolution='exact', ramp=None,
+                         count_system=DEFAULT_SYSTEM, compare=False, ramps=None, indices=None, rules=None):
+    """Simulate num_shoes shoes in lock-step batches and return SimulationStats
+
+    With compare, every count system also bets on the same hands, with its
+    ramp from `ramps` (default: `ramp`), and its totals go to stats.by_system.
+    """
+    rng = np.random.default_rng(seed)
+    lanes = max(1, min(lanes, num_shoes))
+    shoes_per_lane = math.ceil(num_shoes / lanes)
+    shoes = BatchShoes(lanes, total_decks, num_players, penetration, rng, tc_resolution, ramp, count_system,
+                       rules)
+    strategy = StrategyLookup(indices, rules)
+    ramps = ramps or {}
+
+    completed = np.zeros(lanes, dtype=np.int64)
+    num_buckets = MAX_TC_BUCKET - MIN_TC_BUCKET + 1
+    bucket_rounds = np.zeros(num_buckets, dtype=np.int64)
+    bucket_wins = np.zeros(num_buckets, dtype=np.int64)
+    bucket_losses = np.zeros(num_buckets, dtype=np.int64)
+    bucket_payout = np.zeros(num_buckets, dtype=np.int64)
+    stats = SimulationStats()
+    stats.count_system = count_system
+
+    start = time.perf_counter()
+    while True:
+        # Reshuffle lanes whose shoe has reached the cut card
+        finished = (shoes.total_cards - shoes.remaining) >= shoes.cut_card
+        completed += finished
+        shoes.reshuffle(finished)
+        alive = completed < shoes_per_lane
+        if not alive.any():
+            break
+
+        if compare:
+            system_counts = shoes.true_counts()
+        true_count, bet, payout = play_round(shoes, strategy, alive)
+        counted = alive & ~shoes.void
+        if compare:
+            for i, name in enumerate(COUNT_MATRIX.names):
+                stake = shoes.bet_amount(system_counts[:, i], shoes.system_balance[:, i], ramps.get(name, ramp))
+                won = settle(shoes, stake, alive)
+                shoes.system_balance[:, i] += np.where(alive, won, 0)
+                stake, won = stake[counted], won[counted]
+                stats.record_system(name, int(counted.sum()), int(stake.sum()), int(won.sum()),
+                                    int((won * won).sum()))
+        if shoes.void.any():
+            shoes.reshuffle(shoes.void)
+
+        tc, stake, won = true_count[counted], bet[counted], payout[counted]
+        stats.rounds += int(counted.sum())
+        stats.total_bet += int(stake.sum())
+        stats.total_payout += int(won.sum())
+        stats.total_payout_sq += int((won * won).sum())
+        bucket = np.clip(np.floor(tc), MIN_TC_BUCKET, MAX_TC_BUCKET).astype(np.int64) - MIN_TC_BUCKET
+        bucket_rounds += np.bincount(bucket, minlength=num_buckets)
+        bucket_wins += np.bincount(bucket, weights=won > 0, minlength=num_buckets).astype(np.int64)
+        bucket_losses += np.bincount(bucket, weights=won < 0, minlength=num_buckets).astype(np.int64)
+        bucket_payout += np.bincount(bucket, weights=won, minlength=num_buckets).astype(np.int64)
+
+    stats.elapsed = time.perf_counter() - start
+    stats.shoes = int(completed.sum())
+    for i in np.nonzero(bucket_rounds)[0]:
+        rounds, wins, losses = int(bucket_rounds[i]), int(bucket_wins[i]), int(bucket_losses[i])
+        stats.by_true_count[int(i) + MIN_TC_BUCKET] = [rounds, wins, losses, rounds - wins - losses,
+                                                       int(bucket_payout[i])]
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized batch simulation of a card counting strategy")
+    parser.add_argument('--decks', type=int, default=6, help="number of decks in the shoe")
+    parser.add_argument('--players', type=int, default=1, help="number of seats at the table")
+    parser.add_argument('--shoes', type=int, default=10000, help="number of shoes to simulate")
+    parser.add_argument('--penetration', type=float, default=0.75, help="fraction dealt before reshuffle")
+    parser.add_argument('--lanes', type=int, default=4000, help="shoes advanced in lock-step")
+    parser.add_argument('--seed', type=int, default=None, help="random seed")
+    parser.add_argument('--tc-resolution', choices=TC_RESOLUTIONS, default='exact',
+                        help="decks-remaining estimate used for the true count")
+    parser.add_argument('--ramp', default=None, help="bet ramp JSON from ramp_optimizer.py")
+    parser.add_argument('--system', choices=SYSTEM_NAMES, default=DEFAULT_SYSTEM,
+                        help="count system driving bets and deviations")
+    parser.add_argument('--compare', action='store_true', help="also bet every count system on the same hands")
+    parser.add_argument('--indices', default=None, help="deviation index table from deviations.py")
+    parser.add_argument('--rules', choices=RULESET_NAMES, default='h17', help="table rules, rules.py")
+    args = parser.parse_args()
+
+    rules = get_ruleset(args.rules, args.decks)
+    indices = load_indices(args.indices) if args.indices else find_indices(args.decks, args.system, rules)
+    ramp = load_ramp(args.ramp) if args.ramp else None
+    stats = run_batch_simulation(args.decks, args.players, args.shoes, args.penetration,
+                                 args.lanes, args.seed, args.tc_resolution, ramp, args.system, args.compare,
+                                 indices=indices, rules=rules)
+    print_report(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+Benchmark suite for the decision, counting and round hot paths.
+
+Each benchmark times one operation with timeit (median of several repeats):
+
+- hand_value, soft_hand, basic_strategy, true_count: the per-decision calls
+  of the engine on a mix of two- and three-card hands, each call sweeping
+  every hand against every upcard several times so a sub-microsecond
+  operation is timed in batches of hundreds;
+- add_undo: counting one card with add_card_to_dealt and taking it back
+  (a batch of them per call);
+- scripted_round: whole console rounds through BlackjackGame.play_round
+  with input() answered from a fixed shoe and the output discarded;
+- full_shoe: one fixed six-deck shoe played by simulator.play_shoe;
+- gui_update_displays: a full redraw of a six-seat table on a hidden Tk
+  root (skipped when no display is available), destroyed afterwards.
+
+Results are written as JSON and compared against a stored baseline. Every
+timing repeat of a benchmark is followed by a repeat of a fixed calibration
+workload (object creation, dict lookups and method calls, like the engine),
+and the median ratio of the two is what is compared, so a baseline recorded
+on one machine stays meaningful on another and a busy spell slows both
+sides of a ratio alike. A benchmark more than --tolerance slower than its
+baseline is a regression and makes the run exit with status 1; the short
+per-decision benchmarks still vary by up to a third between runs and get
+MICRO_TOLERANCE instead.
+
+Usage:
+    python benchmarks.py                         # run and compare with benchmarks_baseline.json
+    python benchmarks.py --only true_count add_undo --json results.json
+    python benchmarks.py --save-baseline         # record a new baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import timeit
+
+import main as console
+from engine import BlackjackEngine
+from simulator import SimulationStats, build_shoe, choose_other_action, play_shoe
+
+DEFAULT_BASELINE = 'benchmarks_baseline.json'
+# Allowed slowdown against the baseline before a benchmark counts as a regression
+DEFAULT_TOLERANCE = 0.25
+# ... for the per-decision benchmarks, whose run-to-run spread is larger
+MICRO_TOLERANCE = 0.5
+MICRO_BENCHMARKS = ('hand_value', 'soft_hand', 'basic_strategy', 'true_count', 'add_undo')
+# Sweeps of HANDS x UPCARDS (or single operations for the counting benchmarks) per timed call
+SWEEPS = 4
+BATCH = 200
+
+HANDS = [['10', '6'], ['A', '7'], ['8', '8'], ['5', '4', '2'], ['A', 'A'], ['K', 'Q'], ['2', '3', 'A'],
+         ['9', '7'], ['A', '6', '4'], ['6', '5']]
+UPCARDS = ['2', '6', '7', '10', 'A']
+
+
+class _Slot:
+    def __init__(self, value):
+        self.value = value
+
+    def score(self, other):
+        return self.value * 31 + other
+
+
+def calibration():
+    """Fixed pure-Python workload that measures the speed of the interpreter and machine"""
+    table = {}
+    total = 0
+    for i, slot in enumerate([_Slot(i) for i in range(300)]):
+        key = str(i % 37)
+        table[key] = table.get(key, 0) + slot.score(i)
+        total += len([part for part in (i, key, slot) if part])
+    return total
+
+
+def sweep():
+    """(hand, upcard) of every decision in HANDS x UPCARDS, SWEEPS times over"""
+    return [(cards, upcard) for cards in HANDS for upcard in UPCARDS] * SWEEPS
+
+
+def bench_hand_value():
+    game = BlackjackEngine(6, 1)
+    hands = [cards for cards, _ in sweep()]
+    return lambda: [game.calculate_hand_value(cards) for cards in hands], len(hands)
+
+
+def bench_soft_hand():
+    game = BlackjackEngine(6, 1)
+    hands = [cards for cards, _ in sweep()]
+    return lambda: [game.is_soft_hand(cards) for cards in hands], len(hands)
+
+
+def bench_basic_strategy():
+    game = BlackjackEngine(6, 1)
+    pairs = sweep()
+
+    def run():
+        for cards, upcard in pairs:
+            game.get_basic_strategy(cards, upcard, len(cards) == 2, len(cards) == 2 and cards[0] == cards[1])
+    return run, len(pairs)
+
+
+def bench_true_count():
+    game = BlackjackEngine(6, 1)
+    for card in ['2', '5', 'K', '6', '9', 'A', '4']:
+        game.add_card_to_dealt(card)
+
+    def run():
+        for _ in range(BATCH):
+            # Drop the cached value so every call computes the count again
+            game._true_count = None
+            game.get_true_count()
+    return run, BATCH
+
+
+def bench_add_undo():
+    game = BlackjackEngine(6, 1)
+
+    def run():
+        for _ in range(BATCH):
+            game.add_card_to_dealt('5')
+            game.undo_last_action()
+    return run, BATCH
+
+
+def bench_scripted_round(rounds=10):
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = console.BlackjackGame(6, 3)
+    cards = build_shoe(6, random.Random(1))
+    position = 0
+
+    def answer(text=''):
+        nonlocal position
+        prompt = game.prompt
+        if prompt.kind == 'card':
+            position += 1
+            return console.card_name(cards[position - 1])
+        if prompt.kind == 'action':
+            return game.decision.action.lower()
+        if prompt.kind == 'other_action':
+            return choose_other_action(game, prompt)
+        return 'n'
+
+    def run():
+        # The same rounds every time, from the top of the shoe
+        nonlocal position
+        position = 0
+        game.reset_game()
+        console.input = answer
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(rounds):
+                    game.play_round()
+        finally:
+            del console.input
+    return run, rounds
+
+
+def bench_full_shoe():
+    game = BlackjackEngine(6, 1)
+    cards = build_shoe(6, random.Random(2))
+    stats = SimulationStats()
+    return lambda: play_shoe(game, cards, 0.75, stats), 1
+
+
+def bench_gui_update_displays():
+    import tkinter as tk
+    from mainActivity import BlackjackGameGUI, BlackjackGUI
+
+    root = tk.Tk()
+    root.withdraw()
+    try:
+        gui = BlackjackGUI(root)
+        gui.game = BlackjackGameGUI(6, 6, gui)
+        gui.create_player_areas(6)
+        gui.game.start_round()
+        rng = random.Random(3)
+        for rank in build_shoe(6, rng)[:13]:
+            gui.game.feed_rank(rank)
+    except Exception:
+        root.destroy()
+        raise
+    return gui.update_displays, 1, root.destroy
+
+
+# name -> factory returning (callable, operations per call[, cleanup called after timing])
+BENCHMARKS = {
+    'hand_value': bench_hand_value,
+    'soft_hand': bench_soft_hand,
+    'basic_strategy': bench_basic_strategy,
+    'true_count': bench_true_count,
+    'add_undo': bench_add_undo,
+    'scripted_round': bench_scripted_round,
+    'full_shoe': bench_full_shoe,
+    'gui_update_displays': bench_gui_update_displays,
+}
+
+
+def _timer(func, min_time):
+    """(timeit.Timer, calls per run) for runs of at least min_time"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return timer, max(1, int(number * min_time / 0.2))
+
+
+def time_call(func, repeat=5, min_time=0.2):
+    """(median seconds per call of func, median of those seconds over the calibration time next to them)"""
+    timer, number = _timer(func, min_time)
+    reference, reference_number = _timer(calibration, min_time)
+    seconds, ratios = [], []
+    for _ in range(repeat):
+        sample = timer.timeit(number) / number
+        seconds.append(sample)
+        ratios.append(sample / (reference.timeit(reference_number) / reference_number))
+    return statistics.median(seconds), statistics.median(ratios)
+
+
+def run_benchmarks(names=None, repeat=5, min_time=0.2):
+    """Time the named benchmarks (default: all); returns the JSON-ready results"""
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'calibration': time_call(calibration, repeat, min_time)[0],
+        'benchmarks': {},
+        'skipped': {},
+    }
+    for name in names or BENCHMARKS:
+        try:
+            func, ops, *cleanup = BENCHMARKS[name]()
+        except Exception as e:
+            results['skipped'][name] = f"{type(e).__name__}: {e}"
+            continue
+        try:
+            seconds, relative = time_call(func, repeat, min_time)
+        finally:
+            for step in cleanup:
+                step()
+        results['benchmarks'][name] = {'seconds_per_op': seconds / ops, 'ops_per_second': ops / seconds,
+                                       'relative': relative / ops}
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, micro_tolerance=MICRO_TOLERANCE):
+    """Per benchmark (name, relative time against the baseline, regressed); None where there is no baseline"""
+    rows = []
+    for name, result in results['benchmarks'].items():
+        base = baseline['benchmarks'].get(name)
+        if base is None or 'relative' not in base:
+            rows.append((name, None, False))
+            continue
+        ratio = result['relative'] / base['relative']
+        allowed = max(tolerance, micro_tolerance) if name in MICRO_BENCHMARKS else tolerance
+        rows.append((name, ratio, ratio > 1 + allowed))
+    return rows
+
+
+def print_report(results, rows=None):
+    """Print the timings, and the comparison with the baseline if there is one"""
+    print("=" * 70)
+    print(f"BENCHMARKS - Python {results['python']}")
+    print("=" * 70)
+    ratios = {name: (ratio, regressed) for name, ratio, regressed in rows or []}
+    print(f"{'Benchmark':<22} {'Time/op':>12} {'Ops/s':>14} {'vs baseline':>12}")
+    for name, result in results['benchmarks'].items():
+        ratio, regressed = ratios.get(name, (None, False))
+        versus = "" if ratio is None else f"{ratio:>11.2f}x" + (" REGRESSION" if regressed else "")
+        print(f"{name:<22} {result['seconds_per_op'] * 1e6:>10.2f}us {result['ops_per_second']:>14,.0f} {versus}")
+    for name, reason in results['skipped'].items():
+        print(f"{name:<22} skipped ({reason})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the engine, round and GUI hot paths")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help="benchmarks to run (default: all)")
+    parser.add_argument('--json', default=None, help="write the results to this file")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline results to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="store the results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown against the baseline (0.25 = 25%%; at least "
+                             "MICRO_TOLERANCE for the per-decision benchmarks)")
+    parser.add_argument('--repeat', type=int, default=5, help="timing repeats per benchmark (median is kept)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.only, args.repeat)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print_report(results)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print_report(results)
+        print(f"\nNo baseline at {args.baseline}; record one with --save-baseline")
+        return
+    rows = compare(results, baseline, args.tolerance)
+    print_report(results, rows)
+    regressions = [name for name, _, regressed in rows if regressed]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond the tolerance: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
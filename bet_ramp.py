@@ -0,0 +1,111 @@
+"""
+Bet ramp as data.
+
+A BetRamp is the bet size and its explanation for each true count step:
+the first step whose max_true_count is at or above the true count applies,
+and counts above the last step get the top bet. get_bet_amount() and
+get_bet_reason() both read the engine's ramp, so the bet and the text shown
+next to it can never disagree. ramp_optimizer.py proposes ramps for a
+bankroll and table limits.
+"""
+import json
+import math
+from bisect import bisect_left
+from collections import namedtuple
+
+# One step of a ramp: bet `units` when the true count is at most max_true_count
+RampStep = namedtuple('RampStep', ['max_true_count', 'units', 'reason'])
+
+# Ramp buckets: 0 is "true count <= 0", k is "k - 1 < true count <= k", the last one is everything above
+RAMP_BUCKETS = 9
+TOP_BUCKET = RAMP_BUCKETS - 1
+
+
+class BetRamp:
+    """Bet and explanation for each true count step"""
+
+    def __init__(self, steps, top_units, top_reason, top_balance_divisor=None):
+        self.steps = tuple(RampStep(*step) for step in steps)
+        self.thresholds = [step.max_true_count for step in self.steps]
+        self.top_units = top_units
+        self.top_reason = top_reason
+        # Top bet is also capped at balance // top_balance_divisor
+        self.top_balance_divisor = top_balance_divisor
+
+    def units(self, true_count, balance):
+        """Bet for a true count and the current balance"""
+        i = bisect_left(self.thresholds, true_count)
+        if i < len(self.steps):
+            return self.steps[i].units
+        if self.top_balance_divisor:
+            return min(self.top_units, balance // self.top_balance_divisor)
+        return self.top_units
+
+    def reason(self, true_count):
+        """Explanation shown next to the bet"""
+        i = bisect_left(self.thresholds, true_count)
+        return self.steps[i].reason if i < len(self.steps) else self.top_reason
+
+    def bucket_units(self, balance):
+        """Bet in every ramp bucket (thresholds are integers)"""
+        return [self.units(bucket, balance) for bucket in range(TOP_BUCKET)] + [self.units(math.inf, balance)]
+
+    @classmethod
+    def from_units(cls, units, table_min, table_max):
+        """Ramp with one step per bucket, explained in table terms"""
+        def describe(bet, when):
+            if bet == table_min:
+                return f"Minimum bet ({when})"
+            if bet == table_max:
+                return f"Maximum bet ({when})"
+            return f"{bet} units ({when})"
+
+        steps = [(0, units[0], describe(units[0], "true count +0 or lower"))]
+        for bucket in range(1, TOP_BUCKET):
+            steps.append((bucket, units[bucket], describe(units[bucket], f"true count up to +{bucket}")))
+        top = units[TOP_BUCKET]
+        return cls(steps, top, describe(top, f"true count above +{TOP_BUCKET - 1}"))
+
+    def to_dict(self):
+        return {
+            'steps': [list(step) for step in self.steps],
+            'top_units': self.top_units,
+            'top_reason': self.top_reason,
+            'top_balance_divisor': self.top_balance_divisor,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['steps'], data['top_units'], data['top_reason'], data.get('top_balance_divisor'))
+
+    def __eq__(self, other):
+        return isinstance(other, BetRamp) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"BetRamp({[step.units for step in self.steps]}, top={self.top_units})"
+
+
+# The published 1-2-4-6-8-10 Omega II ramp
+DEFAULT_RAMP = BetRamp([
+    (0, 1, "Minimum bet (unfavorable count)"),
+    (1, 1, "Minimum bet (low positive count)"),
+    (2, 2, "2 units (moderate positive count)"),
+    (3, 4, "4 units (good positive count)"),
+    (4, 6, "6 units (very good positive count)"),
+    (5, 8, "8 units (excellent positive count)"),
+], 10, "Maximum bet (extremely favorable count)", top_balance_divisor=20)
+
+
+def ramp_bucket(true_count):
+    """Ramp bucket of a true count"""
+    return min(TOP_BUCKET, max(0, math.ceil(true_count)))
+
+
+def load_ramp(path):
+    with open(path) as f:
+        return BetRamp.from_dict(json.load(f))
+
+
+def save_ramp(ramp, path):
+    with open(path, 'w') as f:
+        json.dump(ramp.to_dict(), f, indent=2)
@@ -0,0 +1,268 @@
+"""
+Local card-feed API: external devices send card and action events over a
+socket and get the updated count and recommendation pushed back.
+
+The server listens on localhost TCP (or a Unix-domain socket) and speaks
+newline-delimited JSON, one object per line:
+
+    {"table": "T1", "card": "K"}            deal a card of the round ("cards": "K 5 9" for several)
+    {"table": "T1", "action": "hit"}        the player's (or another seat's) action
+    {"table": "T1", "insurance": false}
+    {"table": "T1", "seen": "5 6"}          count cards outside any round
+    {"table": "T1", "undo": true}           also "shuffle"
+    {"subscribe": ["T1"]}                   push updates of these tables (true: all tables)
+
+Events from every connection go through one TableManager (tables.py) and are
+applied in the order they arrive. A connection is not read again until its
+last event is queued, so when the queue is full the sender is slowed down by
+TCP flow control instead of being buffered without limit. After every batch
+each subscriber receives one line per changed table:
+
+    {"table": "T1", "seq": 42, "true_count": 1.2, "running_count": 7, "bet": 2,
+     "prompt": "Your choice ...", "recommendation": "HIT", ...}
+
+and a sender gets {"error": ..., "table": ...} for an event that could not be
+applied. A subscriber that stops reading is disconnected once MAX_BUFFER
+bytes are waiting for it. Tables are created on their first event.
+
+Usage:
+    python card_feed.py serve --port 8765 --tables 2
+    python card_feed.py client --port 8765 --table T1    # stand-in device: type K 5 9, h, s, y/n, undo
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from cards import parse_cards
+from count_systems import DEFAULT_SYSTEM, SYSTEM_NAMES
+from engine import normalize_action
+from rules import RULESET_NAMES, get_ruleset
+from tables import TableEvent, TableManager
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Bytes queued for a subscriber before it is considered stuck and disconnected
+MAX_BUFFER = 1 << 20
+
+
+def status_message(status, seq):
+    """JSON-ready update for one table"""
+    message = {'table': status.name, 'seq': seq}
+    message.update(status._asdict())
+    del message['name']
+    return message
+
+
+def message_event(message):
+    """(kind, value) of a TableEvent for one card, action, insurance, seen, undo or shuffle message"""
+    if 'card' in message or 'cards' in message:
+        return 'deal', parse_cards(message.get('card', message.get('cards')))
+    if 'seen' in message:
+        return 'cards', parse_cards(message['seen'])
+    if 'action' in message:
+        action = normalize_action(message['action'])
+        if action is None:
+            raise ValueError(f"Unknown action {message['action']}")
+        return 'action', action
+    if 'insurance' in message:
+        take = message['insurance']
+        if isinstance(take, str):
+            take = take.lower().strip() in ('y', 'yes')
+        return 'insurance', bool(take)
+    for kind in ('undo', 'shuffle'):
+        if message.get(kind):
+            return kind, None
+    raise ValueError("Expected card, cards, seen, action, insurance, undo or shuffle")
+
+
+class CardFeedServer:
+    """Socket endpoint feeding a TableManager and pushing its updates to subscribers"""
+
+    def __init__(self, manager, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.path = path
+        self.subscribers = {}   # writer -> set of table names, or None for every table
+        self.server = None
+        self._worker = None
+        manager.subscribers.append(self.push)
+
+    async def start(self):
+        self.manager.flush()
+        self._worker = asyncio.create_task(self.manager.run(on_error=self.report_error))
+        if self.path:
+            self.server = await asyncio.start_unix_server(self.handle, self.path)
+        else:
+            self.server = await asyncio.start_server(self.handle, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self._worker.cancel()
+
+    async def handle(self, reader, writer):
+        """Read one connection's events in order; stops reading while the queue is full"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    event = self.parse(json.loads(line), writer)
+                except ValueError as e:
+                    self.send(writer, {'error': str(e)})
+                    continue
+                if event is not None:
+                    await self.manager.submit(event)
+        except ConnectionError:
+            pass
+        finally:
+            self.subscribers.pop(writer, None)
+            writer.close()
+
+    def parse(self, message, writer):
+        """TableEvent for a message (None for a subscription); ValueError if it is malformed"""
+        if not isinstance(message, dict):
+            raise ValueError("Send one JSON object per line")
+        if 'subscribe' in message:
+            tables = message['subscribe']
+            self.subscribers[writer] = None if tables is True else {self._table(name) for name in tables}
+            return None
+        kind, value = message_event(message)
+        return TableEvent(self._table(message.get('table')), kind, value, writer)
+
+    def _table(self, table):
+        """Name of a table, creating it on first use"""
+        if table is None:
+            raise ValueError("Missing table")
+        try:
+            return self.manager.resolve(table)
+        except ValueError:
+            self.manager.add_table(str(table))
+            return str(table)
+
+    def push(self, changed):
+        """TableManager subscriber: send every subscriber the tables it follows that changed"""
+        for writer, tables in list(self.subscribers.items()):
+            for status in changed:
+                if tables is None or status.name in tables:
+                    self.send(writer, status_message(status, self.manager.events))
+
+    def send(self, writer, message):
+        if writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > MAX_BUFFER:
+            self.subscribers.pop(writer, None)
+            writer.close()
+            return
+        writer.write((json.dumps(message) + "\n").encode())
+
+    def report_error(self, error, event):
+        if event.source is not None:
+            self.send(event.source, {'error': str(error), 'table': event.table})
+
+
+class FeedClient:
+    """Minimal client for the card feed: send events, read pushed updates"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        if path:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def send(self, **message):
+        self.writer.write((json.dumps(message) + "\n").encode())
+        await self.writer.drain()
+
+    async def receive(self):
+        """Next pushed message, or None once the server has closed the connection"""
+        line = await self.reader.readline()
+        return json.loads(line) if line else None
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def device_message(table, line):
+    """Feed message for a line typed into the stand-in client"""
+    words = line.split()
+    command = words[0].lower()
+    if command in ('undo', 'shuffle'):
+        return {'table': table, command: True}
+    if command in ('y', 'n', 'yes', 'no'):
+        return {'table': table, 'insurance': command.startswith('y')}
+    if command == 'seen':
+        return {'table': table, 'seen': " ".join(words[1:])}
+    if normalize_action(command) is not None:
+        return {'table': table, 'action': command}
+    return {'table': table, 'cards': line}
+
+
+async def run_client(host, port, path, table):
+    """Stand-in input device: send typed lines for one table and print every pushed update"""
+    client = await FeedClient.connect(host, port, path)
+    await client.send(subscribe=[table])
+
+    async def show_updates():
+        while (message := await client.receive()) is not None:
+            if 'error' in message:
+                print(f"! {message['error']}")
+                continue
+            advice = f"  -> {message['recommendation']}" if message['recommendation'] else ""
+            print(f"[{message['seq']}] {message['table']} TC {message['true_count']:+.2f} "
+                  f"RC {message['running_count']} bet {message['bet']}{advice}  {message['prompt'] or ''}")
+
+    updates = asyncio.create_task(show_updates())
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    while line := (await reader.readline()).decode():
+        if line.strip():
+            await client.send(**device_message(table, line.strip()))
+    await asyncio.sleep(0.1)
+    updates.cancel()
+    await client.close()
+
+
+async def serve(args):
+    manager = TableManager(args.decks, args.system, rules=get_ruleset(args.rules, args.decks))
+    for number in range(1, args.tables + 1):
+        manager.add_table(f"T{number}")
+    server = await CardFeedServer(manager, args.host, args.port, args.unix).start()
+    print(f"Card feed listening on {args.unix or f'{args.host}:{server.port}'}")
+    await server.server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local card-feed API for external input devices")
+    parser.add_argument('mode', choices=['serve', 'client'], help="run the server or the stand-in client")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to listen on / connect to")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="TCP port")
+    parser.add_argument('--unix', default=None, help="Unix-domain socket path instead of TCP")
+    parser.add_argument('--tables', type=int, default=1, help="tables to start with (named T1, T2, ...)")
+    parser.add_argument('--decks', type=int, default=6, help="decks in each shoe")
+    parser.add_argument('--system', choices=SYSTEM_NAMES, default=DEFAULT_SYSTEM, help="count system")
+    parser.add_argument('--rules', choices=RULESET_NAMES, default='h17', help="rules of every table (rules.py)")
+    parser.add_argument('--table', default='T1', help="table the client feeds")
+    args = parser.parse_args()
+
+    if args.mode == 'serve':
+        asyncio.run(serve(args))
+    else:
+        asyncio.run(run_client(args.host, args.port, args.unix, args.table))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Integer card encoding.
+
+Inside the engine a card is its rank index (0 = Ace, 1 = '2', ... 9 = '10',
+10 = 'J', 11 = 'Q', 12 = 'K'); shoe compositions and count tags are 13-slot
+lists indexed by that rank. Rank strings only appear when parsing input and
+when displaying cards.
+"""
+
+RANK_NAMES = ('A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K')
+NUM_RANKS = len(RANK_NAMES)
+ACE = 0
+
+RANK_INDEX = {name: rank for rank, name in enumerate(RANK_NAMES)}
+
+# Blackjack value of each rank (Ace as 11)
+RANK_VALUES = (11, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10)
+
+
+def parse_card(text):
+    """Rank index of a typed card (case-insensitive, '1' for Ace); None if invalid"""
+    text = str(text).upper().strip()
+    if text == '1':
+        return ACE
+    return RANK_INDEX.get(text)
+
+
+def parse_cards(text):
+    """Rank indices of a typed or pasted card sequence ('K 5 9 A', 'k,5,9,a'); ValueError if any is invalid"""
+    tokens = str(text).replace(',', ' ').split()
+    ranks = [parse_card(token) for token in tokens]
+    invalid = [token for token, rank in zip(tokens, ranks) if rank is None]
+    if invalid:
+        raise ValueError(f"Invalid card{'s' if len(invalid) > 1 else ''} {', '.join(invalid)}. "
+                         "Enter: A/1, 2-10, J, Q, K")
+    return ranks
+
+
+def card_name(rank):
+    """Display string of a rank index"""
+    return RANK_NAMES[rank]
+
+
+def tag_array(tags):
+    """Per-rank count tags from a {rank name: tag} table"""
+    return [tags[name] for name in RANK_NAMES]
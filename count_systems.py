@@ -0,0 +1,121 @@
+"""
+Card counting systems held as one rank-by-system tag matrix.
+
+Each CountSystem is its per-rank tags plus how its running count becomes a
+true count. CountMatrix lines the systems up as the columns of a 13-row tag
+matrix and packs every row into a single Python integer, one 16-bit lane
+per system (offset by LANE_BIAS so no lane ever borrows from its
+neighbour). Adding a rank's packed row to the packed counts is one integer
+add that updates the running count of every system at once, so the engine
+tracks all of them for the price of one; the NumPy simulators use the same
+matrix as an array and add a row per lane and card.
+
+True counts are comparable across systems of the same level:
+
+- unbalanced systems (KO) are corrected for the count their extra low cards
+  are expected to have added so far, which turns them into a balanced
+  equivalent;
+- a system with an ace side count adds ace_weight for every ace left beyond
+  the expected one per 13 cards before dividing by the decks remaining.
+
+Ramps and deviation indices are per system: pass the system's own to the
+engine, or generate them with ramp_optimizer.py / deviations.py --system.
+"""
+from collections import namedtuple
+
+from cards import tag_array
+
+# name, display label, {rank name: tag}, points per surplus ace left in the shoe
+CountSystem = namedtuple('CountSystem', ['name', 'label', 'tags', 'ace_weight'])
+
+OMEGA_II = {
+    '2': 1, '3': 1, '4': 2, '5': 2, '6': 2,
+    '7': 1, '8': 0, '9': -1, '10': -2,
+    'J': -2, 'Q': -2, 'K': -2, 'A': 0
+}
+
+
+def _tags(ace, two, three, four, five, six, seven, eight, nine, ten):
+    return {'A': ace, '2': two, '3': three, '4': four, '5': five, '6': six, '7': seven, '8': eight,
+            '9': nine, '10': ten, 'J': ten, 'Q': ten, 'K': ten}
+
+
+SYSTEMS = (
+    CountSystem('hi_lo', "Hi-Lo", _tags(-1, 1, 1, 1, 1, 1, 0, 0, 0, -1), 0),
+    CountSystem('ko', "KO", _tags(-1, 1, 1, 1, 1, 1, 1, 0, 0, -1), 0),
+    CountSystem('zen', "Zen", _tags(-1, 1, 1, 2, 2, 2, 1, 0, 0, -2), 0),
+    CountSystem('hi_opt_ii', "Hi-Opt II", _tags(0, 1, 1, 2, 2, 1, 1, 0, 0, -2), 0),
+    CountSystem('omega_ii', "Omega II", OMEGA_II, 0),
+    CountSystem('omega_ii_asc', "Omega II + ace side count", OMEGA_II, 2),
+)
+SYSTEM_NAMES = tuple(system.name for system in SYSTEMS)
+DEFAULT_SYSTEM = 'omega_ii'
+
+LANE_BITS = 16
+LANE_MASK = (1 << LANE_BITS) - 1
+LANE_BIAS = 1 << (LANE_BITS - 1)
+
+
+class CountMatrix:
+    """Rank-by-system tag matrix, with each rank's row packed into one integer"""
+
+    def __init__(self, systems=SYSTEMS):
+        self.systems = tuple(systems)
+        self.names = tuple(system.name for system in self.systems)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        # tags[rank][system]
+        self.tags = tuple(zip(*(tag_array(system.tags) for system in self.systems)))
+        self.packed = tuple(self.pack(row) for row in self.tags)
+        # Packed running counts of a full shoe (every lane at zero, i.e. at LANE_BIAS)
+        self.zero = self.pack([LANE_BIAS] * len(self.systems))
+        # Running count each system gains per deck, zero for balanced systems
+        self.imbalance = tuple(4 * sum(row[i] for row in self.tags) for i in range(len(self.systems)))
+
+    def system(self, name):
+        """CountSystem by name"""
+        if name not in self.index:
+            raise ValueError(f"Unknown count system: {name} (choose from {', '.join(self.names)})")
+        return self.systems[self.index[name]]
+
+    def pack(self, counts):
+        """One integer holding a value per system, lane i at bit LANE_BITS * i"""
+        return sum(count << (LANE_BITS * i) for i, count in enumerate(counts))
+
+    def running_count(self, packed, i):
+        """Running count of system i in packed counts"""
+        return ((packed >> (LANE_BITS * i)) & LANE_MASK) - LANE_BIAS
+
+    def running_counts(self, packed):
+        return [self.running_count(packed, i) for i in range(len(self.systems))]
+
+    def count_shoe(self, shoe, total_decks):
+        """Packed running counts of a shoe composition (cards dealt from a full shoe)"""
+        packed = self.zero
+        for rank, left in enumerate(shoe):
+            packed += self.packed[rank] * (4 * total_decks - left)
+        return packed
+
+    def true_count(self, i, running_count, decks_remaining, cards_remaining, aces_remaining, total_decks):
+        """True count of system i, rounded like the engine's"""
+        if decks_remaining <= 0:
+            return 0
+        count = running_count
+        imbalance = self.imbalance[i]
+        if imbalance:
+            count -= imbalance * (52 * total_decks - cards_remaining) / 52
+        ace_weight = self.systems[i].ace_weight
+        if ace_weight:
+            count += ace_weight * (aces_remaining - cards_remaining / 13)
+        return round(count / decks_remaining, 2)
+
+
+_count_matrix = None
+
+
+def get_count_matrix():
+    """Shared CountMatrix of every system in SYSTEMS"""
+    global _count_matrix
+    if _count_matrix is None:
+        _count_matrix = CountMatrix()
+    return _count_matrix
+
@@ -0,0 +1,151 @@
+"""
+Exact dealer outcome probabilities for the live shoe.
+
+Given the cards left in the shoe and the dealer's upcard, DealerOdds returns
+the exact probability of each final dealer result (17-21, bust, blackjack)
+under the engine's rules: the hole card is always drawn and the dealer hits
+soft 17 (or stands on it, with hit_soft_17=False), where "soft" is
+is_soft_hand()'s definition (every ace can still count as 11).
+
+Only card values matter to the dealer, so the shoe is reduced to ten value
+slots (Ace, 2-9, ten-valued). Every dealer state is memoized on
+(composition, cards held), and the cache outlives a single query: the ten
+upcards of one shoe share most sub-results, and an undo or any later shoe
+that reaches the same composition is answered from the cache.
+"""
+from cards import RANK_INDEX
+
+NUM_SLOTS = 10
+ACE_SLOT = 0
+SLOT_VALUES = (11, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+
+# Order of the probabilities in a distribution tuple
+OUTCOMES = (17, 18, 19, 20, 21, 'bust', 'blackjack')
+BUST = 5
+BLACKJACK = 6
+
+_STAND = {total: tuple(1.0 if i == total - 17 else 0.0 for i in range(7)) for total in range(17, 22)}
+_BUSTED = (0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+
+
+def value_composition(shoe):
+    """Ten-slot value composition of a 13-slot rank shoe"""
+    return tuple(shoe[:9]) + (shoe[9] + shoe[10] + shoe[11] + shoe[12],)
+
+
+def value_slot(card):
+    """Value slot of a card given as a rank string or rank index"""
+    rank = RANK_INDEX[card] if isinstance(card, str) else card
+    return min(rank, 9)
+
+
+class DealerOdds:
+    """Memoized dealer final-total calculator"""
+
+    def __init__(self, max_entries=500000, hit_soft_17=True):
+        self.max_entries = max_entries
+        self.hit_soft_17 = hit_soft_17
+        self._cache = {}
+
+    def distribution(self, composition, upcard):
+        """Outcome probabilities as a tuple ordered like OUTCOMES
+
+        composition is the ten-slot shoe after the upcard was dealt; the hole
+        card and every hit are drawn from it.
+        """
+        key = (composition, upcard)
+        result = self._cache.get(key)
+        if result is not None:
+            return result
+        if len(self._cache) > self.max_entries:
+            self._cache.clear()
+
+        remaining = sum(composition)
+        acc = [0.0] * 7
+        up_value = SLOT_VALUES[upcard]
+        for slot in range(NUM_SLOTS):
+            count = composition[slot]
+            if not count:
+                continue
+            p = count / remaining
+            if up_value + SLOT_VALUES[slot] == 21:
+                acc[BLACKJACK] += p
+                continue
+            rest = composition[:slot] + (count - 1,) + composition[slot + 1:]
+            aces = (upcard == ACE_SLOT) + (slot == ACE_SLOT)
+            sub = self._final(rest, up_value + SLOT_VALUES[slot], aces)
+            for i in range(BLACKJACK):
+                acc[i] += p * sub[i]
+        result = tuple(acc)
+        self._cache[key] = result
+        return result
+
+    def _final(self, composition, raw_total, aces):
+        """Distribution of the final dealer total from a hand of raw_total (aces as 11)"""
+        key = (composition, raw_total, aces)
+        result = self._cache.get(key)
+        if result is not None:
+            return result
+
+        total = raw_total
+        soft_aces = aces
+        while total > 21 and soft_aces > 0:
+            total -= 10
+            soft_aces -= 1
+
+        remaining = sum(composition)
+        if total > 21 or not remaining:
+            # An exhausted shoe is scored like a bust
+            result = _BUSTED
+        elif total >= 18 or (total == 17 and not (self.hit_soft_17 and raw_total <= 21 and aces > 0)):
+            result = _STAND[total]
+        else:
+            # Dealer hits below 17 and, under H17, on soft 17
+            acc = [0.0] * 6
+            for slot in range(NUM_SLOTS):
+                count = composition[slot]
+                if not count:
+                    continue
+                p = count / remaining
+                rest = composition[:slot] + (count - 1,) + composition[slot + 1:]
+                sub = self._final(rest, raw_total + SLOT_VALUES[slot], aces + (slot == ACE_SLOT))
+                for i in range(BLACKJACK):
+                    acc[i] += p * sub[i]
+            result = tuple(acc) + (0.0,)
+        self._cache[key] = result
+        return result
+
+    def hand_distribution(self, composition, raw_total, aces, num_cards):
+        """Outcome probabilities once the dealer holds num_cards (2 or more) cards
+
+        After the hole card or a hit this is a sub-state of the upcard query,
+        so during the dealer's turn it is normally already cached.
+        """
+        if num_cards == 2 and raw_total == 21:
+            return (0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+        if len(self._cache) > self.max_entries:
+            self._cache.clear()
+        return self._final(composition, raw_total, aces)
+
+    def all_upcards(self, composition):
+        """{upcard slot: distribution} for every upcard still in the shoe
+
+        The upcard itself is taken out of composition before its row is solved.
+        """
+        rows = {}
+        for slot in range(NUM_SLOTS):
+            if composition[slot]:
+                rest = composition[:slot] + (composition[slot] - 1,) + composition[slot + 1:]
+                rows[slot] = self.distribution(rest, slot)
+        return rows
+
+
+_dealer_odds = {}
+
+
+def get_dealer_odds(hit_soft_17=True):
+    """Shared calculator per soft 17 rule, so its cache is reused by every caller"""
+    odds = _dealer_odds.get(hit_soft_17)
+    if odds is None:
+        odds = _dealer_odds[hit_soft_17] = DealerOdds(hit_soft_17=hit_soft_17)
+    return odds
@@ -0,0 +1,315 @@
+"""
+Simulation-derived deviation indices for every count system.
+
+For every deviation in strategy_table.DEFAULT_INDICES this estimates the
+true count at which the deviation and the basic-strategy play break even,
+for one deck count. Shoes are shuffled and walked card by card; every
+`stride` cards each deviation hand and upcard is taken out of the shoe
+(where those cards are still available) and both plays are valued for that
+exact composition with EVSolver. Valuing each sampled shoe state exactly,
+instead of dealing one random play-out per action, leaves only the spread
+between compositions as noise (a few hundredths of a unit instead of about
+one unit per hand), so a few thousand samples per count bucket pin the
+index down.
+
+The true count is the engine's own definition for each system in
+count_systems.py (running count over true_count_divisors, rounded to two
+decimals), counted after the player's cards and the upcard. Every system's
+running count is tracked in the same pass with the packed tag matrix, and
+each valued sample is recorded under every system's true count, so indices
+for all systems cost one EV valuation per sample, the same as for one. Rules
+are the engine's default ones unless --rules names another ruleset (rules.py),
+as modelled by ev_solver.py; those indices are written under the ruleset's
+key and preferred by strategy_table.find_indices() for that ruleset.
+
+The break-even count is a weighted least-squares line through the mean EV
+difference of each true count bucket, refitted around its first estimate,
+and the index is that count rounded to the nearest integer the strategy
+table can represent. Shoes are spread across a process pool like
+simulator.py, and the result is written as an index table that
+strategy_table.load_indices() reads.
+
+Usage:
+    python deviations.py --decks 6 --shoes 1000 --workers 4
+    python deviations.py --all-decks
+    python deviations.py --decks 6 --all-systems
+    python deviations.py --decks 6 --rules s17-ls
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from multiprocessing import Pool, cpu_count
+
+from cards import RANK_INDEX
+from count_systems import DEFAULT_SYSTEM, SYSTEM_NAMES, get_count_matrix
+from dealer_odds import NUM_SLOTS, get_dealer_odds
+from engine import TC_RESOLUTIONS, true_count_divisors
+from ev_solver import EVSolver
+from rules import DEFAULT_RULES, RULESET_NAMES, describe, get_ruleset
+from strategy_table import DEFAULT_INDICES, MAX_BUCKET, MIN_BUCKET, clamp_index, index_table_path
+
+# Deviation -> (player cards, dealer upcard, basic play, deviation) as value slots
+SCENARIOS = {
+    'TTv5': ((9, 9), 4, 'STAND', 'SPLIT'),
+    'TTv6': ((9, 9), 5, 'STAND', 'SPLIT'),
+    '16v10': ((9, 5), 9, 'HIT', 'STAND'),
+    '16v9': ((9, 5), 8, 'HIT', 'STAND'),
+    '15v10': ((9, 4), 9, 'HIT', 'STAND'),
+    '12v2': ((9, 1), 1, 'HIT', 'STAND'),
+    '12v3': ((9, 1), 2, 'HIT', 'STAND'),
+    '11vA': ((5, 4), 0, 'HIT', 'DOUBLE'),
+    '10v10': ((5, 3), 9, 'HIT', 'DOUBLE'),
+}
+
+# Packed tags of every count system per value slot (ten-valued ranks share one tag)
+_MATRIX = get_count_matrix()
+assert len({_MATRIX.packed[RANK_INDEX[rank]] for rank in ('10', 'J', 'Q', 'K')}) == 1
+SLOT_TAGS = tuple(_MATRIX.packed[:NUM_SLOTS])
+
+# Buckets with fewer samples are left out of the fit
+MIN_BUCKET_SAMPLES = 20
+# Half-width of the refit window around the first break-even estimate
+FIT_WINDOW = 3
+
+
+class DeviationStats:
+    """Per count system, deviation and true count bucket: [samples, sum of TC, sum of EV difference, sum of squares]
+
+    by_deviation is the first system's table.
+    """
+
+    def __init__(self, systems=(DEFAULT_SYSTEM,)):
+        self.systems = tuple(systems)
+        self.shoes = 0
+        self.elapsed = 0.0
+        self.by_system = {system: {name: {} for name in SCENARIOS} for system in self.systems}
+        self.by_deviation = self.by_system[self.systems[0]]
+
+    def record(self, name, true_count, difference, system=None):
+        bucket = min(MAX_BUCKET, max(MIN_BUCKET, math.floor(true_count)))
+        table = self.by_system[system][name] if system else self.by_deviation[name]
+        row = table.get(bucket)
+        if row is None:
+            row = table[bucket] = [0, 0.0, 0.0, 0.0]
+        row[0] += 1
+        row[1] += true_count
+        row[2] += difference
+        row[3] += difference * difference
+
+    def merge(self, other):
+        """Fold another worker's totals into this one"""
+        self.shoes += other.shoes
+        for system, deviations in other.by_system.items():
+            for name, buckets in deviations.items():
+                mine = self.by_system[system][name]
+                for bucket, values in buckets.items():
+                    row = mine.setdefault(bucket, [0, 0.0, 0.0, 0.0])
+                    for i, value in enumerate(values):
+                        row[i] += value
+
+    def samples(self, name, system=None):
+        table = self.by_system[system] if system else self.by_deviation
+        return sum(row[0] for row in table[name].values())
+
+
+def _fit(points):
+    """Weighted least squares (intercept, slope) through (x, y, weight) points, or None"""
+    sw = sum(w for _, _, w in points)
+    if len(points) < 2 or sw <= 0:
+        return None
+    mx = sum(x * w for x, _, w in points) / sw
+    my = sum(y * w for _, y, w in points) / sw
+    sxx = sum(w * (x - mx) ** 2 for x, _, w in points)
+    if sxx <= 0:
+        return None
+    slope = sum(w * (x - mx) * (y - my) for x, y, w in points) / sxx
+    return my - slope * mx, slope
+
+
+def break_even(buckets):
+    """True count where the deviation's mean EV advantage crosses zero, or None if it never rises"""
+    points = []
+    for n, sum_tc, sum_diff, sum_sq in buckets.values():
+        if n < MIN_BUCKET_SAMPLES:
+            continue
+        mean = sum_diff / n
+        variance = max(sum_sq / n - mean * mean, 1e-8)
+        points.append((sum_tc / n, mean, n / variance))
+    line = _fit(points)
+    if line is None or line[1] <= 0:
+        return None
+    estimate = -line[0] / line[1]
+    near = [point for point in points if abs(point[0] - estimate) <= FIT_WINDOW]
+    refit = _fit(near)
+    if refit is not None and refit[1] > 0:
+        estimate = -refit[0] / refit[1]
+    return estimate
+
+
+def sample_shoe(order, total_decks, penetration, stride, divisors, solver, stats, rules=DEFAULT_RULES):
+    """Value every deviation at every stride-th position of one shuffled shoe"""
+    counts = [4 * total_decks] * 9 + [16 * total_decks]
+    remaining = 52 * total_decks
+    running_counts = _MATRIX.zero
+    systems = [(system, _MATRIX.index[system]) for system in stats.systems]
+    cut_card = int(remaining * penetration)
+    for position, slot in enumerate(order[:cut_card]):
+        if position % stride == 0:
+            for name, (hand, upcard, basic, deviation) in SCENARIOS.items():
+                removed = hand + (upcard,)
+                for card in removed:
+                    counts[card] -= 1
+                if min(counts) >= 0:
+                    decks = divisors[remaining - 3]
+                    packed = running_counts + SLOT_TAGS[hand[0]] + SLOT_TAGS[hand[1]] + SLOT_TAGS[upcard]
+                    evs = solver.action_evs(tuple(counts), list(hand), upcard, True,
+                                            'SPLIT' in (basic, deviation), rules.blackjack_payout,
+                                            rules.double_after_split)
+                    difference = evs[deviation] - evs[basic]
+                    for system, i in systems:
+                        true_count = _MATRIX.true_count(i, _MATRIX.running_count(packed, i), decks,
+                                                        remaining - 3, counts[0], total_decks)
+                        stats.record(name, true_count, difference, system)
+                for card in removed:
+                    counts[card] += 1
+        counts[slot] -= 1
+        remaining -= 1
+        running_counts += SLOT_TAGS[slot]
+    stats.shoes += 1
+
+
+def simulate_deviations(args):
+    """Worker entry point: (total_decks, num_shoes, penetration, stride, seed, tc_resolution, dealer_depth,
+    systems, rules) -> stats"""
+    total_decks, num_shoes, penetration, stride, seed, tc_resolution, dealer_depth, systems, rules = args
+    rng = random.Random(seed)
+    divisors = true_count_divisors(total_decks, tc_resolution)
+    solver = EVSolver(get_dealer_odds(rules.hit_soft_17), dealer_depth=dealer_depth)
+    order = list(range(NUM_SLOTS - 1)) * (4 * total_decks) + [9] * (16 * total_decks)
+    stats = DeviationStats(systems)
+    for _ in range(num_shoes):
+        rng.shuffle(order)
+        sample_shoe(order, total_decks, penetration, stride, divisors, solver, stats, rules)
+    return stats
+
+
+def run_deviations(total_decks=6, num_shoes=1000, penetration=0.75, stride=8, workers=None,
+                   seed=None, chunk_shoes=20, tc_resolution='exact', dealer_depth=0, systems=(DEFAULT_SYSTEM,),
+                   rules=None):
+    """Simulate num_shoes shoes across a process pool and return merged stats for every system"""
+    rules = rules or DEFAULT_RULES._replace(decks=total_decks)
+    workers = workers or cpu_count()
+    base_seed = seed if seed is not None else random.randrange(2 ** 32)
+
+    tasks = []
+    remaining = num_shoes
+    while remaining > 0:
+        count = min(chunk_shoes, remaining)
+        tasks.append((total_decks, count, penetration, stride, base_seed + len(tasks), tc_resolution,
+                      dealer_depth, tuple(systems), rules))
+        remaining -= count
+
+    start = time.perf_counter()
+    totals = DeviationStats(systems)
+    if workers == 1:
+        for task in tasks:
+            totals.merge(simulate_deviations(task))
+    else:
+        with Pool(workers) as pool:
+            for stats in pool.imap_unordered(simulate_deviations, tasks):
+                totals.merge(stats)
+    totals.elapsed = time.perf_counter() - start
+    return totals
+
+
+def index_table(stats, total_decks, penetration, tc_resolution, system=None, rules=None):
+    """Index table (as written to disk) of one system (default: the first) from merged stats
+
+    A deviation whose advantage never rises with the count keeps its
+    default index and is listed under 'unresolved'.
+    """
+    system = system or stats.systems[0]
+    indices, estimates, unresolved = {}, {}, []
+    for name in SCENARIOS:
+        estimate = break_even(stats.by_system[system][name])
+        estimates[name] = None if estimate is None else round(estimate, 2)
+        if estimate is None:
+            indices[name] = DEFAULT_INDICES[name]
+            unresolved.append(name)
+        else:
+            indices[name] = clamp_index(math.floor(estimate + 0.5))
+    return {
+        'system': system,
+        'decks': total_decks,
+        'penetration': penetration,
+        'tc_resolution': tc_resolution,
+        'rules': describe(rules or DEFAULT_RULES._replace(decks=total_decks)),
+        'shoes': stats.shoes,
+        'indices': indices,
+        'break_even': estimates,
+        'samples': {name: stats.samples(name, system) for name in SCENARIOS},
+        'unresolved': unresolved,
+    }
+
+
+def write_index_table(table, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(table, f, indent=2)
+
+
+def print_report(table, elapsed):
+    """Print generated indices next to the published ones"""
+    print("=" * 60)
+    print(f"{table['system'].upper()} DEVIATION INDICES - {table['decks']} DECK(S)")
+    print("=" * 60)
+    print(f"Shoes: {table['shoes']}   Time: {elapsed:.1f}s")
+    print(f"{'Play':>6} {'Break-even':>11} {'Index':>6} {'Default':>8} {'Samples':>10}")
+    for name, index in table['indices'].items():
+        estimate = table['break_even'][name]
+        shown = "-" if estimate is None else f"{estimate:+.2f}"
+        print(f"{name:>6} {shown:>11} {index:>+6} {DEFAULT_INDICES[name]:>+8} {table['samples'][name]:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate deviation indices by simulation")
+    parser.add_argument('--decks', type=int, default=6, help="number of decks in the shoe")
+    parser.add_argument('--all-decks', action='store_true', help="generate tables for 1 to 8 decks")
+    parser.add_argument('--shoes', type=int, default=1000, help="number of shoes per deck count")
+    parser.add_argument('--penetration', type=float, default=0.75, help="fraction dealt before reshuffle")
+    parser.add_argument('--stride', type=int, default=8, help="cards between sampled shoe positions")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=None, help="base random seed")
+    parser.add_argument('--tc-resolution', choices=TC_RESOLUTIONS, default='exact',
+                        help="decks-remaining estimate used for the true count")
+    parser.add_argument('--dealer-depth', type=int, default=0,
+                        help="player draws after which the dealer distribution is frozen (see ev_solver.py)")
+    parser.add_argument('--system', choices=SYSTEM_NAMES, default=DEFAULT_SYSTEM, help="count system")
+    parser.add_argument('--all-systems', action='store_true',
+                        help="generate a table for every count system from the same shoes")
+    parser.add_argument('--output', default=None,
+                        help="index table path (default: indices/<system>_<decks>d.json)")
+    parser.add_argument('--rules', choices=RULESET_NAMES, default=None,
+                        help="ruleset to simulate (default: the engine's rules, indices/<system>_<decks>d.json)")
+    args = parser.parse_args()
+
+    systems = SYSTEM_NAMES if args.all_systems else (args.system,)
+    single = not args.all_decks and not args.all_systems
+    for total_decks in (range(1, 9) if args.all_decks else [args.decks]):
+        rules = get_ruleset(args.rules, total_decks) if args.rules else None
+        stats = run_deviations(total_decks, args.shoes, args.penetration, args.stride,
+                               args.workers, args.seed, tc_resolution=args.tc_resolution,
+                               dealer_depth=args.dealer_depth, systems=systems, rules=rules)
+        for system in systems:
+            table = index_table(stats, total_decks, args.penetration, args.tc_resolution, system, rules)
+            path = args.output if args.output and single else index_table_path(total_decks, system, rules)
+            write_index_table(table, path)
+            print_report(table, stats.elapsed)
+            print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,946 @@
+"""
+Headless Blackjack engine with Omega II (or any other count_systems.py) card counting.
+
+The engine owns the shoe, the count and the round state, and advances a round
+one card/action event at a time. It never reads input or prints anything, so
+the console (main.py), the GUI (mainActivity.py) and offline analysis scripts
+can all drive the same rules, counting and strategy.
+
+Cards are integer ranks internally (cards.py): the shoe is a 13-slot
+composition list, the running counts of every count system one packed
+integer (count_systems.py), and dealing a card is one fused update of
+composition, running counts and cards remaining. The selected system drives
+the true count, the bet and the deviations. Rank strings
+are only parsed in feed_card()/add_card_to_dealt() and produced for display.
+
+Table rules come from a Ruleset (rules.py): soft 17, doubling after a
+split, how many hands a pair may be split into, resplitting aces, late
+surrender and the blackjack payout. The strategy table, dealer odds and EV
+solver are the ones for those rules.
+
+Every event (bet, card, action, insurance) is written to an undo journal
+together with the inverse of each change it made, so undo_last_action()
+reverses any event in constant time, however deep into the shoe. Each round
+also stores a checkpoint, which makes rewind_round() independent of how many
+events came before it.
+"""
+import math
+from collections import namedtuple
+
+from bet_ramp import DEFAULT_RAMP
+from cards import ACE, NUM_RANKS, RANK_NAMES, card_name, parse_card
+from count_systems import DEFAULT_SYSTEM, get_count_matrix
+from dealer_odds import OUTCOMES, get_dealer_odds, value_composition, value_slot
+from ev_solver import get_ev_solver
+from hand import Hand
+from rules import DEFAULT_RULES
+from strategy_table import get_strategy_table
+
+
+# ANSI Color codes for terminal output
+class Colors:
+    RED = '\033[91m'
+    GREEN = '\033[92m'
+    ORANGE = '\033[93m'
+    PURPLE = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    WHITE = '\033[97m'
+    BOLD = '\033[1m'
+    END = '\033[0m'
+
+    @staticmethod
+    def colorize(text, color):
+        return f"{color}{text}{Colors.END}"
+
+
+CARD_RANKS = list(RANK_NAMES)
+
+# Main player's balance at the start of a game
+STARTING_BALANCE = 1000
+
+# How precisely decks remaining are estimated for the true count
+TC_RESOLUTIONS = ('exact', 'half_deck', 'full_deck')
+
+# Display color of each strategy recommendation
+ACTION_COLORS = {
+    "HIT": Colors.RED,
+    "STAND": Colors.ORANGE,
+    "DOUBLE": Colors.GREEN,
+    "SPLIT": Colors.PURPLE,
+    "SURRENDER": Colors.BLUE,
+}
+
+ACTION_ALIASES = {
+    'h': 'hit', 'hit': 'hit',
+    's': 'stand', 'stand': 'stand',
+    'd': 'double', 'double': 'double',
+    'p': 'split', 'split': 'split',
+    'b': 'bust', 'bust': 'bust',
+    'r': 'surrender', 'surrender': 'surrender',
+}
+
+ORDINALS = ("first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth")
+
+# What the engine is waiting for next.
+# kind is 'card', 'action' (main player), 'other_action' or 'insurance';
+# target is a player name, a split hand key ("Player 1_hand1") or 'dealer'.
+Prompt = namedtuple('Prompt', ['kind', 'target', 'text'])
+
+# Strategy recommendation for the main player's current hand
+Decision = namedtuple('Decision', ['hand', 'cards', 'dealer_upcard', 'action', 'color',
+                                   'running_count', 'true_count', 'actions'])
+
+# Final outcome of a round; outcomes maps every hand key to determine_winner()
+Settlement = namedtuple('Settlement', ['round_number', 'dealer_cards', 'outcomes',
+                                       'payout', 'balance'])
+
+# One undoable event: kind is 'bet', 'card', 'action' or 'insurance'; flow is
+# the state machine before the event and ops the inverses of its changes
+JournalEntry = namedtuple('JournalEntry', ['kind', 'value', 'flow', 'ops'])
+
+# Shoe, count and money right after start_round(), for rewind_round()
+Checkpoint = namedtuple('Checkpoint', ['journal_length', 'shoe', 'counts', 'cards_remaining',
+                                       'cards_dealt', 'player_balance', 'current_bet'])
+
+# Something that happened while applying an event (turn, blackjack, bust,
+# split, dealt, decision, dealer_bust, dealer_stands, settlement)
+Notice = namedtuple('Notice', ['kind', 'target', 'data'])
+
+
+def normalize_card(card):
+    """Normalize a typed card (case, '1' for Ace); returns None if invalid"""
+    rank = parse_card(card)
+    return None if rank is None else card_name(rank)
+
+
+def normalize_action(action):
+    """Normalize a typed action (h/s/d/p/b or full word); returns None if invalid"""
+    return ACTION_ALIASES.get(str(action).lower().strip())
+
+
+def true_count_divisors(total_decks, resolution='exact'):
+    """Decks-remaining estimate used as the true count divisor, for 0..52*total_decks cards left"""
+    if resolution not in TC_RESOLUTIONS:
+        raise ValueError(f"Unknown true count resolution: {resolution}")
+    divisors = []
+    for cards in range(52 * total_decks + 1):
+        decks = cards / 52
+        if cards and resolution == 'half_deck':
+            decks = max(0.5, math.floor(decks * 2 + 0.5) / 2)
+        elif cards and resolution == 'full_deck':
+            decks = max(1, math.floor(decks + 0.5))
+        divisors.append(decks)
+    return divisors
+
+
+def ev_gap(evs, action):
+    """(best action by EV, EV lost by playing action instead)"""
+    best = max(evs, key=evs.get)
+    return best, evs[best] - evs[action]
+
+
+def hand_label(hand_key):
+    """Human readable name for a hand key ("Player 1_hand2" -> "Player 1 Hand 2")"""
+    if '_hand' in hand_key:
+        name, number = hand_key.rsplit('_hand', 1)
+        return f"{name} Hand {number}"
+    return hand_key
+
+
+class BlackjackEngine:
+    """Input-free game engine: explicit config in, card/action events in, decisions and settlements out"""
+
+    def __init__(self, total_decks, num_players, tc_resolution='exact', indices=None, bet_ramp=None,
+                 count_system=DEFAULT_SYSTEM, rules=None):
+        if rules is None:
+            rules = DEFAULT_RULES._replace(decks=total_decks)
+        elif rules.decks != total_decks:
+            raise ValueError(f"Ruleset is for {rules.decks} decks, not {total_decks}")
+        self.rules = rules
+        self.total_decks = total_decks
+        self.num_players = num_players
+        self.player_names = []
+
+        # Auto-generate player names
+        for i in range(self.num_players):
+            self.player_names.append(f"Player {i + 1}")
+
+        self.count_matrix = get_count_matrix()
+        self.packed_tags = self.count_matrix.packed     # every system's tag per rank index, packed
+        # Compiled for the rules, deviation indices default to DEFAULT_INDICES
+        self.strategy_table = get_strategy_table(indices, rules)
+        self.bet_ramp = bet_ramp or DEFAULT_RAMP
+        self.set_tc_resolution(tc_resolution)
+        self.set_count_system(count_system)
+        self.session_log = None     # SessionLog every event is appended to (session_log.py)
+        self.recommendation_cache = None    # RecommendationCache for action EVs (recommendation_cache.py)
+        self.reset_game()
+
+    def reset_game(self):
+        """Reset the game to initial state"""
+        if self.session_log is not None:
+            self.session_log.write('reset', 0)
+        if self.recommendation_cache is not None:
+            self.recommendation_cache.clear()
+        self.shoe = self.create_shoe()
+        self.cards_remaining = 52 * self.total_decks
+        self.cards_dealt = []
+        self.counts = self.count_matrix.zero     # packed running counts of every system
+        self._true_count = None     # cached; cleared whenever a card is dealt or undone
+        self.player_balance = STARTING_BALANCE
+        self.current_bet = 1
+        self.round_number = 0
+        self.game_history = []      # undo journal of JournalEntry
+        self.checkpoints = []       # one Checkpoint per round still in the journal
+        self._ops = []              # inverse operations of the event being applied
+
+        # Initialize player hands for each round
+        self.player_hands = {}
+        self.player_results = {}
+        for name in self.player_names:
+            self.player_hands[name] = Hand()
+            self.player_results[name] = "active"
+        self.dealer_cards = Hand()
+        self.insurance_taken = False
+        self.decision = None
+        self.settlement = None
+        self._reset_flow()
+
+    def _reset_flow(self):
+        """Clear the round state machine"""
+        self.phase = 'idle'     # idle, deal, insurance, play, hole, dealer, complete
+        self.prompt = None
+        self._deal_order = []
+        self._deal_pos = 0
+        self._seat = 0          # index of the player whose turn it is
+        self._hands = []        # hand keys the current player still has to play
+        self._hand_pos = 0
+        self._split_deal = []   # split hands still waiting for their second card
+        self._drawing = None    # 'hit' or 'double' while the drawn card is awaited
+        self._can_double = False
+        self._can_split = False
+        self._can_surrender = False
+
+    # ------------------------------------------------------------------
+    # Shoe and counting
+    # ------------------------------------------------------------------
+
+    def create_shoe(self):
+        """Composition of a full shoe: cards left per rank index"""
+        return [4 * self.total_decks] * NUM_RANKS
+
+    @property
+    def deck(self):
+        """Cards left per rank string (display view of the shoe)"""
+        return {RANK_NAMES[rank]: count for rank, count in enumerate(self.shoe)}
+
+    def deal_rank(self, rank):
+        """Remove one card of a rank from the shoe and count it; False if none are left"""
+        if self.shoe[rank] > 0:
+            self.shoe[rank] -= 1
+            self.counts += self.packed_tags[rank]
+            self.cards_remaining -= 1
+            self._true_count = None
+            self.cards_dealt.append(rank)
+            self._ops.append(('deal', rank))
+            return True
+        return False
+
+    def add_card_to_dealt(self, card):
+        """Add a card (rank string) to the dealt cards and update running count"""
+        rank = parse_card(card)
+        if rank is None:
+            return False
+        return self.add_rank_to_dealt(rank)
+
+    def add_rank_to_dealt(self, rank):
+        """Count a card seen outside the round (burn card, other table) given as a rank index"""
+        if self.shoe[rank] == 0:
+            return False
+        self._record('card', rank, logged='seen')
+        return self.deal_rank(rank)
+
+    # ------------------------------------------------------------------
+    # Undo journal
+    # ------------------------------------------------------------------
+
+    def _record(self, kind, value, logged=None):
+        """Open a journal entry for an event about to be applied (logged as `logged` or kind)"""
+        self._ops = []
+        self.game_history.append(JournalEntry(kind, value, self._save_flow(), self._ops))
+        if self.session_log is not None:
+            self.session_log.write(logged or kind, value)
+
+    def _save_flow(self):
+        # Flow lists are replaced, never mutated in place, so references are enough
+        return (self.phase, self.prompt, self._deal_order, self._deal_pos, self._seat, self._hands,
+                self._hand_pos, self._split_deal, self._drawing, self._can_double, self._can_split,
+                self._can_surrender, self.decision, self.insurance_taken)
+
+    def _restore_flow(self, flow):
+        (self.phase, self.prompt, self._deal_order, self._deal_pos, self._seat, self._hands,
+         self._hand_pos, self._split_deal, self._drawing, self._can_double, self._can_split,
+         self._can_surrender, self.decision, self.insurance_taken) = flow
+
+    def _set_result(self, key, result):
+        self._ops.append(('result', key, self.player_results.get(key)))
+        self.player_results[key] = result
+
+    def _revert(self, op):
+        """Apply the inverse of one journaled change"""
+        kind = op[0]
+        if kind == 'deal':
+            rank = op[1]
+            self.shoe[rank] += 1
+            self.counts -= self.packed_tags[rank]
+            self.cards_remaining += 1
+            self._true_count = None
+            self.cards_dealt.pop()
+        elif kind == 'append':
+            op[1].pop()
+        elif kind == 'result':
+            _, key, previous = op
+            if previous is None:
+                del self.player_results[key]
+            else:
+                self.player_results[key] = previous
+        elif kind == 'doubled':
+            op[1].doubled = False
+        elif kind == 'split':
+            _, key, cards, result, new_keys = op
+            for split_key in new_keys:
+                del self.player_hands[split_key]
+                del self.player_results[split_key]
+            self.player_hands[key] = cards
+            self.player_results[key] = result
+        elif kind == 'settle':
+            _, payout, settlement = op
+            self.player_balance -= payout
+            self.settlement = settlement
+        elif kind == 'round':
+            (_, self.round_number, self.current_bet, self.player_hands, self.player_results,
+             self.dealer_cards, self.settlement) = op
+
+    def undo_last_action(self):
+        """Reverse the last event (card, action, insurance or round start) in O(1)
+
+        Returns the undone JournalEntry, or None if there is nothing to undo.
+        """
+        if not self.game_history:
+            return None
+        entry = self.game_history.pop()
+        for op in reversed(entry.ops):
+            self._revert(op)
+        self._restore_flow(entry.flow)
+        if entry.kind == 'bet':
+            self.checkpoints.pop()
+        if self.session_log is not None:
+            self.session_log.write('undo', 0)
+        return entry
+
+    def rewind_round(self):
+        """Return to the start of the current round (bet placed, no cards dealt); False if no round"""
+        if not self.checkpoints:
+            return False
+        checkpoint = self.checkpoints[-1]
+        del self.game_history[checkpoint.journal_length:]
+        self.shoe = list(checkpoint.shoe)
+        self.counts = checkpoint.counts
+        self.cards_remaining = checkpoint.cards_remaining
+        self._true_count = None
+        del self.cards_dealt[checkpoint.cards_dealt:]
+        self.player_balance = checkpoint.player_balance
+        self.current_bet = checkpoint.current_bet
+        self._open_round()
+        if self.session_log is not None:
+            self.session_log.write('rewind', 0)
+        return True
+
+    def get_remaining_decks(self):
+        """Number of decks left in the shoe"""
+        return self.cards_remaining / 52
+
+    def set_tc_resolution(self, resolution):
+        """Choose how decks remaining are estimated: 'exact', 'half_deck' or 'full_deck'"""
+        self._tc_divisors = true_count_divisors(self.total_decks, resolution)
+        self.tc_resolution = resolution
+        self._true_count = None
+
+    def set_count_system(self, name):
+        """Choose the count system that drives the true count, bets and deviations"""
+        self.count_system = self.count_matrix.system(name)
+        self._system = self.count_matrix.index[name]
+        self._true_count = None
+
+    @property
+    def running_count(self):
+        """Running count of the selected system"""
+        return self.count_matrix.running_count(self.counts, self._system)
+
+    def get_running_counts(self):
+        """{system name: running count} for every count system"""
+        return dict(zip(self.count_matrix.names, self.count_matrix.running_counts(self.counts)))
+
+    def get_true_count(self):
+        """Calculate true count based on remaining decks (cached until the next card)"""
+        true_count = self._true_count
+        if true_count is None:
+            true_count = self._system_true_count(self._system)
+            self._true_count = true_count
+        return true_count
+
+    def get_true_counts(self):
+        """{system name: true count} for every count system"""
+        return {name: self._system_true_count(i) for i, name in enumerate(self.count_matrix.names)}
+
+    def _system_true_count(self, i):
+        matrix = self.count_matrix
+        return matrix.true_count(i, matrix.running_count(self.counts, i), self._tc_divisors[self.cards_remaining],
+                                 self.cards_remaining, self.shoe[ACE], self.total_decks)
+
+    def get_dealer_outcomes(self):
+        """Exact {17..21, 'bust', 'blackjack'} probabilities for the dealer's hand; None before the upcard"""
+        dealer = self.dealer_cards
+        if not len(dealer):
+            return None
+        composition = value_composition(self.shoe)
+        if len(dealer) == 1:
+            distribution = get_dealer_odds(self.rules.hit_soft_17).distribution(composition,
+                                                                                value_slot(dealer.ranks[0]))
+        else:
+            distribution = get_dealer_odds(self.rules.hit_soft_17).hand_distribution(composition, dealer.raw_total,
+                                                               dealer.aces, len(dealer))
+        return dict(zip(OUTCOMES, distribution))
+
+    def get_dealer_outcome_table(self):
+        """{upcard: outcome probabilities} for every upcard that could still be dealt"""
+        rows = get_dealer_odds(self.rules.hit_soft_17).all_upcards(value_composition(self.shoe))
+        return {('10' if slot == 9 else card_name(slot)): dict(zip(OUTCOMES, row))
+                for slot, row in rows.items()}
+
+    def get_deck_penetration(self):
+        """Calculate deck penetration percentage"""
+        total_cards = 52 * self.total_decks
+        cards_dealt = len(self.cards_dealt)
+        return (cards_dealt / total_cards) * 100
+
+    # ------------------------------------------------------------------
+    # Hand evaluation and strategy
+    # ------------------------------------------------------------------
+
+    def calculate_hand_value(self, cards):
+        """Calculate the value of a hand (O(1) for a Hand)"""
+        if isinstance(cards, Hand):
+            return cards.total
+
+        total = 0
+        aces = 0
+
+        for card in cards:
+            if card in ['J', 'Q', 'K']:
+                total += 10
+            elif card == 'A':
+                aces += 1
+                total += 11
+            else:
+                total += int(card)
+
+        # Adjust for aces
+        while total > 21 and aces > 0:
+            total -= 10
+            aces -= 1
+
+        return total
+
+    def is_soft_hand(self, cards):
+        """Check if hand is soft (contains ace counted as 11)"""
+        if isinstance(cards, Hand):
+            return cards.soft
+
+        total = 0
+        aces = 0
+
+        for card in cards:
+            if card in ['J', 'Q', 'K']:
+                total += 10
+            elif card == 'A':
+                aces += 1
+                total += 11
+            else:
+                total += int(card)
+
+        return total <= 21 and aces > 0
+
+    def get_basic_strategy(self, player_cards, dealer_upcard, can_double=True, can_split=False,
+                           can_surrender=False):
+        """Get basic strategy recommendation with count deviations (compiled table lookup)"""
+        action = self.strategy_table.recommend(player_cards, dealer_upcard, self.get_true_count(),
+                                               can_double, can_split, can_surrender)
+        return action, ACTION_COLORS[action]
+
+    def get_bet_amount(self):
+        """Bet for the current true count, read from the bet ramp"""
+        return self.bet_ramp.units(self.get_true_count(), self.player_balance)
+
+    def get_bet_reason(self):
+        """Explain the current bet size"""
+        return self.bet_ramp.reason(self.get_true_count())
+
+    def get_action_evs(self, decision=None):
+        """Composition-dependent EV (in bets) of each legal action for a Decision (default: the current one)"""
+        decision = decision or self.decision
+        if decision is None:
+            return None
+        hand = self.player_hands[decision.hand]
+        bet = self.current_bet
+        payout = self.hand_payout("blackjack", "blackjack") / bet
+        upcard = value_slot(self.dealer_cards.ranks[0])
+        can_double = "double" in decision.actions
+        can_split = "split" in decision.actions
+        surrender = -self.hand_payout("surrender", "surrender") / bet if "surrender" in decision.actions else None
+        cache = self.recommendation_cache
+        if cache is not None:
+            # Decision signature: everything the solver sees apart from the exact composition
+            key = (hand.raw_total, hand.aces, value_slot(hand.ranks[0]) if can_split else None, upcard,
+                   can_double, can_split, surrender, payout)
+            epoch = cache.epoch(self.get_true_count(), self.cards_remaining)
+            evs = cache.get(key, epoch)
+            if evs is not None:
+                return dict(evs)
+        evs = get_ev_solver(self.rules.hit_soft_17).action_evs(
+            value_composition(self.shoe), [value_slot(rank) for rank in hand.ranks], upcard, can_double, can_split,
+            payout, self.rules.double_after_split, surrender)
+        if cache is not None:
+            cache.put(key, evs)
+            return dict(evs)
+        return evs
+
+    def get_wonging_status(self):
+        """Provide wonging recommendation"""
+        true_count = self.get_true_count()
+
+        if true_count >= 2:
+            return "STAY - Favorable count detected!"
+        elif true_count >= 0:
+            return "NEUTRAL - Acceptable conditions"
+        else:
+            return "CONSIDER EXIT - Unfavorable count"
+
+    def determine_winner(self, player_cards, dealer_cards, player_action):
+        """Determine the winner of a hand"""
+        player_total = self.calculate_hand_value(player_cards)
+        dealer_total = self.calculate_hand_value(dealer_cards)
+
+        if player_action == "blackjack":
+            if len(dealer_cards) == 2 and dealer_total == 21:
+                return "push"
+            return "blackjack"
+
+        # Late surrender: void against a dealer blackjack
+        if player_action == "surrender":
+            if len(dealer_cards) == 2 and dealer_total == 21:
+                return "dealer"
+            return "surrender"
+
+        if player_total > 21:
+            return "dealer"
+
+        if dealer_total > 21:
+            return "player"
+
+        if player_total > dealer_total:
+            return "player"
+        elif dealer_total > player_total:
+            return "dealer"
+        else:
+            return "push"
+
+    def hand_payout(self, winner, player_action):
+        """Money won or lost on one of the main player's hands"""
+        bet = self.current_bet * (2 if player_action == "double" else 1)
+        if winner == "blackjack":
+            return int(bet * self.rules.blackjack_payout)  # 3:2 or 6:5, whole units
+        elif winner == "surrender":
+            return -(bet - bet // 2)    # half the bet, an odd unit goes to the house
+        elif winner == "player":
+            return bet
+        elif winner == "dealer":
+            return -bet
+        return 0
+
+    def hand_keys(self, player_name):
+        """Keys of a player's hands in player_hands (_hand1, _hand2, ... after splits)"""
+        if f"{player_name}_hand1" not in self.player_hands:
+            return [player_name]
+        keys = []
+        while f"{player_name}_hand{len(keys) + 1}" in self.player_hands:
+            keys.append(f"{player_name}_hand{len(keys) + 1}")
+        return keys
+
+    # ------------------------------------------------------------------
+    # Round state machine
+    # ------------------------------------------------------------------
+
+    def start_round(self):
+        """Begin a new round: reset hands, size the bet and wait for the first card"""
+        # Set bet (only for main player)
+        bet = self.get_bet_amount()
+        if self.session_log is not None:
+            self.session_log.begin_round(self)
+        self._record('bet', bet)
+        self._ops.append(('round', self.round_number, self.current_bet, self.player_hands,
+                          self.player_results, self.dealer_cards, self.settlement))
+        self.round_number += 1
+        self.current_bet = bet
+        self._open_round()
+        self.checkpoints.append(Checkpoint(len(self.game_history), list(self.shoe), self.counts,
+                                           self.cards_remaining, len(self.cards_dealt),
+                                           self.player_balance, self.current_bet))
+
+    def _open_round(self):
+        # Reset player hands for this round
+        self.player_hands = {}
+        self.player_results = {}
+        for name in self.player_names:
+            self.player_hands[name] = Hand()
+            self.player_results[name] = "active"
+        self.dealer_cards = Hand()
+        self.insurance_taken = False
+        self.decision = None
+        self.settlement = None
+
+        # Dealing order: first card to each player, second card to each player, dealer upcard
+        self._reset_flow()
+        self.phase = 'deal'
+        self._deal_order = self.player_names * 2 + ['dealer']
+        self._prompt_deal()
+
+    def feed(self, kind, value):
+        """Apply one input event of the given prompt kind; returns a list of Notices"""
+        if kind == 'card':
+            return self.feed_card(value)
+        elif kind in ('action', 'other_action'):
+            return self.feed_action(value)
+        elif kind == 'insurance':
+            return self.feed_insurance(value)
+        raise ValueError(f"Unknown event kind: {kind}")
+
+    def feed_card(self, card):
+        """Apply the next dealt card (typed rank string) to whichever hand is waiting for it"""
+        if self.prompt is None or self.prompt.kind != 'card':
+            raise ValueError("Not expecting a card right now")
+        rank = parse_card(card)
+        if rank is None:
+            raise ValueError("Invalid card. Enter: A/1, 2-10, J, Q, K")
+        return self.feed_rank(rank)
+
+    def feed_rank(self, rank):
+        """Apply the next dealt card given as a rank index"""
+        if self.prompt is None or self.prompt.kind != 'card':
+            raise ValueError("Not expecting a card right now")
+        if self.shoe[rank] == 0:
+            raise ValueError(f"No more {card_name(rank)}s in deck!")
+        self._record('card', rank)
+        self.deal_rank(rank)
+
+        notices = []
+        target = self.prompt.target
+        hand = self.dealer_cards if target == 'dealer' else self.player_hands[target]
+        hand.append(rank)
+        self._ops.append(('append', hand))
+        if self.phase == 'deal':
+            self._deal_pos += 1
+            if self._deal_pos < len(self._deal_order):
+                self._prompt_deal()
+            else:
+                notices.append(Notice('dealt', None, None))
+                if rank == ACE:
+                    self.phase = 'insurance'
+                    self.prompt = Prompt('insurance', self.player_names[0],
+                                         f"Dealer shows Ace. Take insurance for {self.player_names[0]}? (y/n): ")
+                else:
+                    self._begin_play(notices)
+        elif self.phase == 'play':
+            if self._split_deal:
+                self._split_deal = self._split_deal[1:]
+                if self._split_deal:
+                    self._prompt_split_card()
+                else:
+                    notices.append(Notice('split', self.player_names[self._seat], self._hands))
+                    self._start_hand(notices)
+            else:
+                drawing = self._drawing
+                self._drawing = None
+                if drawing == 'double':
+                    hand.doubled = True
+                    self._ops.append(('doubled', hand))
+                    self._set_result(target, "double")
+                    self._next_hand(notices)
+                else:
+                    self._can_double = False
+                    self._can_split = False
+                    self._can_surrender = False
+                    self._continue_hand(notices)
+        else:
+            self._continue_dealer(notices)
+        return notices
+
+    def feed_cards(self, ranks):
+        """Apply a sequence of dealt cards in dealing order; returns (notices, number of cards used)
+
+        The whole sequence is checked against the shoe before any card is
+        applied. Each card goes to whichever hand the card prompt is waiting
+        for; feeding stops at the first prompt that is not for a card (a
+        decision or insurance), leaving the rest of the sequence unused.
+        """
+        if self.prompt is None or self.prompt.kind != 'card':
+            raise ValueError("Not expecting a card right now")
+        needed = [0] * NUM_RANKS
+        for rank in ranks:
+            needed[rank] += 1
+        short = [card_name(rank) for rank in range(NUM_RANKS) if needed[rank] > self.shoe[rank]]
+        if short:
+            raise ValueError(f"Not enough {', '.join(short)} left in deck!")
+        notices = []
+        used = 0
+        for rank in ranks:
+            if self.prompt is None or self.prompt.kind != 'card':
+                break
+            notices.extend(self.feed_rank(rank))
+            used += 1
+        return notices, used
+
+    def feed_action(self, action):
+        """Apply the action taken on the hand currently being played"""
+        if self.prompt is None or self.prompt.kind not in ('action', 'other_action'):
+            raise ValueError("Not expecting an action right now")
+        main = self.prompt.kind == 'action'
+        key = self.prompt.target
+        name = self.player_names[self._seat]
+        choice = normalize_action(action)
+
+        if choice == "double":
+            valid = self._can_double or not main
+        elif choice == "split":
+            valid = self._can_split if main else key == name and len(self.player_hands[key]) == 2
+        elif choice == "surrender":
+            valid = self._can_surrender if main else (self.rules.late_surrender and key == name
+                                                      and len(self.player_hands[key]) == 2)
+        elif choice == "bust":
+            valid = not main
+        else:
+            valid = choice in ("hit", "stand")
+        if not valid:
+            if main:
+                raise ValueError("Invalid choice. Use: h/hit, s/stand, d/double, p/split")
+            elif key != name:
+                raise ValueError("Invalid action. Use: hit, stand, double, or bust")
+            raise ValueError("Invalid action. Use: h/hit, s/stand, d/double, p/split, b/bust")
+
+        self._record('action', choice)
+        notices = []
+        if choice == "hit":
+            self._drawing = 'hit'
+            self._prompt_draw(key)
+        elif choice == "stand":
+            self._set_result(key, "stand")
+            self._next_hand(notices)
+        elif choice == "double":
+            self._drawing = 'double'
+            self._prompt_draw(key)
+        elif choice == "split":
+            self._split(key)
+        elif choice == "surrender":
+            self._set_result(key, "surrender")
+            self._next_hand(notices)
+        else:
+            self._set_result(key, "bust")
+            self._next_hand(notices)
+        return notices
+
+    def feed_insurance(self, take):
+        """Record the insurance decision when the dealer shows an Ace"""
+        if self.prompt is None or self.prompt.kind != 'insurance':
+            raise ValueError("Not expecting an insurance decision right now")
+        if isinstance(take, str):
+            take = take.lower().strip() in ('y', 'yes')
+        self._record('insurance', bool(take))
+        self.insurance_taken = bool(take)
+        notices = []
+        self._begin_play(notices)
+        return notices
+
+    def _prompt_deal(self):
+        target = self._deal_order[self._deal_pos]
+        if target == 'dealer':
+            self.prompt = Prompt('card', 'dealer', "Enter dealer's upcard: ")
+        else:
+            nth = "first" if self._deal_pos < self.num_players else "second"
+            self.prompt = Prompt('card', target, f"Enter {target}'s {nth} card: ")
+
+    def _prompt_draw(self, key):
+        name = self.player_names[self._seat]
+        if self._seat == 0:
+            text = "Enter card received: "
+        elif key == name:
+            text = f"Enter card {name} received: "
+        else:
+            text = f"Enter card for {hand_label(key)}: "
+        self.prompt = Prompt('card', key, text)
+
+    def _prompt_split_card(self):
+        key = self._split_deal[0]
+        name = self.player_names[self._seat]
+        nth = ORDINALS[int(key.rsplit('_hand', 1)[1]) - 1]
+        if self._seat == 0:
+            text = f"Enter card for {name}'s {nth} hand: "
+        else:
+            text = f"Enter card for {name}'s {nth} split hand: "
+        self.prompt = Prompt('card', key, text)
+
+    def _begin_play(self, notices):
+        self.phase = 'play'
+        self._seat = -1
+        self._next_seat(notices)
+
+    def _next_seat(self, notices):
+        self._seat += 1
+        while self._seat < self.num_players:
+            name = self.player_names[self._seat]
+            notices.append(Notice('turn', name, None))
+
+            # Check for blackjack
+            if self.player_hands[name].total == 21:
+                self._set_result(name, "blackjack")
+                notices.append(Notice('blackjack', name, None))
+                self._seat += 1
+                continue
+
+            self._hands = [name]
+            self._hand_pos = 0
+            self._start_hand(notices)
+            return
+        self._begin_dealer()
+
+    def _start_hand(self, notices):
+        key = self._hands[self._hand_pos]
+        cards = self.player_hands[key]
+        if self._seat == 0:
+            # Split hands can also be dealt a natural 21
+            if len(cards) == 2 and cards.total == 21:
+                self._set_result(key, "blackjack")
+                notices.append(Notice('blackjack', key, None))
+                self._next_hand(notices)
+                return
+            rules = self.rules
+            self._can_double = len(cards) == 2 and (rules.double_after_split or not cards.split)
+            # Split again up to the ruleset's number of hands; split aces only if aces may be resplit
+            self._can_split = (cards.pair and len(self._hands) < rules.max_hands
+                               and (not cards.split or cards.ranks[0] != ACE or rules.resplit_aces))
+            self._can_surrender = rules.late_surrender and len(cards) == 2 and not cards.split
+        self._continue_hand(notices)
+
+    def _continue_hand(self, notices):
+        key = self._hands[self._hand_pos]
+        cards = self.player_hands[key]
+        if cards.busted:
+            self._set_result(key, "bust")
+            notices.append(Notice('bust', key, None))
+            self._next_hand(notices)
+            return
+
+        if self._seat == 0:
+            self.decision = self._make_decision(key)
+            notices.append(Notice('decision', key, self.decision))
+            self.prompt = Prompt('action', key, "Your choice (hit-h, stand-s, double-d, split-p): ")
+        elif key == self.player_names[self._seat]:
+            self.prompt = Prompt('other_action', key,
+                                 f"What did {key} do? (hit-h, stand-s, double-d, split-p, bust-b): ")
+        else:
+            self.prompt = Prompt('other_action', key,
+                                 f"What happened to {hand_label(key)}? (hit/stand/double/bust): ")
+
+    def _make_decision(self, key):
+        cards = self.player_hands[key]
+        action, color = self.get_basic_strategy(cards, self.dealer_cards.ranks[0],
+                                                self._can_double, self._can_split, self._can_surrender)
+        actions = ["hit", "stand"]
+        if self._can_double:
+            actions.append("double")
+        if self._can_split:
+            actions.append("split")
+        if self._can_surrender:
+            actions.append("surrender")
+        return Decision(key, cards.cards, self.dealer_cards[0], action, color,
+                        self.running_count, self.get_true_count(), actions)
+
+    def _next_hand(self, notices):
+        self.decision = None
+        self._hand_pos += 1
+        if self._hand_pos < len(self._hands):
+            self._start_hand(notices)
+        else:
+            self._next_seat(notices)
+
+    def _split(self, key):
+        cards = self.player_hands.pop(key)
+        result = self.player_results.pop(key)
+        if cards.split:
+            # Resplit: the hand keeps its key with the first card, the second card starts the next hand
+            name = key.rsplit('_hand', 1)[0]
+            first, second = key, f"{name}_hand{len(self._hands) + 1}"
+            self._hands = self._hands[:self._hand_pos + 1] + [second] + self._hands[self._hand_pos + 1:]
+        else:
+            first, second = f"{key}_hand1", f"{key}_hand2"
+            self._hands = [first, second]
+            self._hand_pos = 0
+        self._ops.append(('split', key, cards, result, [first, second]))
+        self.player_hands[first] = Hand(cards.ranks[:1], split=True)
+        self.player_hands[second] = Hand(cards.ranks[1:], split=True)
+        self.player_results[first] = "active"
+        self.player_results[second] = "active"
+        self._split_deal = [first, second]
+        self.decision = None
+        self._prompt_split_card()
+
+    def _begin_dealer(self):
+        self.phase = 'hole'
+        self.decision = None
+        self.prompt = Prompt('card', 'dealer', "Enter dealer's hole card: ")
+
+    def _continue_dealer(self, notices):
+        dealer_total = self.dealer_cards.total
+
+        if dealer_total > 21:
+            notices.append(Notice('dealer_bust', 'dealer', None))
+            self._settle(notices)
+        # Dealer hits on soft 17 under H17
+        elif dealer_total < 17 or (dealer_total == 17 and self.dealer_cards.soft and self.rules.hit_soft_17):
+            self.phase = 'dealer'
+            self.prompt = Prompt('card', 'dealer', "Enter dealer's next card: ")
+        else:
+            notices.append(Notice('dealer_stands', 'dealer', None))
+            self._settle(notices)
+
+    def _settle(self, notices):
+        outcomes = {}
+        for name in self.player_names:
+            for key in self.hand_keys(name):
+                outcomes[key] = self.determine_winner(self.player_hands[key], self.dealer_cards,
+                                                      self.player_results[key])
+
+        # Only the main player's money is tracked
+        total_payout = 0
+        for key in self.hand_keys(self.player_names[0]):
+            total_payout += self.hand_payout(outcomes[key], self.player_results[key])
+        self._ops.append(('settle', total_payout, self.settlement))
+        self.player_balance += total_payout
+
+        self.phase = 'complete'
+        self.prompt = None
+        self.settlement = Settlement(self.round_number, self.dealer_cards.cards, outcomes,
+                                     total_payout, self.player_balance)
+        if self.session_log is not None:
+            self.session_log.write('settle', total_payout)
+        notices.append(Notice('settlement', None, self.settlement))
@@ -0,0 +1,204 @@
+"""
+Composition-dependent expected value of each player action.
+
+For the player's actual hand, the dealer upcard and the cards left in the
+shoe, EVSolver returns the expected result of hitting, standing, doubling and
+splitting in units of the original bet, under the engine's rules:
+
+- the dealer always draws the hole card and hits soft 17, or stands on it
+  with a solver for hit_soft_17=False (dealer_odds.py);
+- a dealer two-card 21 only counts as 21, so it pushes a player 21;
+- doubling draws exactly one card for twice the bet;
+- one split only: each split hand starts from the pair card plus one drawn
+  card, may hit, stand or double (unless double_after_split is off), and a
+  two-card 21 on a split hand is paid as a blackjack (push against a dealer
+  two-card 21). Resplits allowed by a ruleset are not valued;
+- late surrender gives up the `surrender` fraction of the bet, or the whole
+  bet when the dealer turns out to have blackjack.
+
+Hit and double are solved by recursion over the cards the player draws,
+memoized on a compact integer code of the remaining composition plus the
+hand's total and soft flag. The dealer's outcome distribution is recomputed
+for the exact composition after each of the first dealer_depth player draws;
+deeper draws reuse the distribution of their ancestor at that depth, which
+keeps a decision within live-play latency while the removal effect of those
+extra cards is negligible. Split uses the usual post-split approximation:
+both hands are valued from the same composition.
+"""
+from dealer_odds import ACE_SLOT, BLACKJACK, BUST, NUM_SLOTS, SLOT_VALUES, get_dealer_odds
+
+# Bits per slot in a composition code (up to 255 cards of one value)
+_SLOT_BITS = 8
+_SLOT_UNIT = tuple(1 << (_SLOT_BITS * slot) for slot in range(NUM_SLOTS))
+
+
+def composition_code(composition):
+    """Pack a ten-slot composition into one integer; removing a card subtracts _SLOT_UNIT[slot]"""
+    code = 0
+    for slot, count in enumerate(composition):
+        code += count * _SLOT_UNIT[slot]
+    return code
+
+
+def stand_ev(total, dealer):
+    """EV of standing on a (non-blackjack) total against a dealer distribution"""
+    if total < 17:
+        return 2 * dealer[BUST] - 1
+    # Dealer blackjack is a plain 21 when comparing totals
+    by_total = [dealer[0], dealer[1], dealer[2], dealer[3], dealer[4] + dealer[BLACKJACK]]
+    index = total - 17
+    win = dealer[BUST] + sum(by_total[:index])
+    lose = sum(by_total[index + 1:])
+    return win - lose
+
+
+class EVSolver:
+    """Memoized hit/stand/double/split expected values"""
+
+    def __init__(self, dealer_odds=None, dealer_depth=1, max_entries=500000):
+        self.dealer_odds = dealer_odds or get_dealer_odds()
+        self.dealer_depth = dealer_depth
+        self.max_entries = max_entries
+        self._dealer = {}   # (code, upcard) -> dealer distribution
+        self._hit = {}      # (code, dealer code, total, soft, upcard) -> EV of hitting and playing on
+        self._double = {}   # (code, dealer code, total, soft, upcard) -> EV of doubling
+        self._counts = None
+        self._remaining = 0
+        self._upcard = 0
+
+    def action_evs(self, composition, hand, upcard, can_double=True, can_split=False, blackjack_payout=1.5,
+                   double_after_split=True, surrender=None):
+        """{'HIT', 'STAND', 'DOUBLE', 'SPLIT', 'SURRENDER': EV} for the legal actions
+
+        composition is the ten-slot shoe with the player's cards and the
+        upcard already removed; hand and upcard are value slots. surrender is
+        the fraction of the bet a surrender gives up, None when it is not
+        allowed.
+        """
+        if len(self._hit) + len(self._dealer) > self.max_entries:
+            self._dealer.clear()
+            self._hit.clear()
+            self._double.clear()
+        self._counts = list(composition)
+        self._remaining = sum(composition)
+        self._upcard = upcard
+        code = composition_code(composition)
+
+        total, soft = self._evaluate(sum(SLOT_VALUES[slot] for slot in hand), hand.count(ACE_SLOT))
+        dealer = self._dealer_distribution(code)
+        frozen = (code, dealer) if self.dealer_depth == 0 else None
+        evs = {
+            'HIT': self._hit_ev(code, total, soft, 0, frozen),
+            'STAND': stand_ev(total, dealer),
+        }
+        if can_double:
+            evs['DOUBLE'] = self._double_ev(code, total, soft, 0, frozen)
+        if can_split and len(hand) == 2 and hand[0] == hand[1]:
+            evs['SPLIT'] = self._split_ev(code, hand[0], blackjack_payout, frozen, double_after_split)
+        if surrender is not None:
+            evs['SURRENDER'] = -surrender * (1 - dealer[BLACKJACK]) - dealer[BLACKJACK]
+        return evs
+
+    @staticmethod
+    def _evaluate(raw_total, aces):
+        """(best total, an ace still counted as 11)"""
+        total = raw_total
+        while total > 21 and aces > 0:
+            total -= 10
+            aces -= 1
+        return total, aces > 0
+
+    def _dealer_distribution(self, code):
+        key = (code, self._upcard)
+        dealer = self._dealer.get(key)
+        if dealer is None:
+            dealer = self.dealer_odds.distribution(tuple(self._counts), self._upcard)
+            self._dealer[key] = dealer
+        return dealer
+
+    def _child_dealer(self, next_code, depth, frozen):
+        """(dealer distribution, frozen ancestor) after a draw that reaches depth + 1"""
+        if frozen is not None:
+            return frozen[1], frozen
+        dealer = self._dealer_distribution(next_code)
+        if self.dealer_depth is not None and depth + 1 >= self.dealer_depth:
+            return dealer, (next_code, dealer)
+        return dealer, None
+
+    def _draws(self, code, total, soft):
+        """Yield (probability, code, total, soft) for every next card, with the card removed from the shoe"""
+        counts = self._counts
+        remaining = self._remaining
+        for slot in range(NUM_SLOTS):
+            count = counts[slot]
+            if not count:
+                continue
+            if slot == ACE_SLOT:
+                new_total, new_soft = self._evaluate(total + 11, 1 + soft)
+            else:
+                new_total, new_soft = self._evaluate(total + SLOT_VALUES[slot], int(soft))
+            counts[slot] = count - 1
+            self._remaining = remaining - 1
+            yield count / remaining, code - _SLOT_UNIT[slot], new_total, new_soft
+            counts[slot] = count
+            self._remaining = remaining
+
+    def _hit_ev(self, code, total, soft, depth, frozen):
+        key = (code, total, soft, self._upcard, frozen and frozen[0])
+        ev = self._hit.get(key)
+        if ev is not None:
+            return ev
+        ev = 0.0
+        for p, next_code, next_total, next_soft in self._draws(code, total, soft):
+            if next_total > 21:
+                ev -= p
+                continue
+            dealer, child_frozen = self._child_dealer(next_code, depth, frozen)
+            value = stand_ev(next_total, dealer)
+            if next_total < 21:
+                value = max(value, self._hit_ev(next_code, next_total, next_soft, depth + 1, child_frozen))
+            ev += p * value
+        self._hit[key] = ev
+        return ev
+
+    def _double_ev(self, code, total, soft, depth, frozen):
+        key = (code, total, soft, self._upcard, frozen and frozen[0])
+        ev = self._double.get(key)
+        if ev is not None:
+            return ev
+        ev = 0.0
+        for p, next_code, next_total, _ in self._draws(code, total, soft):
+            if next_total > 21:
+                ev -= 2 * p
+            else:
+                dealer, _ = self._child_dealer(next_code, depth, frozen)
+                ev += 2 * p * stand_ev(next_total, dealer)
+        self._double[key] = ev
+        return ev
+
+    def _split_ev(self, code, pair_slot, blackjack_payout, frozen, double_after_split=True):
+        """Two hands, each started from the pair card and played optimally (no resplit)"""
+        start_total, start_soft = self._evaluate(SLOT_VALUES[pair_slot], int(pair_slot == ACE_SLOT))
+        ev = 0.0
+        for p, next_code, total, soft in self._draws(code, start_total, start_soft):
+            dealer, child_frozen = self._child_dealer(next_code, 0, frozen)
+            if total == 21:
+                # Two-card 21 on a split hand settles as a blackjack
+                hand_ev = (1 - dealer[BLACKJACK]) * blackjack_payout
+            else:
+                hand_ev = max(stand_ev(total, dealer), self._hit_ev(next_code, total, soft, 1, child_frozen))
+                if double_after_split:
+                    hand_ev = max(hand_ev, self._double_ev(next_code, total, soft, 1, child_frozen))
+            ev += p * hand_ev
+        return 2 * ev
+
+
+_ev_solvers = {}
+
+
+def get_ev_solver(hit_soft_17=True):
+    """Shared solver per soft 17 rule, so its caches are reused across decisions"""
+    solver = _ev_solvers.get(hit_soft_17)
+    if solver is None:
+        solver = _ev_solvers[hit_soft_17] = EVSolver(get_dealer_odds(hit_soft_17))
+    return solver
@@ -0,0 +1,136 @@
+"""
+Non-interactive JSON-lines mode for recorded play.
+
+Reads one event per line, in the card feed's message format (card_feed.py)
+without the table:
+
+    {"cards": "10 6 9"}      cards of the round in dealing order ("card": "K" for one)
+    {"action": "hit"}        the player's (or another seat's) action, "surrender" where the rules allow it
+    {"insurance": false}
+    {"seen": "5 6"}          cards counted outside any round
+    {"undo": true}           also "shuffle" (new shoe, the balance carries on)
+
+and writes one JSON line per decision point and per settled round:
+
+    {"type": "decision", "line": 12, "round": 3, "hand": "Player 1", "cards": ["10", "6"],
+     "dealer_upcard": "9", "recommendation": "HIT", "actions": [...], "running_count": 4,
+     "true_count": 0.8, "bet": 1, "wonging": "NEUTRAL - Acceptable conditions"}
+    {"type": "settlement", "line": 14, "round": 3, "outcomes": {...}, "payout": -1, "balance": 999,
+     "running_count": 5, "true_count": 1.0, "next_bet": 1, "wonging": "..."}
+
+A line that cannot be applied gives {"type": "error", "line": ..., "error": ...}
+and is skipped, and the run ends with one "summary" line. A round opens on
+its first card and cards sent past a decision are held until the next card
+is due. Input is read and output written one line at a time, and the
+engine's undo journal is dropped at every shuffle, so memory stays flat
+however many shoes are piped through.
+
+Usage:
+    python main.py --jsonl recorded.jsonl > decisions.jsonl
+    cat shoe*.jsonl | python main.py --jsonl - | downstream
+"""
+import json
+
+from card_feed import message_event
+from cards import card_name
+from count_systems import DEFAULT_SYSTEM
+from engine import BlackjackEngine
+from strategy_table import find_indices
+
+
+class EventStream:
+    """Engine driven by JSON-line events, producing JSON-ready records"""
+
+    def __init__(self, total_decks=6, num_players=1, count_system=DEFAULT_SYSTEM, rules=None):
+        indices = find_indices(total_decks, count_system, rules)
+        self.engine = BlackjackEngine(total_decks, num_players, indices=indices, count_system=count_system,
+                                      rules=rules)
+        self.pending = []       # cards held past a decision
+        self.events = 0
+        self.errors = 0
+
+    def apply(self, message):
+        """Apply one event message; returns the notices it produced (ValueError if it cannot be applied)"""
+        if not isinstance(message, dict):
+            raise ValueError("Expected one JSON object per line")
+        kind, value = message_event(message)
+        engine = self.engine
+        notices = []
+        if kind == 'deal':
+            if engine.prompt is None:
+                engine.start_round()
+            if engine.prompt.kind != 'card':
+                raise ValueError(engine.prompt.text.strip())
+            notices = self._deal(list(value))
+        elif kind in ('action', 'insurance'):
+            if engine.prompt is None:
+                raise ValueError("No round is waiting for a decision")
+            notices = engine.feed(engine.prompt.kind if kind == 'action' else 'insurance', value)
+            if self.pending and engine.prompt is not None and engine.prompt.kind == 'card':
+                held, self.pending = self.pending, []
+                notices += self._deal(held)
+        elif kind == 'cards':
+            # Checked as a whole first, so a bad sequence leaves the shoe untouched
+            for rank in set(value):
+                if value.count(rank) > engine.shoe[rank]:
+                    raise ValueError(f"Not enough {card_name(rank)} left in the shoe")
+            for rank in value:
+                engine.add_rank_to_dealt(rank)
+        elif kind == 'undo':
+            self.pending = []
+            engine.undo_last_action()
+        else:
+            self.pending = []
+            balance, round_number = engine.player_balance, engine.round_number
+            engine.reset_game()
+            engine.player_balance, engine.round_number = balance, round_number
+        self.events += 1
+        return notices
+
+    def _deal(self, ranks):
+        notices, used = self.engine.feed_cards(ranks)
+        self.pending = ranks[used:]
+        return notices
+
+    def records(self, notices, line_number):
+        """Output records for the decisions and settlements among notices"""
+        engine = self.engine
+        for notice in notices:
+            if notice.kind == 'decision':
+                decision = notice.data
+                yield {'type': 'decision', 'line': line_number, 'round': engine.round_number,
+                       'hand': decision.hand, 'cards': decision.cards, 'dealer_upcard': decision.dealer_upcard,
+                       'recommendation': decision.action, 'actions': decision.actions,
+                       'running_count': decision.running_count, 'true_count': decision.true_count,
+                       'bet': engine.current_bet, 'wonging': engine.get_wonging_status()}
+            elif notice.kind == 'settlement':
+                settlement = notice.data
+                yield {'type': 'settlement', 'line': line_number, 'round': settlement.round_number,
+                       'dealer_cards': settlement.dealer_cards, 'outcomes': settlement.outcomes,
+                       'payout': settlement.payout, 'balance': settlement.balance,
+                       'running_count': engine.running_count, 'true_count': engine.get_true_count(),
+                       'next_bet': engine.get_bet_amount(), 'wonging': engine.get_wonging_status()}
+
+    def run(self, lines):
+        """Records for an iterable of input lines, produced as each line is applied"""
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                notices = self.apply(json.loads(line))
+            except ValueError as e:
+                self.errors += 1
+                yield {'type': 'error', 'line': line_number, 'error': str(e)}
+                continue
+            yield from self.records(notices, line_number)
+        engine = self.engine
+        yield {'type': 'summary', 'events': self.events, 'errors': self.errors, 'rounds': engine.round_number,
+               'balance': engine.player_balance, 'round_open': engine.prompt is not None,
+               'unused_cards': len(self.pending)}
+
+
+def write_jsonl(records, output):
+    """Write each record as one JSON line as soon as it is produced"""
+    write = output.write
+    for record in records:
+        write(json.dumps(record) + "\n")
@@ -0,0 +1,104 @@
+"""
+Incrementally evaluated Blackjack hand.
+
+A Hand keeps its value, ace count, soft flag and pair flag up to date as each
+card is appended, so evaluating it is O(1) instead of re-scanning and
+re-parsing the card list. Cards are stored as integer ranks (see cards.py);
+for display and comparisons the hand still behaves like the list of rank
+strings it replaces (iteration, indexing, len, == against a list, list-style
+repr).
+"""
+from cards import ACE, RANK_INDEX, RANK_NAMES, RANK_VALUES
+
+
+class Hand:
+    """List-like hand with O(1) value/soft/pair queries"""
+
+    __slots__ = ('ranks', 'raw_total', 'aces', 'total', '_soft_aces', 'doubled', 'split')
+
+    def __init__(self, ranks=(), split=False):
+        self.ranks = []
+        self.raw_total = 0      # every ace counted as 11
+        self.aces = 0
+        self.total = 0          # best value, as calculate_hand_value()
+        self._soft_aces = 0     # aces still counted as 11 in total
+        self.doubled = False
+        self.split = split
+        for rank in ranks:
+            self.append(rank)
+
+    @classmethod
+    def from_names(cls, names, split=False):
+        """Build a hand from rank strings"""
+        return cls([RANK_INDEX[name] for name in names], split)
+
+    def append(self, rank):
+        """Add a card (rank index) and update the value in constant time"""
+        value = RANK_VALUES[rank]
+        self.ranks.append(rank)
+        self.raw_total += value
+        self.total += value
+        if rank == ACE:
+            self.aces += 1
+            self._soft_aces += 1
+        while self.total > 21 and self._soft_aces > 0:
+            self.total -= 10
+            self._soft_aces -= 1
+
+    def pop(self):
+        """Remove the last card (rank index) and restore the previous value"""
+        rank = self.ranks.pop()
+        self.raw_total -= RANK_VALUES[rank]
+        if rank == ACE:
+            self.aces -= 1
+        self.total = self.raw_total
+        self._soft_aces = self.aces
+        while self.total > 21 and self._soft_aces > 0:
+            self.total -= 10
+            self._soft_aces -= 1
+        return rank
+
+    @property
+    def cards(self):
+        """Rank strings of the hand"""
+        return [RANK_NAMES[rank] for rank in self.ranks]
+
+    @property
+    def soft(self):
+        """Same definition as is_soft_hand(): every ace can count as 11 without busting"""
+        return self.raw_total <= 21 and self.aces > 0
+
+    @property
+    def pair(self):
+        """Two cards of the same rank"""
+        return len(self.ranks) == 2 and self.ranks[0] == self.ranks[1]
+
+    @property
+    def busted(self):
+        return self.total > 21
+
+    def copy(self):
+        hand = Hand(self.ranks, self.split)
+        hand.doubled = self.doubled
+        return hand
+
+    def __len__(self):
+        return len(self.ranks)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [RANK_NAMES[rank] for rank in self.ranks[index]]
+        return RANK_NAMES[self.ranks[index]]
+
+    def __eq__(self, other):
+        if isinstance(other, Hand):
+            return self.ranks == other.ranks
+        return self.cards == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.cards)
@@ -1,13 +1,23 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
-import threading
-from main import BlackjackGame, Colors
-import sys
-from io import StringIO
+from tkinter import ttk, messagebox
+from cards import card_name, parse_card, parse_cards
+from count_systems import DEFAULT_SYSTEM, SYSTEM_NAMES, get_count_matrix
+from engine import BlackjackEngine, Colors, Notice, ev_gap, hand_label
+from profiling import ENGINE_PROBES, LatencyProbe, Profiler
+from recommendation_cache import RecommendationCache
+from render import Renderer
+from rules import RULESET_NAMES, get_ruleset
+from session_log import DEFAULT_LOG, ReplayError, read_header, resume_session, start_session
+from strategy_table import find_indices
+import argparse
 
 class BlackjackGUI:
-    def __init__(self, root):
+    def __init__(self, root, profile=False):
         self.root = root
+        # Hot-path timings and input latency, only collected with --profile
+        self.profiler = Profiler() if profile else None
+        self.latency = LatencyProbe(self.profiler) if profile else None
+        self.profile_window = None
         self.root.title("Blackjack with Omega II Card Counting")
         self.root.geometry("1400x900")
         self.root.minsize(1200, 800)  # Minimum size to ensure all components are visible
@@ -39,7 +49,6 @@ class BlackjackGUI:
         
         # Initialize game
         self.game = None
-        self.game_thread = None
         self.is_game_running = False
         
         # Create main interface
@@ -101,15 +110,35 @@ class BlackjackGUI:
         players_entry = tk.Entry(setup_frame, textvariable=self.players_var, width=10)
         players_entry.pack(anchor=tk.W, padx=5, pady=2)
         
+        tk.Label(setup_frame, text="Count System:", 
+                bg='#1a4d1a', fg='white').pack(anchor=tk.W, padx=5, pady=2)
+        self.system_var = tk.StringVar(value=DEFAULT_SYSTEM)
+        system_box = ttk.Combobox(setup_frame, textvariable=self.system_var, values=SYSTEM_NAMES,
+                                  state="readonly", width=14)
+        system_box.pack(anchor=tk.W, padx=5, pady=2)
+        
+        tk.Label(setup_frame, text="Table Rules:", 
+                bg='#1a4d1a', fg='white').pack(anchor=tk.W, padx=5, pady=2)
+        self.rules_var = tk.StringVar(value=RULESET_NAMES[0])
+        rules_box = ttk.Combobox(setup_frame, textvariable=self.rules_var, values=RULESET_NAMES,
+                                 state="readonly", width=14)
+        rules_box.pack(anchor=tk.W, padx=5, pady=2)
+        
         self.start_button = tk.Button(setup_frame, text="Start New Game", 
                                      command=self.start_new_game,
                                      bg='#4CAF50', fg='white', font=("Arial", 10, "bold"))
         self.start_button.pack(pady=10)
         
+        self.resume_button = tk.Button(setup_frame, text="Resume Last Session", 
+                                      command=self.resume_game,
+                                      bg='#1976d2', fg='white', font=("Arial", 10, "bold"))
+        self.resume_button.pack(pady=(0, 10))
+        
         # Count information section
         count_frame = tk.LabelFrame(left_scrollable, text="Omega II Count Info", 
                                    bg='#1a4d1a', fg='white', font=("Arial", 12, "bold"))
         count_frame.pack(fill=tk.X, padx=5, pady=5)
+        self.count_frame = count_frame
         
         self.running_count_label = tk.Label(count_frame, text="Running Count: 0", 
                                            bg='#1a4d1a', fg='yellow', font=("Arial", 11, "bold"))
@@ -127,6 +156,11 @@ class BlackjackGUI:
                                          bg='#1a4d1a', fg='yellow', font=("Arial", 11, "bold"))
         self.penetration_label.pack(anchor=tk.W, padx=5, pady=2)
         
+        # True count of every system on the same shoe
+        self.system_counts_label = tk.Label(count_frame, text="", justify=tk.LEFT,
+                                           bg='#1a4d1a', fg='#e0e0e0', font=("Arial", 9))
+        self.system_counts_label.pack(anchor=tk.W, padx=5, pady=2)
+        
         # Betting information
         betting_frame = tk.LabelFrame(left_scrollable, text="Betting Info", 
                                      bg='#1a4d1a', fg='white', font=("Arial", 12, "bold"))
@@ -153,6 +187,10 @@ class BlackjackGUI:
                                       bg='#1a4d1a', fg='white', font=("Arial", 14, "bold"))
         self.strategy_label.pack(padx=5, pady=10)
         
+        self.ev_label = tk.Label(strategy_frame, text="", justify=tk.LEFT,
+                                bg='#1a4d1a', fg='white', font=("Arial", 10))
+        self.ev_label.pack(padx=5, pady=(0, 10))
+        
         # Right panel - Game area (expandable)
         right_panel = tk.Frame(main_container, bg='#0d5d0d')
         right_panel.grid(row=1, column=1, sticky="nsew")
@@ -177,6 +215,10 @@ class BlackjackGUI:
                                           bg='#0d5d0d', fg='white', font=("Arial", 12))
         self.dealer_cards_label.pack()
         
+        self.dealer_odds_label = tk.Label(dealer_frame, text="", 
+                                         bg='#0d5d0d', fg='#ffeb3b', font=("Arial", 10))
+        self.dealer_odds_label.pack()
+        
         # Player areas with scrolling
         players_canvas = tk.Canvas(game_frame, bg='#0d5d0d', highlightthickness=0)
         players_scrollbar = ttk.Scrollbar(game_frame, orient="vertical", command=players_canvas.yview)
@@ -268,6 +310,7 @@ class BlackjackGUI:
         
         # Bind F1 for help
         self.root.bind('<F1>', lambda e: self.show_help())
+        self.root.bind('<F2>', lambda e: self.show_profile())
         
         # Status bar (fixed at bottom)
         self.status_label = tk.Label(self.root, text="Ready to start game", 
@@ -277,8 +320,6 @@ class BlackjackGUI:
         # Variables for game state
         self.waiting_for_input = False
         self.input_type = None
-        self.current_input = None
-        self.input_event = threading.Event()
         
         # Keyboard shortcuts
         self.root.bind('<h>', lambda e: self.submit_action("hit") if self.input_type in ["action", "other_action"] else None)
@@ -292,6 +333,35 @@ class BlackjackGUI:
         # Focus management
         self.root.focus_set()
         
+        self.setup_renderer()
+        
+    def setup_renderer(self):
+        """Register every label drawn from the game state; changes only mark them dirty"""
+        self.status_text = self.status_label.cget('text')
+        self.recommendation = None
+        self.action_evs = None
+        self.renderer = Renderer(self.root)
+        views = [
+            ('status', self.status_label, lambda: self.status_text),
+            ('counts', self.running_count_label, lambda: f"Running Count: {self.game.running_count}"),
+            ('counts', self.true_count_label, lambda: f"True Count: {self.game.get_true_count()}"),
+            ('counts', self.system_counts_label, self.render_system_counts),
+            ('counts', self.remaining_decks_label,
+             lambda: f"Remaining Decks: {self.game.get_remaining_decks():.1f}"),
+            ('counts', self.penetration_label, lambda: f"Deck Penetration: {self.game.get_deck_penetration():.1f}%"),
+            ('counts', self.wonging_label, lambda: f"Wonging: {self.game.get_wonging_status()}"),
+            ('money', self.balance_label, lambda: f"Balance: ${self.game.player_balance}"),
+            ('money', self.bet_label, lambda: f"Current Bet: ${self.game.current_bet}"),
+            ('dealer', self.dealer_cards_label, self.render_dealer_cards),
+            ('odds', self.dealer_odds_label, self.render_dealer_odds),
+            ('strategy', self.strategy_label, self.render_strategy),
+            ('strategy', self.ev_label, self.render_evs),
+        ]
+        for field, widget, render in views:
+            self.renderer.add(field, widget, render)
+        if self.latency is not None:
+            self.renderer.on_flush = self.latency.flushed
+        
     def start_new_game(self):
         """Start a new game with the specified parameters"""
         try:
@@ -306,33 +376,63 @@ class BlackjackGUI:
                 messagebox.showerror("Error", "Number of players must be between 1 and 6")
                 return
                 
-            # Create game instance
-            self.game = BlackjackGameGUI(num_decks, num_players, self)
-            
-            # Create player display areas
-            self.create_player_areas(num_players)
-            
-            # Update displays
-            self.update_displays()
-            
-            # Disable start button
-            self.start_button.config(state=tk.DISABLED)
-            
-            # Start game in separate thread
-            self.is_game_running = True
-            self.game_thread = threading.Thread(target=self.run_game_loop, daemon=True)
-            self.game_thread.start()
-            
-            self.update_status("Game started! Round 1 beginning...")
+            # Create game instance, logging every event so the session can be resumed
+            self.game = BlackjackGameGUI(num_decks, num_players, self, self.system_var.get(),
+                                         get_ruleset(self.rules_var.get(), num_decks))
+            start_session(self.game, DEFAULT_LOG)
+            self.launch_game("Game started! Round 1 beginning...")
             
         except ValueError:
             messagebox.showerror("Error", "Please enter valid numbers for decks and players")
     
+    def resume_game(self):
+        """Resume the session saved in the session log, mid-round if it was left mid-round"""
+        try:
+            header = read_header(DEFAULT_LOG)
+            self.game = BlackjackGameGUI(header.total_decks, header.num_players, self, header.count_system,
+                                         header.rules)
+            resume_session(self.game, DEFAULT_LOG)
+        except (OSError, ReplayError) as e:
+            messagebox.showerror("Error", f"Cannot resume the last session: {e}")
+            return
+        self.decks_var.set(str(header.total_decks))
+        self.players_var.set(str(header.num_players))
+        self.system_var.set(header.count_system)
+        for name in RULESET_NAMES:
+            if get_ruleset(name, header.total_decks) == header.rules:
+                self.rules_var.set(name)
+                break
+        self.launch_game(f"Resumed at round {self.game.round_number}")
+    
+    def launch_game(self, status):
+        """Show the game's table and start its loop"""
+        # Create player display areas
+        self.count_frame.config(text=f"{self.game.count_system.label} Count Info")
+        self.create_player_areas(self.game.num_players)
+        if self.profiler is not None:
+            self.profiler.uninstrument()
+            self.profiler.instrument(self.game, ENGINE_PROBES)
+            self.profiler.instrument(self.renderer, {'flush': 'flush'}, prefix='gui.')
+        
+        # Update displays
+        self.update_displays()
+        
+        # Disable start buttons
+        self.start_button.config(state=tk.DISABLED)
+        self.resume_button.config(state=tk.DISABLED)
+        
+        # The round runs on the Tk event loop: each input advances it directly
+        self.is_game_running = True
+        self.update_status(status)
+        self.game.play_round()
+    
     def create_player_areas(self, num_players):
         """Create display areas for all players"""
         # Clear existing player displays
         for widget in self.players_frame.winfo_children():
             widget.destroy()
+        for player_name in self.player_labels:
+            self.renderer.remove(player_name)
         self.player_labels.clear()
         
         # Create new player displays
@@ -376,75 +476,90 @@ class BlackjackGUI:
                 'value': value_label,
                 'result': result_label
             }
+            self.renderer.add(player_name, cards_label, lambda name=player_name: self.render_player(name)[0])
+            self.renderer.add(player_name, value_label, lambda name=player_name: self.render_player(name)[1])
+            self.renderer.add(player_name, result_label, lambda name=player_name: self.render_player(name)[2])
+    
+    def refresh(self, *fields):
+        """Mark display fields (all if none are given) as changed; they are redrawn on the next frame"""
+        if self.game:
+            self.renderer.invalidate(*fields)
     
     def update_displays(self):
-        """Update all display elements"""
+        """Redraw every display element now"""
         if not self.game:
             return
-            
-        # Update count information
-        self.running_count_label.config(text=f"Running Count: {self.game.running_count}")
-        self.true_count_label.config(text=f"True Count: {self.game.get_true_count()}")
-        
-        remaining_decks = sum(self.game.deck.values()) / 52
-        self.remaining_decks_label.config(text=f"Remaining Decks: {remaining_decks:.1f}")
-        
-        penetration = self.game.get_deck_penetration()
-        self.penetration_label.config(text=f"Deck Penetration: {penetration:.1f}%")
-        
-        # Update betting information
-        self.balance_label.config(text=f"Balance: ${self.game.player_balance}")
-        self.bet_label.config(text=f"Current Bet: ${self.game.current_bet}")
-        
-        wonging_status = self.game.get_wonging_status()
-        self.wonging_label.config(text=f"Wonging: {wonging_status}")
-        
-        # Update player hands
-        for player_name, labels in self.player_labels.items():
-            if player_name in self.game.player_hands:
-                cards = self.game.player_hands[player_name]
-                value = self.game.calculate_hand_value(cards)
-                labels['cards'].config(text=f"Cards: {cards}")
-                labels['value'].config(text=f"Value: {value}")
-                
-                # Update result
-                if player_name in self.game.player_results:
-                    result = self.game.player_results[player_name]
-                    if result != "active":
-                        labels['result'].config(text=f"Result: {result.upper()}")
-                    else:
-                        labels['result'].config(text="")
-            else:
-                # Check for split hands
-                if f"{player_name}_hand1" in self.game.player_hands:
-                    hand1 = self.game.player_hands[f"{player_name}_hand1"]
-                    hand2 = self.game.player_hands[f"{player_name}_hand2"]
-                    value1 = self.game.calculate_hand_value(hand1)
-                    value2 = self.game.calculate_hand_value(hand2)
-                    labels['cards'].config(text=f"Hand1: {hand1} | Hand2: {hand2}")
-                    labels['value'].config(text=f"Values: {value1} | {value2}")
-        
-        # Update dealer cards
-        if hasattr(self.game, 'dealer_cards') and self.game.dealer_cards:
-            dealer_value = self.game.calculate_hand_value(self.game.dealer_cards)
-            self.dealer_cards_label.config(text=f"Cards: {self.game.dealer_cards} (Value: {dealer_value})")
+        self.renderer.invalidate()
+        self.renderer.flush()
     
-    def update_strategy_display(self, action, color_name):
-        """Update the strategy recommendation display"""
+    def render_system_counts(self):
+        labels = {system.name: system.label for system in get_count_matrix().systems}
+        return "\n".join(f"{labels[name]}: {tc:+.2f}" for name, tc in self.game.get_true_counts().items())
+    
+    def render_player(self, player_name):
+        """Cards, value and result text of a player's seat"""
+        hands = self.game.player_hands
+        if player_name in hands:
+            cards = hands[player_name]
+            result = self.game.player_results.get(player_name, "active")
+            return (f"Cards: {cards}", f"Value: {self.game.calculate_hand_value(cards)}",
+                    f"Result: {result.upper()}" if result != "active" else "")
+        if f"{player_name}_hand1" in hands:
+            split_hands = [hands[key] for key in self.game.hand_keys(player_name)]
+            return (" | ".join(f"Hand{i}: {hand}" for i, hand in enumerate(split_hands, 1)),
+                    "Values: " + " | ".join(str(self.game.calculate_hand_value(hand)) for hand in split_hands), "")
+        return "Cards: []", "Value: 0", ""
+    
+    def render_dealer_cards(self):
+        cards = self.game.dealer_cards
+        if not cards:
+            return "Cards: []"
+        return f"Cards: {cards} (Value: {self.game.calculate_hand_value(cards)})"
+    
+    def render_dealer_odds(self):
+        """Exact dealer outcome odds from the live shoe"""
+        outcomes = self.game.get_dealer_outcomes()
+        if not outcomes:
+            return ""
+        return "  ".join(f"{str(outcome).upper()}: {p * 100:.1f}%" for outcome, p in outcomes.items() if p > 0)
+    
+    def render_strategy(self):
+        if self.recommendation is None:
+            return {'text': "No recommendation", 'fg': 'white'}
+        action, color_name = self.recommendation
         color_map = {
             'RED': '#f44336',
             'ORANGE': '#ff9800', 
             'GREEN': '#4CAF50',
             'PURPLE': '#9c27b0'
         }
-        color = color_map.get(color_name, 'white')
-        self.strategy_label.config(text=action, fg=color)
+        return {'text': action, 'fg': color_map.get(color_name, 'white')}
     
-    def wait_for_input(self, prompt, input_type="card"):
-        """Wait for user input (card or action)"""
+    def render_evs(self):
+        """Each action's composition-dependent EV and the gap to the chart action"""
+        if self.action_evs is None:
+            return ""
+        evs, action = self.action_evs
+        lines = [f"{name}: {ev:+.3f}" for name, ev in evs.items()]
+        best, gap = ev_gap(evs, action)
+        if best != action and gap > 0:
+            lines.append(f"EV favors {best} by {gap:+.3f}")
+        return "\n".join(lines)
+    
+    def update_strategy_display(self, action, color_name):
+        """Update the strategy recommendation display"""
+        self.recommendation = (action, color_name)
+        self.refresh('strategy')
+    
+    def update_ev_display(self, evs, action):
+        """Show each action's composition-dependent EV and the gap to the chart action"""
+        self.action_evs = (evs, action)
+        self.refresh('strategy')
+    
+    def show_prompt(self, prompt, input_type="card"):
+        """Ask for the next card or action; the answer is fed to the game when submitted"""
         self.waiting_for_input = True
         self.input_type = input_type
-        self.current_input = None
         
         self.update_status(prompt)
         self.card_prompt_label.config(text=prompt)
@@ -458,13 +573,20 @@ class BlackjackGUI:
         elif input_type == "other_action":
             self.enable_card_input()
             self.enable_action_buttons()  # Enable action buttons for other player actions too
-        
-        # Wait for input
-        self.input_event.clear()
-        self.input_event.wait()
-        
+        elif input_type == "insurance":
+            self.enable_card_input()
+            self.disable_action_buttons()
+    
+    def send_input(self, value):
+        """Feed one input to the game, which shows the next prompt or finishes the round"""
         self.waiting_for_input = False
-        return self.current_input
+        if self.latency is not None:
+            self.latency.start()
+        try:
+            self.game.submit(value)
+        except Exception as e:
+            messagebox.showerror("Game Error", str(e))
+            self.enable_new_game()
     
     def submit_card(self, event=None):
         """Submit card input with real-time validation and updates"""
@@ -478,33 +600,46 @@ class BlackjackGUI:
                 action_map = {'H': 'hit', 'S': 'stand', 'D': 'double', 'P': 'split', 'B': 'bust',
                              'HIT': 'hit', 'STAND': 'stand', 'DOUBLE': 'double', 'SPLIT': 'split', 'BUST': 'bust'}
                 if input_text in action_map:
-                    self.current_input = action_map[input_text]
                     self.card_entry.delete(0, tk.END)
-                    self.input_event.set()
+                    self.send_input(action_map[input_text])
                     return
                 else:
                     self.update_status("Invalid action. Use: h/hit, s/stand, d/double, p/split, b/bust")
                     self.card_entry.select_range(0, tk.END)
                     return
             
+            # Handle insurance answer when the dealer shows an Ace
+            if self.input_type == "insurance":
+                if input_text in ('Y', 'YES', 'N', 'NO'):
+                    self.card_entry.delete(0, tk.END)
+                    self.send_input(input_text.lower())
+                else:
+                    self.update_status("Take insurance? Enter y or n")
+                    self.card_entry.select_range(0, tk.END)
+                return
+            
+            # Bulk entry: a whole sequence of cards, dealt in order in one go
+            if self.input_type == "card" and len(input_text.replace(',', ' ').split()) > 1:
+                try:
+                    ranks = parse_cards(input_text)
+                except ValueError as e:
+                    self.update_status(str(e))
+                    self.card_entry.select_range(0, tk.END)
+                    return
+                self.card_entry.delete(0, tk.END)
+                self.send_input(ranks)
+                return
+            
             # Handle card input
-            card = input_text
             # Normalize card input for validation
-            normalized_card = card
-            if card == '1':
-                normalized_card = 'A'
-            elif card in ['J', 'Q', 'K']:
-                normalized_card = card.upper()
+            rank = parse_card(input_text)
             
             # Validate card before submitting
-            valid_cards = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
-            if normalized_card in valid_cards:
-                if self.game and normalized_card in self.game.deck and self.game.deck[normalized_card] > 0:
-                    self.current_input = normalized_card
+            if rank is not None:
+                normalized_card = card_name(rank)
+                if self.game and self.game.shoe[rank] > 0:
                     self.card_entry.delete(0, tk.END)
-                    # Update displays immediately after card submission
-                    self.root.after(100, self.update_displays)
-                    self.input_event.set()
+                    self.send_input(normalized_card)
                 else:
                     # Show error for cards not in deck
                     self.update_status(f"No more {normalized_card}s in deck!")
@@ -520,8 +655,7 @@ class BlackjackGUI:
             return
             
         if self.input_type == "action" or self.input_type == "other_action":
-            self.current_input = action
-            self.input_event.set()
+            self.send_input(action)
     
     def enable_card_input(self):
         """Enable card input controls"""
@@ -551,64 +685,65 @@ class BlackjackGUI:
         self.bust_button.config(state=tk.DISABLED)
     
     def undo_last(self):
-        """Undo last action"""
-        if self.game and hasattr(self.game, 'undo_last_action'):
-            self.game.undo_last_action()
-            self.update_displays()
+        """Undo last card or action; the game re-prompts from the restored state"""
+        if self.waiting_for_input:
+            self.send_input("UNDO")
     
     def restart_round(self):
-        """Restart current round"""
+        """Restart current round from its bet, before any card was dealt"""
         if self.waiting_for_input:
-            self.current_input = "restart"
-            self.input_event.set()
+            self.send_input("restart")
     
     def update_status(self, message):
         """Update status bar"""
-        self.status_label.config(text=message)
-    
-    def run_game_loop(self):
-        """Main game loop running in separate thread"""
-        try:
-            while self.is_game_running and self.game:
-                result = self.game.play_round()
-                
-                if result == "restart":
-                    self.root.after(0, self.update_status, "Round restarted")
-                    continue
-                
-                # Update displays after round
-                self.root.after(0, self.update_displays)
-                
-                # Ask if player wants to continue
-                self.root.after(0, self.show_continue_dialog)
-                
-                # Wait for continue decision
-                self.input_event.clear()
-                self.input_event.wait()
-                
-                if not self.current_input:
-                    break
-                    
-        except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Game Error", str(e)))
-        finally:
-            self.is_game_running = False
-            self.root.after(0, self.enable_new_game)
+        self.status_text = message
+        self.renderer.invalidate('status')
     
-    def show_continue_dialog(self):
-        """Show dialog asking if player wants to continue"""
-        result = messagebox.askyesno("Continue?", "Play another round?")
-        self.current_input = result
-        self.input_event.set()
+    def round_finished(self):
+        """Ask whether to play on once a round is settled"""
+        self.disable_card_input()
+        self.disable_action_buttons()
+        if self.is_game_running and messagebox.askyesno("Continue?", "Play another round?"):
+            self.game.play_round()
+        else:
+            self.enable_new_game()
     
     def enable_new_game(self):
         """Re-enable the start new game button"""
+        self.is_game_running = False
+        self.waiting_for_input = False
+        self.input_type = None
         self.start_button.config(state=tk.NORMAL)
+        self.resume_button.config(state=tk.NORMAL)
         self.disable_card_input()
         self.disable_action_buttons()
         self.update_status("Game ended. Ready to start new game.")
         # Reset strategy display
-        self.strategy_label.config(text="No recommendation", fg='white')
+        self.recommendation = None
+        self.action_evs = None
+        self.refresh('strategy')
+    
+    def show_profile(self):
+        """Show the live hot-path timings (with --profile), refreshed twice a second"""
+        if self.profiler is None:
+            self.update_status("Profiling is off; start with: python mainActivity.py --profile")
+            return
+        if self.profile_window is not None and self.profile_window.winfo_exists():
+            self.profile_window.lift()
+            return
+        self.profile_window = tk.Toplevel(self.root)
+        self.profile_window.title("Profile")
+        label = tk.Label(self.profile_window, justify=tk.LEFT, font=("Courier", 10), padx=10, pady=10)
+        label.pack()
+        
+        def refresh():
+            if self.profile_window is not None and self.profile_window.winfo_exists():
+                text = self.profiler.report()
+                if self.game is not None and self.game.recommendation_cache is not None:
+                    text += "\n\n" + self.game.recommendation_cache.report()
+                label.config(text=text)
+                self.profile_window.after(500, refresh)
+        refresh()
     
     def show_help(self):
         """Show help dialog with keyboard shortcuts and usage instructions"""
@@ -622,15 +757,18 @@ KEYBOARD SHORTCUTS:
 • P - Split (when choosing action)
 • B - Bust (for other players only)
 • Enter - Submit card input
-• Ctrl+Z - Undo last card
+• Ctrl+Z - Undo last card or action
 • Ctrl+R - Restart round
 • F1 - Show this help
+• F2 - Show timings (with --profile)
 
 CARD INPUT:
 • Enter cards as: A, 2-10, J, Q, K
 • Use '1' as alternative for Ace
 • Case insensitive
 • Press Enter to submit
+• Type a whole sequence (K 5 9 A 7) to deal several
+  cards at once, in dealing order
 
 OTHER PLAYER ACTIONS:
 • Type h/hit, s/stand, d/double, p/split, b/bust
@@ -650,246 +788,151 @@ STRATEGY COLORS:
 • Green = Double
 • Purple = Split
 
-The Omega II count system automatically tracks all cards
+The selected count system (Omega II by default) tracks all cards
 and provides optimal betting recommendations.
         """
         
         messagebox.showinfo("Blackjack GUI Help", help_text)
         
 
-class BlackjackGameGUI(BlackjackGame):
-    """Modified BlackjackGame class for GUI integration"""
+class BlackjackGameGUI(BlackjackEngine):
+    """Thin GUI front-end: feeds GUI input to the engine and renders its notices"""
     
-    def __init__(self, total_decks, num_players, gui):
-        self.total_decks = total_decks
-        self.num_players = num_players
+    def __init__(self, total_decks, num_players, gui, count_system=DEFAULT_SYSTEM, rules=None):
         self.gui = gui
-        self.player_names = []
-        
-        # Auto-generate player names
-        for i in range(self.num_players):
-            self.player_names.append(f"Player {i + 1}")
-        
-        self.omega_ii = {
-            '2': 1, '3': 1, '4': 2, '5': 2, '6': 2,
-            '7': 1, '8': 0, '9': -1, '10': -2,
-            'J': -2, 'Q': -2, 'K': -2, 'A': 0
-        }
-        self.reset_game()
-        
-        # For dealer cards tracking
-        self.dealer_cards = []
+        super().__init__(total_decks, num_players, indices=find_indices(total_decks, count_system, rules),
+                         count_system=count_system, rules=rules)
+        self.recommendation_cache = RecommendationCache()
+        # Rest of a bulk card entry, dealt at the next card prompts
+        self.pending_cards = []
     
-    def get_card_input(self, prompt):
-        """Get card input through GUI with real-time updates"""
-        while True:
-            card = self.gui.wait_for_input(prompt, "card")
-            
-            if card == 'RESTART':
-                return card
-            elif card == 'UNDO':
-                if self.undo_last_action():
-                    self.gui.root.after(0, self.gui.update_displays)
-                    continue
-                else:
-                    continue
-            elif card == 'UNDO+':
-                self.undo_multiple_moves()
-                self.gui.root.after(0, self.gui.update_displays)
-                continue
-            
-            # Normalize card input
-            if card == '1':
-                card = 'A'
-            elif card in ['J', 'Q', 'K']:
-                card = card.upper()
-            
-            valid_cards = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
-            if card in valid_cards:
-                if self.deck[card] > 0:
-                    # Update displays immediately after successful card input
-                    self.gui.root.after(0, self.gui.update_displays)
-                    return card
-                else:
-                    self.gui.root.after(0, lambda c=card: messagebox.showwarning("Invalid Card", f"No more {c}s in deck!"))
-            else:
-                self.gui.root.after(0, lambda: messagebox.showwarning("Invalid Card", "Enter: A/1, 2-10, J, Q, K"))
+    def play_round(self):
+        """Start a round (or pick up a resumed one) and show its first prompt"""
+        if self.prompt is None:
+            self.start_round()
+            self.gui.update_status(f"Round {self.round_number} - {self.get_bet_reason()}")
+        elif self.decision is not None:
+            self.show_notices([Notice('decision', self.decision.hand, self.decision)])
+        self.gui.refresh()
+        self.show_prompt()
     
-    def play_hand(self, player_cards, dealer_upcard, hand_name=""):
-        """Play a single hand with GUI integration"""
-        # Update displays
-        self.gui.root.after(0, self.gui.update_displays)
-        
-        # Check for blackjack
-        if len(player_cards) == 2 and self.calculate_hand_value(player_cards) == 21:
-            self.gui.root.after(0, self.gui.update_status, f"{hand_name}BLACKJACK!")
-            return player_cards, "blackjack"
-        
-        can_double = len(player_cards) == 2
-        can_split = len(player_cards) == 2 and player_cards[0] == player_cards[1]
-        
-        while True:
-            player_total = self.calculate_hand_value(player_cards)
-            
-            if player_total > 21:
-                self.gui.root.after(0, self.gui.update_status, f"{hand_name}BUST!")
-                return player_cards, "bust"
-            
-            # Get strategy recommendation
-            action, color = self.get_basic_strategy(player_cards, dealer_upcard, can_double, can_split)
-            
-            # Update strategy display
-            color_name = {
-                Colors.RED: 'RED',
-                Colors.ORANGE: 'ORANGE', 
-                Colors.GREEN: 'GREEN',
-                Colors.PURPLE: 'PURPLE'
-            }.get(color, 'WHITE')
-            
-            self.gui.root.after(0, self.gui.update_strategy_display, action, color_name)
-            self.gui.root.after(0, self.gui.update_displays)
-            
-            # Get player action
-            choice = self.gui.wait_for_input(f"{hand_name}Choose action (hit-h, stand-s, double-d, split-p):", "action")
-            
-            if choice == 'restart':
-                return player_cards, choice
-            
-            if choice == "hit":
-                card = self.get_card_input(f"{hand_name}Enter card received: ")
-                if card == 'RESTART':
-                    return player_cards, card.lower()
-                
-                if self.add_card_to_dealt(card):
-                    player_cards.append(card)
-                    can_double = False
-                    can_split = False
-                    self.gui.root.after(0, self.gui.update_displays)
-                
-            elif choice == "stand":
-                return player_cards, "stand"
-                
-            elif choice == "double" and can_double:
-                card = self.get_card_input(f"{hand_name}Enter card received: ")
-                if card == 'RESTART':
-                    return player_cards, card.lower()
-                
-                if self.add_card_to_dealt(card):
-                    player_cards.append(card)
-                    self.gui.root.after(0, self.gui.update_displays)
-                    return player_cards, "double"
-                
-            elif choice == "split" and can_split:
-                return player_cards, "split"
-                
+    def submit(self, value):
+        """Feed one GUI input to the engine, render what it changed and move to the next prompt
+
+        value is a card, action or insurance answer for the current prompt,
+        'UNDO', 'restart', or a list of ranks to deal in order (bulk entry).
+        """
+        prompt = self.prompt
+        if isinstance(value, list):
+            self.feed_card_sequence(value)
+        elif value in ('restart', 'RESTART'):
+            self.pending_cards = []
+            if self.rewind_round():
+                self.gui.update_status("Round restarted")
             else:
-                self.gui.root.after(0, lambda: messagebox.showwarning("Invalid Action", "Invalid choice"))
-    
-    def track_other_player_hand(self, player_name, dealer_upcard):
-        """Track other players' actions through GUI"""
-        current_hand = self.player_hands[player_name][:]
-        
-        while True:
-            hand_value = self.calculate_hand_value(current_hand)
-            self.gui.root.after(0, self.gui.update_displays)
-            
-            if hand_value > 21:
-                self.gui.root.after(0, self.gui.update_status, f"{player_name} BUST!")
-                self.player_results[player_name] = "bust"
-                break
-            
-            # Use "other_action" input type which allows text input for other players
-            action = self.gui.wait_for_input(f"What did {player_name} do? (h/s/d/p/b) or click action buttons:", "other_action")
-            
-            # Normalize action input
-            if action.lower() in ['h', 'hit']:
-                action = "hit"
-            elif action.lower() in ['s', 'stand']:
-                action = "stand"
-            elif action.lower() in ['d', 'double']:
-                action = "double"
-            elif action.lower() in ['p', 'split']:
-                action = "split"
-            elif action.lower() in ['b', 'bust']:
-                action = "bust"
-            elif action == 'restart':
-                return action
+                self.gui.update_status("Nothing to restart")
+            self.gui.refresh()
+        elif value == 'UNDO':
+            self.pending_cards = []
+            if self.undo_last_action() is None:
+                self.gui.update_status("Nothing to undo")
+            elif self.decision is not None:
+                self.show_notices([Notice('decision', self.decision.hand, self.decision)])
+            self.gui.refresh()
+        else:
+            try:
+                notices = self.feed(prompt.kind, value)
+            except ValueError as e:
+                messagebox.showwarning("Invalid Input", str(e))
             else:
-                self.gui.root.after(0, lambda: messagebox.showwarning("Invalid Action", "Use: h/hit, s/stand, d/double, p/split, b/bust"))
-                continue
-            
-            if action == "hit":
-                card = self.get_card_input(f"Enter card {player_name} received: ")
-                if card == 'RESTART':
-                    return card.lower()
-                self.add_card_to_dealt(card)
-                current_hand.append(card)
-                
-            elif action == "stand":
-                self.player_results[player_name] = "stand"
-                break
-                
-            elif action == "double":
-                card = self.get_card_input(f"Enter card {player_name} received: ")
-                if card == 'RESTART':
-                    return card.lower()
-                self.add_card_to_dealt(card)
-                current_hand.append(card)
-                self.player_results[player_name] = "double"
-                break
-                
-            elif action == "split":
-                return self.track_other_player_split(player_name, dealer_upcard)
-                
-            elif action == "bust":
-                self.player_results[player_name] = "bust"
-                break
-        
-        self.player_hands[player_name] = current_hand
-        return "continue"
+                self.show_notices(notices)
+                self.gui.refresh(*self.changed_fields(prompt, notices))
+        self.show_prompt()
     
-    def play_dealer_hand(self, dealer_cards):
-        """Play dealer's hand with GUI updates"""
-        self.dealer_cards = dealer_cards
-        self.gui.root.after(0, self.gui.update_displays)
-        self.gui.root.after(0, self.gui.update_status, "Dealer's turn")
-        
-        while True:
-            dealer_total = self.calculate_hand_value(dealer_cards)
-            
-            if dealer_total > 21:
-                self.gui.root.after(0, self.gui.update_status, "Dealer BUST!")
-                break
-            
-            # Dealer hits on soft 17
-            if dealer_total < 17 or (dealer_total == 17 and self.is_soft_hand(dealer_cards)):
-                card = self.get_card_input("Enter dealer's next card: ")
-                if card == 'RESTART':
-                    return dealer_cards, card.lower()
-                
-                if self.add_card_to_dealt(card):
-                    dealer_cards.append(card)
-                    self.dealer_cards = dealer_cards
-                    self.gui.root.after(0, self.gui.update_displays)
-            else:
-                self.gui.root.after(0, self.gui.update_status, "Dealer stands")
-                break
-        
-        return dealer_cards, "complete"
+    def feed_card_sequence(self, ranks):
+        """Deal a bulk card entry in one batch; cards past a decision wait for the next card prompt"""
+        try:
+            notices, used = self.feed_cards(ranks)
+        except ValueError as e:
+            self.gui.update_status(str(e))
+            return
+        self.show_notices(notices)
+        # Every seat may have changed: one full refresh, drawn in a single flush
+        self.gui.refresh()
+        self.pending_cards = ranks[used:]
+        if self.pending_cards and self.prompt is not None:
+            self.gui.update_status(f"{len(self.pending_cards)} card(s) held for after: {self.prompt.text.strip()}")
     
-    def add_card_to_dealt(self, card):
-        """Add a card to the dealt cards and update running count with immediate GUI updates"""
-        result = super().add_card_to_dealt(card)
-        if result:
-            # Immediately update the GUI displays
-            self.gui.root.after(0, self.gui.update_displays)
-        return result
+    def show_prompt(self):
+        """Ask the GUI for the engine's next input, deal held bulk cards, or finish the round"""
+        if self.prompt is None:
+            if self.pending_cards:
+                self.gui.update_status(f"Unused cards: {' '.join(card_name(rank) for rank in self.pending_cards)}")
+                self.pending_cards = []
+            self.gui.refresh()
+            self.gui.root.after(0, self.gui.round_finished)
+        elif self.prompt.kind == 'card' and self.pending_cards:
+            ranks, self.pending_cards = self.pending_cards, []
+            self.submit(ranks)
+        else:
+            self.gui.show_prompt(self.prompt.text, self.prompt.kind)
+    
+    def changed_fields(self, prompt, notices):
+        """Display fields that feeding the prompt's answer can have changed"""
+        fields = {'money', display_field(prompt.target)}
+        if prompt.kind == 'card':
+            fields.update(('counts', 'odds'))
+        for notice in notices:
+            if notice.kind == 'settlement':
+                fields.update(self.player_names)
+            elif notice.target is not None:
+                fields.add(display_field(notice.target))
+        return fields
+    
+    def show_notices(self, notices):
+        """Render engine notices in the GUI"""
+        for notice in notices:
+            if notice.kind == 'decision':
+                decision = notice.data
+                # Update strategy display
+                color_name = {
+                    Colors.RED: 'RED',
+                    Colors.ORANGE: 'ORANGE', 
+                    Colors.GREEN: 'GREEN',
+                    Colors.PURPLE: 'PURPLE'
+                }.get(decision.color, 'WHITE')
+                self.gui.update_strategy_display(decision.action, color_name)
+                self.gui.update_ev_display(self.get_action_evs(decision), decision.action)
+            elif notice.kind == 'blackjack':
+                self.gui.update_status(f"{hand_label(notice.target)} BLACKJACK!")
+            elif notice.kind == 'bust':
+                self.gui.update_status(f"{hand_label(notice.target)} BUST!")
+            elif notice.kind == 'dealer_bust':
+                self.gui.update_status("Dealer BUST!")
+            elif notice.kind == 'dealer_stands':
+                self.gui.update_status("Dealer stands")
+            elif notice.kind == 'settlement':
+                payout = notice.data.payout
+                self.gui.update_status(f"Round {notice.data.round_number} payout: {'+' if payout >= 0 else ''}${payout}")
+
+
+def display_field(target):
+    """Display field of a hand key: the dealer or the seat a (split) hand belongs to"""
+    if target == 'dealer':
+        return 'dealer'
+    return target.split('_')[0]
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Blackjack GUI with card counting")
+    parser.add_argument('--profile', action='store_true',
+                        help="time the hot paths and input latency (F2 shows them, printed on exit)")
+    args = parser.parse_args()
     root = tk.Tk()
-    app = BlackjackGUI(root)
+    app = BlackjackGUI(root, profile=args.profile)
     root.mainloop()
+    if app.profiler is not None:
+        print(app.profiler.report())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,157 @@
+"""
+Opt-in hot-path instrumentation with fixed-size latency histograms.
+
+A Profiler keeps one Histogram per probe. Histograms have a fixed number of
+log-spaced bins (BINS_PER_OCTAVE per doubling, from MIN_SECONDS up to about
+three seconds), so recording is a couple of integer operations and memory
+never grows however long the session runs; percentiles are read from the
+bins, accurate to a fraction of a bin.
+
+Probes are installed per object with instrument(): the named methods are
+replaced on that instance by timing wrappers, and uninstrument() deletes the
+wrappers again. Nothing is wrapped unless profiling is switched on, so the
+disabled path costs nothing at all.
+
+LatencyProbe measures the GUI's end-to-end latency: start() when a key or
+button submits input, flushed() from the renderer once the changed labels
+are on screen.
+
+Usage:
+    python main.py --profile            # report printed on exit
+    python mainActivity.py --profile    # F2 shows the live report
+"""
+import math
+import time
+
+MIN_SECONDS = 1e-7
+BINS_PER_OCTAVE = 4
+NUM_BINS = 100
+
+# Probe name -> engine method it times
+ENGINE_PROBES = {
+    'strategy': 'get_basic_strategy',
+    'true_count': 'get_true_count',
+    'count_update': 'deal_rank',
+    'dealer_play': '_continue_dealer',
+    'action_evs': 'get_action_evs',
+}
+
+
+class Histogram:
+    """Count, total, extremes and log-binned distribution of durations"""
+
+    def __init__(self):
+        self.bins = [0] * NUM_BINS
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds > MIN_SECONDS:
+            index = min(NUM_BINS - 1, int(math.log2(seconds / MIN_SECONDS) * BINS_PER_OCTAVE))
+        else:
+            index = 0
+        self.bins[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Upper edge of the bin holding percentile q (0-100), capped at the largest duration seen"""
+        if not self.count:
+            return None
+        target = self.count * q / 100
+        seen = 0
+        for index, count in enumerate(self.bins):
+            seen += count
+            if seen >= target and count:
+                if index == NUM_BINS - 1:
+                    # The last bin also holds everything longer
+                    return self.max
+                return min(self.max, MIN_SECONDS * 2 ** ((index + 1) / BINS_PER_OCTAVE))
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+class Profiler:
+    """Histograms of every probe, filled by instrumented methods and manual records"""
+
+    def __init__(self):
+        self.histograms = {}
+        self._installed = []
+
+    def histogram(self, name):
+        if name not in self.histograms:
+            self.histograms[name] = Histogram()
+        return self.histograms[name]
+
+    def record(self, name, seconds):
+        self.histogram(name).record(seconds)
+
+    def instrument(self, obj, probes, prefix=''):
+        """Time the methods of obj named in probes ({probe name: method name}) until uninstrument()"""
+        for name, attribute in probes.items():
+            method = getattr(obj, attribute)
+            histogram = self.histogram(prefix + name)
+            setattr(obj, attribute, _timed(method, histogram))
+            self._installed.append((obj, attribute))
+
+    def uninstrument(self):
+        """Remove every timing wrapper, leaving the recorded histograms"""
+        for obj, attribute in reversed(self._installed):
+            delattr(obj, attribute)
+        self._installed = []
+
+    def report(self):
+        """Table of calls, mean and percentiles per probe, in microseconds"""
+        lines = [f"{'Probe':<28} {'Calls':>8} {'Mean':>9} {'P50':>9} {'P95':>9} {'P99':>9} {'Max':>10}"]
+        for name, histogram in sorted(self.histograms.items()):
+            if not histogram.count:
+                continue
+            values = [histogram.mean(), histogram.percentile(50), histogram.percentile(95),
+                      histogram.percentile(99)]
+            lines.append(f"{name:<28} {histogram.count:>8} " + " ".join(f"{v * 1e6:>9.1f}" for v in values)
+                         + f" {histogram.max * 1e6:>10.1f}")
+        lines.append("(times in microseconds)")
+        return "\n".join(lines)
+
+
+def _timed(method, histogram):
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            histogram.record(time.perf_counter() - start)
+    return timed
+
+
+class LatencyProbe:
+    """Time from a submitted input to the first redraw, and to the redrawn recommendation"""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.started = None
+        self.first_flush = False
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.first_flush = True
+
+    def flushed(self, fields):
+        """Renderer callback: the dirty fields have just been drawn"""
+        if self.started is None:
+            return
+        elapsed = time.perf_counter() - self.started
+        if self.first_flush:
+            self.profiler.record('gui.input_to_screen', elapsed)
+            self.first_flush = False
+        if 'strategy' in fields:
+            self.profiler.record('gui.input_to_recommendation', elapsed)
+            self.started = None
@@ -0,0 +1,303 @@
+"""
+Bet-ramp optimizer working from cached per-bucket statistics.
+
+One simulation with a flat bet (simulator.play_shoe, so the engine's own
+rules and strategy) records, for every true count bucket matching the ramp
+steps of bet_ramp.py, how often it occurs and the mean and second moment of
+the result per unit bet. For any ramp the expected win and variance per
+round are then sums over nine buckets, so trying a ramp costs microseconds
+and a full search a few milliseconds. The bucket statistics are saved to
+disk with the simulation settings (decks, players, penetration, true count
+resolution, table rules, count system) and reused by later searches with other bankrolls, table limits
+or objectives; a cache collected under other settings is simulated again.
+
+Objectives:
+- 'win_rate': highest expected win per round whose risk of ruin for the
+  bankroll (exp(-2 * EV * bankroll / variance)) stays within max_ror;
+- 'score': highest certainty equivalent EV - variance / (2 * bankroll),
+  the per-round growth of a log-utility (Kelly) bettor.
+
+Usage:
+    python ramp_optimizer.py --decks 6 --shoes 20000 --bankroll 1000 --table-min 1 --table-max 10
+    python ramp_optimizer.py --decks 2 --rules s17-ls --bankroll 500
+    python ramp_optimizer.py --decks 6 --system hi_lo --output hi_lo_ramp.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from multiprocessing import Pool, cpu_count
+
+from bet_ramp import DEFAULT_RAMP, RAMP_BUCKETS, TOP_BUCKET, BetRamp, ramp_bucket, save_ramp
+from count_systems import DEFAULT_SYSTEM, SYSTEM_NAMES
+from engine import BlackjackEngine, TC_RESOLUTIONS
+from rules import DEFAULT_RULES, RULESET_NAMES, get_ruleset
+from simulator import build_shoe, play_shoe
+from strategy_table import find_indices
+
+OBJECTIVES = ('win_rate', 'score')
+
+# Flat bet used to collect bucket statistics (a multiple of 10, so 3:2, 6:5 and a surrender pay exactly)
+STATS_BET = 10
+
+
+class BucketStats:
+    """Per ramp bucket: [rounds, sum of result per unit bet, sum of squares]; mergeable across workers
+
+    outcomes keeps the full distribution ({result per unit bet: rounds}) of
+    each bucket for bankroll.py. Has the record(true_count, bet, payout) /
+    shoes interface of SimulationStats, so simulator.play_shoe can fill it
+    directly.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.shoes = 0
+        self.rows = [[0, 0.0, 0.0] for _ in range(RAMP_BUCKETS)]
+        self.outcomes = [{} for _ in range(RAMP_BUCKETS)]
+
+    def record(self, true_count, bet, payout):
+        bucket = ramp_bucket(true_count)
+        row = self.rows[bucket]
+        result = payout / bet
+        row[0] += 1
+        row[1] += result
+        row[2] += result * result
+        outcome = self.outcomes[bucket]
+        outcome[result] = outcome.get(result, 0) + 1
+
+    def merge(self, other):
+        """Fold another worker's totals into this one"""
+        self.shoes += other.shoes
+        for row, values in zip(self.rows, other.rows):
+            for i, value in enumerate(values):
+                row[i] += value
+        for outcome, counts in zip(self.outcomes, other.outcomes):
+            for result, count in counts.items():
+                outcome[result] = outcome.get(result, 0) + count
+
+    @property
+    def rounds(self):
+        return sum(row[0] for row in self.rows)
+
+    def moments(self):
+        """(frequency, mean, second moment) of the result per unit bet in every bucket"""
+        rounds = self.rounds
+        result = []
+        for n, total, total_sq in self.rows:
+            if n:
+                result.append((n / rounds, total / n, total_sq / n))
+            else:
+                result.append((0.0, 0.0, 0.0))
+        return result
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'config': self.config, 'shoes': self.shoes, 'rows': self.rows,
+                       'outcomes': [list(outcome.items()) for outcome in self.outcomes]}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        stats = cls(data['config'])
+        stats.shoes = data['shoes']
+        stats.rows = [list(row) for row in data['rows']]
+        if 'outcomes' in data:
+            stats.outcomes = [{result: count for result, count in outcome} for outcome in data['outcomes']]
+        return stats
+
+
+def simulate_buckets(args):
+    """Worker entry point: (total_decks, num_players, num_shoes, penetration, seed, tc_resolution, indices, rules,
+    count_system) -> stats"""
+    total_decks, num_players, num_shoes, penetration, seed, tc_resolution, indices, rules, count_system = args
+    rng = random.Random(seed)
+    flat = BetRamp([], STATS_BET, "Flat bet")
+    game = BlackjackEngine(total_decks, num_players, tc_resolution, indices, flat, count_system, rules)
+    stats = BucketStats()
+    for _ in range(num_shoes):
+        play_shoe(game, build_shoe(total_decks, rng), penetration, stats)
+    return stats
+
+
+def stats_config(total_decks=6, num_players=1, penetration=0.75, tc_resolution='exact', rules=None,
+                 count_system=DEFAULT_SYSTEM):
+    """Simulation settings bucket statistics are collected (and cached) under"""
+    rules = rules or DEFAULT_RULES._replace(decks=total_decks)
+    return {'decks': total_decks, 'players': num_players, 'penetration': penetration,
+            'tc_resolution': tc_resolution, 'rules': rules._asdict(), 'system': count_system}
+
+
+def load_cached_stats(path, config):
+    """BucketStats cached at path, or None if missing or collected under other settings"""
+    if not os.path.exists(path):
+        return None
+    stats = BucketStats.load(path)
+    return stats if stats.config == config else None
+
+
+def collect_bucket_stats(total_decks=6, num_players=1, num_shoes=10000, penetration=0.75,
+                         workers=None, seed=None, chunk_shoes=50, tc_resolution='exact', indices=None, rules=None,
+                         count_system=DEFAULT_SYSTEM):
+    """Flat-bet simulation of num_shoes shoes across a process pool, merged into BucketStats"""
+    workers = workers or cpu_count()
+    base_seed = seed if seed is not None else random.randrange(2 ** 32)
+
+    tasks = []
+    remaining = num_shoes
+    while remaining > 0:
+        count = min(chunk_shoes, remaining)
+        tasks.append((total_decks, num_players, count, penetration, base_seed + len(tasks), tc_resolution,
+                      indices, rules, count_system))
+        remaining -= count
+
+    totals = BucketStats(stats_config(total_decks, num_players, penetration, tc_resolution, rules, count_system))
+    if workers == 1:
+        for task in tasks:
+            totals.merge(simulate_buckets(task))
+    else:
+        with Pool(workers) as pool:
+            for stats in pool.imap_unordered(simulate_buckets, tasks):
+                totals.merge(stats)
+    return totals
+
+
+def ramp_metrics(units, moments, bankroll):
+    """EV, standard deviation, average bet, risk of ruin and score per round for bucket bets"""
+    ev = 0.0
+    second = 0.0
+    average_bet = 0.0
+    for bet, (frequency, mean, mean_sq) in zip(units, moments):
+        ev += frequency * bet * mean
+        second += frequency * bet * bet * mean_sq
+        average_bet += frequency * bet
+    variance = max(second - ev * ev, 1e-12)
+    ror = 1.0 if ev <= 0 else math.exp(-2 * ev * bankroll / variance)
+    return {
+        'ev_per_round': ev,
+        'std_dev': math.sqrt(variance),
+        'average_bet': average_bet,
+        'risk_of_ruin': ror,
+        'score': ev - variance / (2 * bankroll),
+    }
+
+
+def evaluate_ramp(ramp, stats, bankroll):
+    """ramp_metrics() for a BetRamp"""
+    return ramp_metrics(ramp.bucket_units(bankroll), stats.moments(), bankroll)
+
+
+def optimize_ramp(stats, bankroll, table_min, table_max, objective='score', max_ror=0.05, chip=None):
+    """Non-decreasing ramp of bets in [table_min, table_max] (multiples of chip) maximizing the objective
+
+    Coordinate ascent over the buckets, each bet searched between its
+    neighbours' bets so the ramp stays non-decreasing; every candidate is
+    scored from the cached bucket moments. With 'win_rate', when no ramp
+    gets within max_ror the least risky one found is returned.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}")
+    chip = chip or table_min
+    levels = sorted(set(list(range(table_min, table_max + 1, chip)) + [table_max]))
+    moments = stats.moments()
+
+    def value(units):
+        metrics = ramp_metrics(units, moments, bankroll)
+        if objective == 'score':
+            return metrics['score']
+        if metrics['risk_of_ruin'] > max_ror:
+            # Infeasible ramps rank below every feasible one, by how close they are to max_ror
+            return -1e9 + 2 * metrics['ev_per_round'] * bankroll / metrics['std_dev'] ** 2
+        return metrics['ev_per_round']
+
+    units = [table_min] * RAMP_BUCKETS
+    best = value(units)
+    improved = True
+    while improved:
+        improved = False
+        for bucket in range(RAMP_BUCKETS):
+            low = units[bucket - 1] if bucket else table_min
+            high = units[bucket + 1] if bucket < TOP_BUCKET else table_max
+            for bet in levels:
+                if bet < low or bet > high or bet == units[bucket]:
+                    continue
+                trial = units[:bucket] + [bet] + units[bucket + 1:]
+                trial_value = value(trial)
+                if trial_value > best + 1e-15:
+                    units, best = trial, trial_value
+                    improved = True
+    return BetRamp.from_units(units, table_min, table_max)
+
+
+def print_comparison(stats, bankroll, ramps):
+    """Print the metrics of each (name, ramp) side by side"""
+    print(f"{'Ramp':<10} {'EV/100':>9} {'SD/round':>9} {'Avg bet':>8} {'RoR':>8} {'Score/100':>10}")
+    for name, ramp in ramps:
+        metrics = evaluate_ramp(ramp, stats, bankroll)
+        print(f"{name:<10} {metrics['ev_per_round'] * 100:>+9.3f} {metrics['std_dev']:>9.3f} "
+              f"{metrics['average_bet']:>8.2f} {metrics['risk_of_ruin'] * 100:>7.2f}% "
+              f"{metrics['score'] * 100:>+10.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize a count system's bet ramp from simulated bucket statistics")
+    parser.add_argument('--decks', type=int, default=6, help="number of decks in the shoe")
+    parser.add_argument('--players', type=int, default=1, help="number of seats at the table")
+    parser.add_argument('--shoes', type=int, default=10000, help="shoes to simulate when no cached stats exist")
+    parser.add_argument('--penetration', type=float, default=0.75, help="fraction dealt before reshuffle")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=None, help="base random seed")
+    parser.add_argument('--tc-resolution', choices=TC_RESOLUTIONS, default='exact',
+                        help="decks-remaining estimate used for the true count")
+    parser.add_argument('--rules', choices=RULESET_NAMES, default='h17', help="table rules, rules.py")
+    parser.add_argument('--system', choices=SYSTEM_NAMES, default=DEFAULT_SYSTEM,
+                        help="count system whose true counts the ramp is bet on")
+    parser.add_argument('--stats', default=None,
+                        help="bucket statistics cache (default: ramp_stats_<decks>d.json); simulated if missing "
+                             "or collected with other settings")
+    parser.add_argument('--bankroll', type=int, default=1000, help="bankroll in betting units")
+    parser.add_argument('--table-min', type=int, default=1, help="table minimum bet")
+    parser.add_argument('--table-max', type=int, default=10, help="table maximum bet")
+    parser.add_argument('--objective', choices=OBJECTIVES, default='score', help="what the ramp maximizes")
+    parser.add_argument('--max-ror', type=float, default=0.05, help="risk of ruin allowed by 'win_rate'")
+    parser.add_argument('--output', default=None, help="write the proposed ramp to this JSON file")
+    args = parser.parse_args()
+
+    rules = get_ruleset(args.rules, args.decks)
+    path = args.stats or f"ramp_stats_{args.decks}d.json"
+    stats = load_cached_stats(path, stats_config(args.decks, args.players, args.penetration, args.tc_resolution,
+                                                 rules, args.system))
+    if stats is not None:
+        print(f"Using cached bucket statistics from {path} ({stats.rounds} rounds)")
+    else:
+        start = time.perf_counter()
+        stats = collect_bucket_stats(args.decks, args.players, args.shoes, args.penetration,
+                                     args.workers, args.seed, tc_resolution=args.tc_resolution,
+                                     indices=find_indices(args.decks, args.system, rules), rules=rules,
+                                     count_system=args.system)
+        stats.save(path)
+        print(f"Simulated {stats.rounds} rounds in {time.perf_counter() - start:.1f}s, saved to {path}")
+
+    start = time.perf_counter()
+    ramp = optimize_ramp(stats, args.bankroll, args.table_min, args.table_max, args.objective, args.max_ror)
+    elapsed = time.perf_counter() - start
+
+    print("=" * 60)
+    print(f"PROPOSED BET RAMP ({args.objective}, bankroll {args.bankroll}, "
+          f"table {args.table_min}-{args.table_max}, found in {elapsed * 1000:.1f} ms)")
+    print("=" * 60)
+    for frequency, (max_tc, units, reason) in zip([m[0] for m in stats.moments()], ramp.steps):
+        print(f"TC <= {max_tc:+d}: {units:>4}   {reason}   ({frequency * 100:.1f}% of rounds)")
+    print(f"TC  > {TOP_BUCKET - 1:+d}: {ramp.top_units:>4}   {ramp.top_reason}")
+    print("-" * 60)
+    print_comparison(stats, args.bankroll, [('default', DEFAULT_RAMP), ('proposed', ramp)])
+    if args.output:
+        save_ramp(ramp, args.output)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
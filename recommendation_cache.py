@@ -0,0 +1,89 @@
+"""
+Bounded LRU cache of recommendations keyed by decision signature.
+
+Within a shoe the same decision keeps coming back: the same hand total and
+softness (or pair) against the same upcard, with the same legal actions,
+at the same true count. The engine keeps the composition-dependent action
+EVs of recent decisions here, so a repeat is served with one dictionary
+lookup instead of another pass of the EV solver.
+
+Entries belong to an epoch: the true count bucket that decides every
+deviation (strategy_table.count_bucket) and the composition class, the
+number of whole CLASS_CARDS blocks left in the shoe. Crossing into another
+bucket or class drops every entry, so a cached answer is never older than
+CLASS_CARDS cards at the same count. At most max_entries decisions are
+kept; the least recently used one is evicted first.
+
+Usage:
+    engine.recommendation_cache = RecommendationCache()
+    engine.get_action_evs()                     # solved, then cached
+    print(engine.recommendation_cache.report())
+"""
+from collections import OrderedDict, namedtuple
+
+from strategy_table import count_bucket
+
+DEFAULT_SIZE = 256
+# Cards per composition class: half a deck, as the 'half_deck' true count resolution
+CLASS_CARDS = 26
+
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'evictions', 'invalidations', 'size', 'hit_rate'])
+
+
+class RecommendationCache:
+    """Least recently used recommendations of the current count bucket and composition class"""
+
+    def __init__(self, max_entries=DEFAULT_SIZE, class_cards=CLASS_CARDS):
+        self.max_entries = max_entries
+        self.class_cards = class_cards
+        self._entries = OrderedDict()
+        self._epoch = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def epoch(self, true_count, cards_remaining):
+        """(count bucket, composition class) the cached entries are valid for"""
+        return count_bucket(true_count), cards_remaining // self.class_cards
+
+    def get(self, key, epoch):
+        """Cached value for a decision signature in this epoch, or None (entries of another epoch are dropped)"""
+        if epoch != self._epoch:
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+            self._epoch = epoch
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store the value for a signature looked up with get() in the current epoch"""
+        self._entries[key] = value
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (new shoe, another count system or resolution)"""
+        self._entries.clear()
+        self._epoch = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return CacheStats(self.hits, self.misses, self.evictions, self.invalidations, len(self._entries),
+                          self.hits / lookups if lookups else 0.0)
+
+    def report(self):
+        stats = self.stats()
+        return (f"Recommendation cache: {stats.hits} hits, {stats.misses} misses ({stats.hit_rate:.1%} hit rate), "
+                f"{stats.evictions} evictions, {stats.invalidations} invalidations, "
+                f"{stats.size}/{self.max_entries} entries")
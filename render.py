@@ -0,0 +1,75 @@
+"""
+Dirty-tracked, frame-coalesced label rendering for the GUI.
+
+Every label the GUI keeps up to date is registered under a field name
+('counts', 'dealer', 'Player 2', ...) together with a function that returns
+its options (a text string or a dict of Label options). Changes to the game
+only mark fields dirty; the first mark schedules a flush on the Tk event loop
+and further marks before it runs are absorbed, so a burst of cards costs one
+redraw. A flush renders the dirty fields only, and configures a label only
+when its options differ from what it shows, so unchanged labels cause no
+Tk work at all.
+
+Flushes are at least FRAME_MS apart: marks arriving faster than that are
+drawn together on the next frame.
+"""
+import time
+
+# Minimum time between two flushes (about 60 frames per second)
+FRAME_MS = 16
+
+
+class Renderer:
+    """Registry of label views that redraws dirty fields at most once per frame"""
+
+    def __init__(self, root, frame_ms=FRAME_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.views = {}         # field -> [(widget, render)]
+        self.shown = {}         # widget -> options it was last configured with
+        self.dirty = set()
+        self.flushes = 0
+        # Called with the set of fields just drawn (the GUI's latency probe)
+        self.on_flush = None
+        self._pending = None
+        self._last_flush = -1.0
+
+    def add(self, field, widget, render):
+        """Draw widget from render() whenever field is marked dirty"""
+        self.views.setdefault(field, []).append((widget, render))
+
+    def remove(self, field):
+        """Forget a field's views (their widgets are being destroyed)"""
+        for widget, _ in self.views.pop(field, ()):
+            self.shown.pop(widget, None)
+        self.dirty.discard(field)
+
+    def invalidate(self, *fields):
+        """Mark fields (all of them if none are given) for the next frame"""
+        self.dirty.update(fields or self.views)
+        if self._pending is not None or not self.dirty:
+            return
+        wait = self._last_flush + self.frame_ms / 1000 - time.perf_counter()
+        self._pending = self.root.after(max(0, int(wait * 1000)), self.flush)
+
+    def flush(self):
+        """Redraw the dirty fields now; returns how many widgets were reconfigured"""
+        if self._pending is not None:
+            self.root.after_cancel(self._pending)
+            self._pending = None
+        dirty, self.dirty = self.dirty, set()
+        self._last_flush = time.perf_counter()
+        self.flushes += 1
+        changed = 0
+        for field in dirty:
+            for widget, render in self.views.get(field, ()):
+                options = render()
+                if isinstance(options, str):
+                    options = {'text': options}
+                if self.shown.get(widget) != options:
+                    widget.config(**options)
+                    self.shown[widget] = options
+                    changed += 1
+        if self.on_flush is not None:
+            self.on_flush(dirty)
+        return changed
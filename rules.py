@@ -0,0 +1,69 @@
+"""
+Table rules as one immutable Ruleset.
+
+A Ruleset fixes everything the engine, the strategy table and the EV solver
+need to know about a table: deck count, whether the dealer hits soft 17,
+doubling after a split, how many hands a pair may be split into, resplitting
+aces, late surrender and the blackjack payout (1.5 for 3:2, 1.2 for 6:5).
+DEFAULT_RULES are the rules the engine has always played: H17, DAS, one
+split, no surrender, 3:2.
+
+ruleset_key() is a short stable hash of the rules. The compiled strategy
+table of a ruleset is cached on disk under it (strategy_table.py), and so
+are deviation indices generated for it (deviations.py --rules).
+
+Usage:
+    python tables.py --rules downtown    # rules of every table
+    python main.py --jsonl shoe.jsonl --rules s17-ls
+"""
+import hashlib
+import json
+from collections import namedtuple
+
+# max_hands: hands a player may hold after splitting (2 = one split, 4 = resplit to four hands)
+Ruleset = namedtuple('Ruleset', ['decks', 'hit_soft_17', 'double_after_split', 'max_hands', 'resplit_aces',
+                                 'late_surrender', 'blackjack_payout'],
+                     defaults=(6, True, True, 2, False, False, 1.5))
+
+DEFAULT_RULES = Ruleset()
+
+# Named rulesets for the command line; the deck count comes from --decks
+RULESETS = {
+    'h17': DEFAULT_RULES,
+    's17': Ruleset(hit_soft_17=False),
+    's17-ls': Ruleset(hit_soft_17=False, max_hands=4, resplit_aces=True, late_surrender=True),
+    'h17-ls': Ruleset(max_hands=4, late_surrender=True),
+    'downtown': Ruleset(max_hands=4, late_surrender=False, blackjack_payout=1.2),
+    'no-das': Ruleset(double_after_split=False),
+}
+RULESET_NAMES = list(RULESETS)
+
+
+def ruleset_key(rules):
+    """Short stable hash of a ruleset (same rules, same key, in every process)"""
+    text = json.dumps(rules._asdict(), sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def get_ruleset(name, decks=None):
+    """Named ruleset, with the deck count replaced when given"""
+    if name not in RULESETS:
+        raise ValueError(f"Unknown ruleset {name}; choose from {', '.join(RULESET_NAMES)}")
+    rules = RULESETS[name]
+    return rules if decks is None else rules._replace(decks=decks)
+
+
+def describe(rules):
+    """Compact label such as '6D H17 DAS RSA LS 3:2 split to 4'"""
+    parts = [f"{rules.decks}D", "H17" if rules.hit_soft_17 else "S17"]
+    if rules.double_after_split:
+        parts.append("DAS")
+    if rules.resplit_aces:
+        parts.append("RSA")
+    if rules.late_surrender:
+        parts.append("LS")
+    parts.append("3:2" if rules.blackjack_payout == 1.5 else "6:5" if rules.blackjack_payout == 1.2
+                 else f"{rules.blackjack_payout}:1")
+    if rules.max_hands > 2:
+        parts.append(f"split to {rules.max_hands}")
+    return " ".join(parts)
@@ -0,0 +1,289 @@
+"""
+Append-only binary session log with a per-round index, for resume and replay.
+
+Every event the engine applies is appended to the log as one fixed 8-byte
+record (kind, int32 value): bets, cards dealt in the round, cards counted
+outside it, actions, insurance answers, undo/rewind/reset commands and the
+payout of every settled round. A second file, <log>.idx, gets one fixed-size
+entry per round: the byte offset of the round's bet record and a snapshot of
+the shoe and money taken just before it (the running counts of every system
+follow from the shoe). Both files are written
+unbuffered, so a crashed session loses at most a half-written record, which
+is cut off when the log is opened again.
+
+resume_session() restores the last snapshot and replays only the records
+after it, however long the session has been. replay() memory-maps a log and
+feeds every record to a fresh engine straight from struct.iter_unpack,
+checking the recorded bets and payouts against the engine's. The header
+records the table rules along with the shoe, so a session played under S17,
+late surrender or 6:5 replays and resumes under the same rules.
+
+Usage:
+    python session_log.py session.bjlog
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+from collections import namedtuple
+
+from cards import NUM_RANKS
+from count_systems import SYSTEM_NAMES
+from engine import TC_RESOLUTIONS, BlackjackEngine
+from rules import Ruleset, describe
+from strategy_table import find_indices
+
+MAGIC = b'BJLG'
+VERSION = 3
+DEFAULT_LOG = 'session.bjlog'
+
+# magic, version, decks, players, true count resolution (index in TC_RESOLUTIONS),
+# count system (index in SYSTEM_NAMES), then the Ruleset: hit soft 17, double after split,
+# max hands, resplit aces, late surrender, blackjack payout in thousandths
+HEADER = struct.Struct('<4sHHHHHBBBBBH')
+# kind, value
+RECORD = struct.Struct('<Bxxxi')
+# offset of the bet record, round number, balance, current bet, cards remaining, shoe
+INDEX_ENTRY = struct.Struct(f'<Q4i{NUM_RANKS}H')
+
+KINDS = ('bet', 'card', 'seen', 'action', 'insurance', 'undo', 'rewind', 'reset', 'settle')
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+(BET, CARD, SEEN, ACTION, INSURANCE, UNDO, REWIND, RESET, SETTLE) = range(len(KINDS))
+
+ACTIONS = ('hit', 'stand', 'double', 'split', 'bust', 'surrender')
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+SessionHeader = namedtuple('SessionHeader', ['total_decks', 'num_players', 'tc_resolution', 'count_system',
+                                             'rules'])
+
+# State right before a round's bet record
+RoundEntry = namedtuple('RoundEntry', ['offset', 'round_number', 'player_balance', 'current_bet',
+                                       'cards_remaining', 'shoe'])
+
+
+class ReplayError(ValueError):
+    """The log does not replay onto the engine it was given"""
+
+
+def index_path(path):
+    return path + '.idx'
+
+
+def read_header(path):
+    """SessionHeader of a log file"""
+    with open(path, 'rb') as f:
+        data = f.read(HEADER.size)
+    return _parse_header(data)
+
+
+def _parse_header(data):
+    if len(data) < HEADER.size:
+        raise ReplayError("Session log is too short to hold a header")
+    (magic, version, decks, players, resolution, system,
+     hit_soft_17, das, max_hands, resplit_aces, surrender, payout) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ReplayError("Not a blackjack session log (or written by another version)")
+    rules = Ruleset(decks, bool(hit_soft_17), bool(das), max_hands, bool(resplit_aces), bool(surrender),
+                    payout / 1000)
+    return SessionHeader(decks, players, TC_RESOLUTIONS[resolution], SYSTEM_NAMES[system], rules)
+
+
+def _trim(path, start, size):
+    """Cut a half-written record off the end of a file; returns its length"""
+    length = os.path.getsize(path)
+    whole = start + (length - start) // size * size
+    if whole != length:
+        with open(path, 'r+b') as f:
+            f.truncate(whole)
+    return whole
+
+
+class SessionLog:
+    """Writer for one session: appends records to the log and round entries to the index"""
+
+    def __init__(self, path, log_file, index_file):
+        self.path = path
+        self._log = log_file
+        self._index = index_file
+        self.offset = log_file.seek(0, os.SEEK_END)
+
+    @classmethod
+    def create(cls, path, engine):
+        """Start a new log (replacing any old one) for the engine's configuration"""
+        rules = engine.rules
+        log_file = open(path, 'wb', buffering=0)
+        log_file.write(HEADER.pack(MAGIC, VERSION, engine.total_decks, engine.num_players,
+                                   TC_RESOLUTIONS.index(engine.tc_resolution),
+                                   SYSTEM_NAMES.index(engine.count_system.name),
+                                   rules.hit_soft_17, rules.double_after_split, rules.max_hands,
+                                   rules.resplit_aces, rules.late_surrender,
+                                   round(rules.blackjack_payout * 1000)))
+        return cls(path, log_file, open(index_path(path), 'wb', buffering=0))
+
+    @classmethod
+    def append(cls, path):
+        """Reopen an existing log to continue writing it"""
+        _trim(path, HEADER.size, RECORD.size)
+        _trim(index_path(path), 0, INDEX_ENTRY.size)
+        return cls(path, open(path, 'ab', buffering=0), open(index_path(path), 'ab', buffering=0))
+
+    def write(self, kind, value):
+        """Append one event; value is a rank, bet, action, insurance answer or payout"""
+        if kind == 'action':
+            value = ACTION_CODES[value]
+        self._log.write(RECORD.pack(KIND_CODES[kind], int(value)))
+        self.offset += RECORD.size
+
+    def begin_round(self, engine):
+        """Index the round about to start: where its bet record goes and the state before it"""
+        self._index.write(INDEX_ENTRY.pack(self.offset, engine.round_number, engine.player_balance,
+                                           engine.current_bet, engine.cards_remaining, *engine.shoe))
+
+    def close(self):
+        self._log.close()
+        self._index.close()
+
+
+def start_session(engine, path=DEFAULT_LOG):
+    """Log every event of the engine to a new file at path"""
+    engine.session_log = SessionLog.create(path, engine)
+    return engine.session_log
+
+
+def read_index(path):
+    """RoundEntry of every round in the log's index"""
+    name = index_path(path)
+    if not os.path.exists(name):
+        return []
+    with open(name, 'rb') as f:
+        data = f.read()
+    data = data[:len(data) // INDEX_ENTRY.size * INDEX_ENTRY.size]
+    return [RoundEntry(*fields[:5], list(fields[5:])) for fields in INDEX_ENTRY.iter_unpack(data)]
+
+
+def restore_round(engine, entry):
+    """Put the engine in the state recorded just before a round's bet"""
+    engine.session_log = None
+    engine.reset_game()
+    engine.shoe = list(entry.shoe)
+    engine.counts = engine.count_matrix.count_shoe(engine.shoe, engine.total_decks)
+    engine.cards_remaining = entry.cards_remaining
+    engine._true_count = None
+    # Which cards left the shoe is known, the order they came out in is not
+    engine.cards_dealt = [rank for rank, count in enumerate(engine.shoe)
+                          for _ in range(4 * engine.total_decks - count)]
+    engine.round_number = entry.round_number
+    engine.player_balance = entry.player_balance
+    engine.current_bet = entry.current_bet
+
+
+def apply_record(engine, kind, value, verify=True):
+    """Apply one log record to the engine"""
+    if kind == CARD:
+        engine.feed_rank(value)
+    elif kind == ACTION:
+        engine.feed_action(ACTIONS[value])
+    elif kind == BET:
+        engine.start_round()
+        if verify and engine.current_bet != value:
+            raise ReplayError(f"Round {engine.round_number} bet {engine.current_bet}, log says {value}")
+    elif kind == SETTLE:
+        if verify and (engine.settlement is None or engine.settlement.payout != value):
+            raise ReplayError(f"Round {engine.round_number} payout differs from the log ({value})")
+    elif kind == SEEN:
+        engine.add_rank_to_dealt(value)
+    elif kind == INSURANCE:
+        engine.feed_insurance(bool(value))
+    elif kind == UNDO:
+        if BlackjackEngine.undo_last_action(engine) is None:
+            raise ReplayError("Log undoes an event from before the replay started")
+    elif kind == REWIND:
+        if not BlackjackEngine.rewind_round(engine):
+            raise ReplayError("Log rewinds a round from before the replay started")
+    elif kind == RESET:
+        engine.reset_game()
+    else:
+        raise ReplayError(f"Unknown record kind {kind}")
+
+
+def _replay_records(engine, data, start, end, verify=True):
+    """Apply the records in data[start:end] (a bytes-like or mmap); returns how many"""
+    view = memoryview(data)[start:end]
+    records = RECORD.iter_unpack(view)
+    try:
+        for kind, value in records:
+            apply_record(engine, kind, value, verify)
+    finally:
+        # The mmap cannot be closed while the iterator still holds the view
+        del records
+        view.release()
+    return (end - start) // RECORD.size
+
+
+def replay(path, engine=None, verify=True):
+    """Re-run a whole recorded session through an engine; returns (engine, records applied)"""
+    header = read_header(path)
+    if engine is None:
+        engine = BlackjackEngine(header.total_decks, header.num_players, header.tc_resolution,
+                                 indices=find_indices(header.total_decks, header.count_system, header.rules),
+                                 count_system=header.count_system, rules=header.rules)
+    engine.session_log = None
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        end = HEADER.size + (len(data) - HEADER.size) // RECORD.size * RECORD.size
+        count = _replay_records(engine, data, HEADER.size, end, verify)
+    return engine, count
+
+
+def resume_session(engine, path=DEFAULT_LOG):
+    """Continue a logged session: restore the last round snapshot, replay what followed, keep logging
+
+    The engine must have the log's configuration and rules (see read_header).
+    Undo reaches back to the start of the resumed round, not past it.
+    """
+    header = read_header(path)
+    if (engine.total_decks, engine.num_players) != header[:2] or engine.rules != header.rules:
+        raise ReplayError("Engine configuration does not match the session log")
+    engine.set_tc_resolution(header.tc_resolution)
+    engine.set_count_system(header.count_system)
+    log = SessionLog.append(path)
+    entries = [entry for entry in read_index(path) if entry.offset <= log.offset]
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        # A later snapshot can be too late when undos reached back past it; fall back to earlier ones
+        for entry in reversed([None] + entries):
+            if entry is None:
+                engine.session_log = None
+                engine.reset_game()
+                start = HEADER.size
+            else:
+                restore_round(engine, entry)
+                start = entry.offset
+            try:
+                _replay_records(engine, data, start, log.offset, verify=False)
+                break
+            except ReplayError:
+                if entry is None:
+                    raise
+    engine.session_log = log
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded blackjack session through the engine")
+    parser.add_argument('log', nargs='?', default=DEFAULT_LOG, help="session log file")
+    parser.add_argument('--no-verify', action='store_true', help="do not check bets and payouts against the log")
+    args = parser.parse_args()
+
+    header = read_header(args.log)
+    start = time.perf_counter()
+    engine, count = replay(args.log, verify=not args.no_verify)
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {count:,} events ({engine.round_number} rounds, {header.num_players} players, "
+          f"{describe(header.rules)}) in {elapsed * 1000:.1f} ms")
+    print(f"Balance: {engine.player_balance}  Running count: {engine.running_count}  "
+          f"True count: {engine.get_true_count()}  Cards remaining: {engine.cards_remaining}")
+
+
+if __name__ == "__main__":
+    main()
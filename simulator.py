@@ -0,0 +1,281 @@
+"""
+Monte Carlo shoe simulator for a count system's strategy and bet ramp.
+
+Every hand is played through BlackjackEngine, so the simulated rules,
+strategy (get_basic_strategy), bet sizing (get_bet_amount) and settlement
+(determine_winner) are exactly the ones used at the table. Shoes are spread
+across a process pool and the per-worker statistics are merged at the end.
+
+Usage:
+    python simulator.py --decks 6 --players 1 --shoes 2000 --workers 4
+    python simulator.py --decks 2 --shoes 2000 --rules s17-ls
+"""
+import argparse
+import math
+import random
+import time
+from multiprocessing import Pool, cpu_count
+
+from cards import NUM_RANKS
+from bet_ramp import load_ramp
+from count_systems import DEFAULT_SYSTEM, SYSTEM_NAMES, get_count_matrix
+from engine import BlackjackEngine, TC_RESOLUTIONS
+from rules import RULESET_NAMES, get_ruleset
+from strategy_table import find_indices, load_indices
+
+# True count buckets reported in the breakdown (counts beyond are clipped)
+MIN_TC_BUCKET = -6
+MAX_TC_BUCKET = 8
+
+
+def tc_bucket(true_count):
+    """Integer true count bucket used for the win rate breakdown"""
+    return max(MIN_TC_BUCKET, min(MAX_TC_BUCKET, math.floor(true_count)))
+
+
+def build_shoe(total_decks, rng):
+    """Shuffled list of every card (rank index) in the shoe"""
+    shoe = list(range(NUM_RANKS)) * (4 * total_decks)
+    rng.shuffle(shoe)
+    return shoe
+
+
+class SimulationStats:
+    """Running totals for the main player's rounds; mergeable across workers"""
+
+    def __init__(self):
+        self.rounds = 0
+        self.shoes = 0
+        self.total_bet = 0
+        self.total_payout = 0
+        self.total_payout_sq = 0
+        self.elapsed = 0.0
+        self.count_system = DEFAULT_SYSTEM
+        # bucket -> [rounds, wins, losses, pushes, payout]
+        self.by_true_count = {}
+        # count system -> [rounds, total bet, total payout, total payout squared] when systems are compared
+        self.by_system = {}
+
+    def record(self, true_count, bet, payout):
+        """Add one settled round"""
+        self.rounds += 1
+        self.total_bet += bet
+        self.total_payout += payout
+        self.total_payout_sq += payout * payout
+
+        bucket = self.by_true_count.setdefault(tc_bucket(true_count), [0, 0, 0, 0, 0])
+        bucket[0] += 1
+        if payout > 0:
+            bucket[1] += 1
+        elif payout < 0:
+            bucket[2] += 1
+        else:
+            bucket[3] += 1
+        bucket[4] += payout
+
+    def record_system(self, system, rounds, bet, payout, payout_sq):
+        """Add rounds bet by a compared count system"""
+        row = self.by_system.setdefault(system, [0, 0, 0, 0])
+        row[0] += rounds
+        row[1] += bet
+        row[2] += payout
+        row[3] += payout_sq
+
+    def merge(self, other):
+        """Fold another worker's totals into this one"""
+        self.rounds += other.rounds
+        self.shoes += other.shoes
+        self.total_bet += other.total_bet
+        self.total_payout += other.total_payout
+        self.total_payout_sq += other.total_payout_sq
+        for key, values in other.by_true_count.items():
+            bucket = self.by_true_count.setdefault(key, [0, 0, 0, 0, 0])
+            for i, value in enumerate(values):
+                bucket[i] += value
+        for system, values in other.by_system.items():
+            self.record_system(system, *values)
+
+    def ev_per_100(self):
+        """Expected units won per 100 rounds"""
+        return 100 * self.total_payout / self.rounds if self.rounds else 0.0
+
+    def std_dev(self):
+        """Standard deviation of a single round's result in units"""
+        if self.rounds < 2:
+            return 0.0
+        mean = self.total_payout / self.rounds
+        variance = self.total_payout_sq / self.rounds - mean * mean
+        return math.sqrt(max(variance, 0.0) * self.rounds / (self.rounds - 1))
+
+    def hands_per_second(self):
+        return self.rounds / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        """Machine readable summary of the run"""
+        breakdown = {}
+        for key in sorted(self.by_true_count):
+            rounds, wins, losses, pushes, payout = self.by_true_count[key]
+            breakdown[key] = {
+                'rounds': rounds,
+                'win_rate': wins / rounds,
+                'loss_rate': losses / rounds,
+                'push_rate': pushes / rounds,
+                'ev_per_round': payout / rounds,
+            }
+        systems = {}
+        for system, (rounds, bet, payout, payout_sq) in self.by_system.items():
+            mean = payout / rounds if rounds else 0.0
+            variance = payout_sq / rounds - mean * mean if rounds else 0.0
+            systems[system] = {
+                'ev_per_100': 100 * mean,
+                'std_dev': math.sqrt(max(variance, 0.0)),
+                'average_bet': bet / rounds if rounds else 0.0,
+                'win_rate': payout / bet if bet else 0.0,
+            }
+        return {
+            'count_system': self.count_system,
+            'rounds': self.rounds,
+            'shoes': self.shoes,
+            'ev_per_100': self.ev_per_100(),
+            'std_dev': self.std_dev(),
+            'average_bet': self.total_bet / self.rounds if self.rounds else 0.0,
+            'hands_per_second': self.hands_per_second(),
+            'by_true_count': breakdown,
+            'by_system': systems,
+        }
+
+
+def choose_other_action(game, prompt):
+    """Other seats play the same basic strategy (no insurance, no resplits)"""
+    cards = game.player_hands[prompt.target]
+    can_split = cards.pair and not cards.split
+    action, _ = game.get_basic_strategy(cards, game.dealer_cards[0], len(cards) == 2, can_split)
+    return action.lower()
+
+
+def play_shoe(game, shoe, penetration, stats):
+    """Play rounds from one shuffled shoe until the cut card is reached"""
+    cut_card = int(len(shoe) * penetration)
+    position = 0
+    game.reset_game()
+
+    while position < cut_card:
+        true_count = game.get_true_count()
+        game.start_round()
+        bet = game.current_bet
+
+        while game.prompt is not None:
+            prompt = game.prompt
+            if prompt.kind == 'card':
+                if position >= len(shoe):
+                    # Shoe ran dry mid-round: discard the unfinished round
+                    return
+                game.feed_rank(shoe[position])
+                position += 1
+            elif prompt.kind == 'action':
+                game.feed_action(game.decision.action.lower())
+            elif prompt.kind == 'other_action':
+                game.feed_action(choose_other_action(game, prompt))
+            else:
+                game.feed_insurance(False)
+
+        stats.record(true_count, bet, game.settlement.payout)
+    stats.shoes += 1
+
+
+def simulate_shoes(args):
+    """Worker entry point: (total_decks, num_players, num_shoes, penetration, seed, tc_resolution, indices, ramp,
+    count_system, rules)"""
+    total_decks, num_players, num_shoes, penetration, seed, tc_resolution, indices, ramp, count_system, rules = args
+    rng = random.Random(seed)
+    game = BlackjackEngine(total_decks, num_players, tc_resolution, indices, ramp, count_system, rules)
+    stats = SimulationStats()
+    stats.count_system = count_system
+    for _ in range(num_shoes):
+        play_shoe(game, build_shoe(total_decks, rng), penetration, stats)
+    return stats
+
+
+def run_simulation(total_decks=6, num_players=1, num_shoes=1000, penetration=0.75,
+                   workers=None, seed=None, chunk_shoes=50, tc_resolution='exact', indices=None, ramp=None,
+                   count_system=DEFAULT_SYSTEM, rules=None):
+    """Simulate num_shoes shoes across a process pool and return merged stats"""
+    workers = workers or cpu_count()
+    base_seed = seed if seed is not None else random.randrange(2 ** 32)
+
+    tasks = []
+    remaining = num_shoes
+    while remaining > 0:
+        count = min(chunk_shoes, remaining)
+        tasks.append((total_decks, num_players, count, penetration, base_seed + len(tasks), tc_resolution,
+                      indices, ramp, count_system, rules))
+        remaining -= count
+
+    start = time.perf_counter()
+    totals = SimulationStats()
+    totals.count_system = count_system
+    if workers == 1:
+        for task in tasks:
+            totals.merge(simulate_shoes(task))
+    else:
+        with Pool(workers) as pool:
+            for stats in pool.imap_unordered(simulate_shoes, tasks):
+                totals.merge(stats)
+    totals.elapsed = time.perf_counter() - start
+    return totals
+
+
+def print_report(stats):
+    """Print a human readable simulation report"""
+    summary = stats.summary()
+    print("=" * 60)
+    print(f"{get_count_matrix().system(stats.count_system).label.upper()} SIMULATION RESULTS")
+    print("=" * 60)
+    print(f"Shoes played:     {summary['shoes']}")
+    print(f"Rounds played:    {summary['rounds']}")
+    print(f"EV per 100 hands: {summary['ev_per_100']:+.3f} units")
+    print(f"Std dev / hand:   {summary['std_dev']:.3f} units")
+    print(f"Average bet:      {summary['average_bet']:.3f} units")
+    print(f"Hands per second: {summary['hands_per_second']:,.0f}")
+    print("-" * 60)
+    print(f"{'TC':>4} {'Rounds':>10} {'Win %':>8} {'Loss %':>8} {'Push %':>8} {'EV/round':>10}")
+    for key, row in summary['by_true_count'].items():
+        print(f"{key:>+4} {row['rounds']:>10} {row['win_rate'] * 100:>8.2f} {row['loss_rate'] * 100:>8.2f} "
+              f"{row['push_rate'] * 100:>8.2f} {row['ev_per_round']:>+10.4f}")
+    if summary['by_system']:
+        print("-" * 60)
+        print("Every system betting on the same hands:")
+        print(f"{'System':>14} {'EV/100':>10} {'SD':>8} {'Avg bet':>8} {'Win rate':>9}")
+        for system, row in summary['by_system'].items():
+            print(f"{system:>14} {row['ev_per_100']:>+10.3f} {row['std_dev']:>8.3f} {row['average_bet']:>8.3f} "
+                  f"{row['win_rate'] * 100:>8.2f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of a card counting strategy")
+    parser.add_argument('--decks', type=int, default=6, help="number of decks in the shoe")
+    parser.add_argument('--players', type=int, default=1, help="number of seats at the table")
+    parser.add_argument('--shoes', type=int, default=1000, help="number of shoes to simulate")
+    parser.add_argument('--penetration', type=float, default=0.75, help="fraction dealt before reshuffle")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=None, help="base random seed")
+    parser.add_argument('--tc-resolution', choices=TC_RESOLUTIONS, default='exact',
+                        help="decks-remaining estimate used for the true count")
+    parser.add_argument('--indices', default=None, help="deviation index table from deviations.py")
+    parser.add_argument('--ramp', default=None, help="bet ramp JSON from ramp_optimizer.py")
+    parser.add_argument('--system', choices=SYSTEM_NAMES, default=DEFAULT_SYSTEM,
+                        help="count system driving bets and deviations")
+    parser.add_argument('--rules', choices=RULESET_NAMES, default='h17', help="table rules, rules.py")
+    args = parser.parse_args()
+
+    rules = get_ruleset(args.rules, args.decks)
+    indices = load_indices(args.indices) if args.indices else find_indices(args.decks, args.system, rules)
+    ramp = load_ramp(args.ramp) if args.ramp else None
+    stats = run_simulation(args.decks, args.players, args.shoes, args.penetration, args.workers, args.seed,
+                           tc_resolution=args.tc_resolution, indices=indices, ramp=ramp,
+                           count_system=args.system, rules=rules)
+    print_report(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+"""
+Compiled Omega II strategy table.
+
+chart_strategy() is the basic strategy chart with Omega II deviations as an
+if/elif chain. It is compiled once into a dense table indexed by
+(hard/soft/pair state, total, dealer upcard, can_double, can_split,
+true count bucket), so a recommendation at the table or in a simulator is a
+single indexed read. Every deviation compares the true count with an integer
+index, so floor(true count) clipped to [MIN_BUCKET, MAX_BUCKET] reproduces
+the chart exactly for any index in [MIN_BUCKET + 1, MAX_BUCKET].
+
+The deviation indices are data: DEFAULT_INDICES holds the published values,
+and an index table generated by deviations.py for a specific deck count and
+count system (and optionally ruleset) can be loaded with load_indices() and
+compiled instead.
+
+The table rules (rules.py) change the chart: without doubling after a split
+fewer pairs are split, and with late surrender a second table marks the hard
+two-card hands to surrender, including the extra H17 surrenders and the
+SURRENDER_INDICES count plays. A compiled table is written to CACHE_DIR
+under a hash of its ruleset, indices and TABLE_VERSION, so each ruleset is
+compiled once and every later process or table with the same rules only
+reads it back.
+"""
+import hashlib
+import json
+import math
+import os
+
+from cards import RANK_NAMES, RANK_VALUES
+from count_systems import DEFAULT_SYSTEM
+from hand import Hand
+from rules import DEFAULT_RULES, ruleset_key
+
+HARD, SOFT, PAIR = 0, 1, 2
+NUM_STATES = 3
+NUM_TOTALS = 22            # 0..21 (pair state stores the pair's rank index here)
+NUM_DEALER = 10            # dealer values 2..11
+MIN_BUCKET = -6
+MAX_BUCKET = 8
+NUM_BUCKETS = MAX_BUCKET - MIN_BUCKET + 1
+
+ACTIONS = ["HIT", "STAND", "DOUBLE", "SPLIT", "SURRENDER"]
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+PAIR_RANKS = list(RANK_NAMES)     # pair index == rank index
+PAIR_INDEX = {card: i for i, card in enumerate(PAIR_RANKS)}
+
+# Deviation name -> true count at or above which the deviation is played
+DEFAULT_INDICES = {
+    'TTv5': 5,     # split 10s vs 5
+    'TTv6': 5,     # split 10s vs 6
+    '16v10': 0,    # stand 16 vs 10
+    '16v9': 5,     # stand 16 vs 9
+    '15v10': 4,    # stand 15 vs 10
+    '12v2': 3,     # stand 12 vs 2
+    '12v3': 2,     # stand 12 vs 3
+    '11vA': 1,     # double 11 vs A
+    '10v10': 4,    # double 10 vs 10
+}
+
+# Late surrender deviation -> true count at or above which the hand is surrendered
+SURRENDER_INDICES = {
+    '14v10': 3,    # surrender 14 vs 10
+    '15v9': 2,     # surrender 15 vs 9
+    '15vA': 1,     # surrender 15 vs A (always under H17)
+}
+
+# Bump when the chart changes, so tables compiled by an older version are not read back
+TABLE_VERSION = 2
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'strategy_cache')
+
+
+def card_value(card):
+    """Blackjack value of a single card (Ace as 11)"""
+    return 10 if card in ['J', 'Q', 'K'] else (11 if card == 'A' else int(card))
+
+
+def _raw_total(cards):
+    total = 0
+    aces = 0
+    for card in cards:
+        if card in ['J', 'Q', 'K']:
+            total += 10
+        elif card == 'A':
+            aces += 1
+            total += 11
+        else:
+            total += int(card)
+    return total, aces
+
+
+def _hand_value(cards):
+    total, aces = _raw_total(cards)
+    while total > 21 and aces > 0:
+        total -= 10
+        aces -= 1
+    return total
+
+
+def _is_soft(cards):
+    total, aces = _raw_total(cards)
+    return total <= 21 and aces > 0
+
+
+def clamp_index(index):
+    """Nearest index the bucketed table can represent exactly"""
+    return min(MAX_BUCKET, max(MIN_BUCKET + 1, int(index)))
+
+
+def index_table_path(total_decks, system=DEFAULT_SYSTEM, rules=None):
+    """Where deviations.py writes the index table for a deck count and count system (and ruleset)"""
+    name = f'{system}_{total_decks}d' + (f'_{ruleset_key(rules)}' if rules is not None else '')
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'indices', f'{name}.json')
+
+
+def find_indices(total_decks, system=DEFAULT_SYSTEM, rules=None):
+    """Generated indices for a deck count, count system and ruleset, or None when none have been generated
+
+    Indices generated for the exact ruleset are preferred; otherwise those
+    for the deck count alone are used.
+    """
+    paths = [index_table_path(total_decks, system)]
+    if rules is not None:
+        paths.insert(0, index_table_path(total_decks, system, rules))
+    for path in paths:
+        if os.path.exists(path):
+            return load_indices(path)
+    return None
+
+
+def load_indices(path):
+    """Deviation indices from an index table written by deviations.py"""
+    with open(path) as f:
+        table = json.load(f)
+    indices = dict(DEFAULT_INDICES)
+    for name, index in table['indices'].items():
+        if name not in DEFAULT_INDICES:
+            raise ValueError(f"Unknown deviation in {path}: {name}")
+        indices[name] = clamp_index(index)
+    return indices
+
+
+def chart_strategy(player_cards, dealer_upcard, true_count, can_double=True, can_split=False, indices=None,
+                   rules=None):
+    """Reference basic strategy chart with Omega II deviations (returns the action)"""
+    index = indices or DEFAULT_INDICES
+    das = (rules or DEFAULT_RULES).double_after_split
+    player_total = _hand_value(player_cards)
+    dealer_value = card_value(dealer_upcard)
+
+    # Check for pair splitting
+    if can_split and len(player_cards) == 2 and player_cards[0] == player_cards[1]:
+        if player_cards[0] in ['A', '8']:
+            return "SPLIT"
+        elif das and player_cards[0] in ['2', '3', '6', '7'] and dealer_value <= 7:
+            return "SPLIT"
+        elif das and player_cards[0] == '4' and dealer_value in [5, 6]:
+            return "SPLIT"
+        elif not das and player_cards[0] in ['2', '3', '7'] and 4 <= dealer_value <= 7:
+            return "SPLIT"
+        elif not das and player_cards[0] == '6' and 3 <= dealer_value <= 6:
+            return "SPLIT"
+        elif player_cards[0] == '5':
+            # Never split 5s, treat as 10
+            pass
+        elif player_cards[0] == '9' and dealer_value not in [7, 10, 11]:
+            return "SPLIT"
+        elif player_cards[0] == '10':
+            # Never split 10s unless very high count
+            if dealer_value == 5 and true_count >= index['TTv5']:
+                return "SPLIT"
+            elif dealer_value == 6 and true_count >= index['TTv6']:
+                return "SPLIT"
+
+    # Soft hands (with Ace)
+    if _is_soft(player_cards):
+        if player_total >= 19:
+            return "STAND"
+        elif player_total == 18:
+            if dealer_value in [2, 7, 8]:
+                return "STAND"
+            elif dealer_value in [3, 4, 5, 6] and can_double:
+                return "DOUBLE"
+            else:
+                return "HIT"
+        elif player_total in [17, 16] and dealer_value in [3, 4, 5, 6] and can_double:
+            return "DOUBLE"
+        elif player_total in [15, 14] and dealer_value in [4, 5, 6] and can_double:
+            return "DOUBLE"
+        elif player_total == 13 and dealer_value in [5, 6] and can_double:
+            return "DOUBLE"
+        else:
+            return "HIT"
+
+    # Hard hands with Omega II deviations
+    if player_total >= 17:
+        return "STAND"
+    elif player_total == 16:
+        if dealer_value >= 7:
+            # Omega II deviation: Stand 16 vs 10 when TC >= +0
+            if dealer_value == 10 and true_count >= index['16v10']:
+                return "STAND"
+            # Stand 16 vs 9 when TC >= +5
+            elif dealer_value == 9 and true_count >= index['16v9']:
+                return "STAND"
+            return "HIT"
+        else:
+            return "STAND"
+    elif player_total == 15:
+        if dealer_value >= 7:
+            # Stand 15 vs 10 when TC >= +4
+            if dealer_value == 10 and true_count >= index['15v10']:
+                return "STAND"
+            return "HIT"
+        else:
+            return "STAND"
+    elif player_total in [13, 14]:
+        if dealer_value >= 7:
+            return "HIT"
+        else:
+            return "STAND"
+    elif player_total == 12:
+        if dealer_value in [2, 3]:
+            # Hit 12 vs 2 when TC < +3, vs 3 when TC < +2
+            if dealer_value == 2 and true_count < index['12v2']:
+                return "HIT"
+            elif dealer_value == 3 and true_count < index['12v3']:
+                return "HIT"
+            else:
+                return "STAND"
+        elif dealer_value >= 7:
+            return "HIT"
+        else:
+            return "STAND"
+    elif player_total == 11:
+        if can_double:
+            # Don't double 11 vs A when TC < +1
+            if dealer_value == 11 and true_count < index['11vA']:
+                return "HIT"
+            return "DOUBLE"
+        else:
+            return "HIT"
+    elif player_total == 10:
+        if dealer_value <= 9 and can_double:
+            # Don't double 10 vs 10 when TC < +4
+            if dealer_value == 10 and true_count < index['10v10']:
+                return "HIT"
+            return "DOUBLE"
+        else:
+            return "HIT"
+    elif player_total == 9:
+        if dealer_value in [3, 4, 5, 6] and can_double:
+            return "DOUBLE"
+        else:
+            return "HIT"
+    else:
+        return "HIT"
+
+
+def surrender_chart(player_total, dealer_value, true_count, rules=None):
+    """Whether a hard two-card total is surrendered under late surrender"""
+    rules = rules or DEFAULT_RULES
+    if player_total == 16:
+        return dealer_value >= 9
+    if player_total == 15:
+        if dealer_value == 10:
+            return True
+        if dealer_value == 9:
+            return true_count >= SURRENDER_INDICES['15v9']
+        if dealer_value == 11:
+            return rules.hit_soft_17 or true_count >= SURRENDER_INDICES['15vA']
+    if player_total == 14 and dealer_value == 10:
+        return true_count >= SURRENDER_INDICES['14v10']
+    if player_total == 17 and dealer_value == 11:
+        return rules.hit_soft_17
+    return False
+
+
+def representative_cards(state, total):
+    """Cards in the given state/total to evaluate the chart with (None if unreachable)"""
+    if state == PAIR:
+        return [PAIR_RANKS[total]] * 2 if total < len(PAIR_RANKS) else None
+    if state == SOFT:
+        if total < 13:
+            return None
+        return ['A', str(total - 11)] if total < 21 else ['A', '10']
+    if total < 4:
+        return None
+    if total <= 12:
+        return ['2', str(total - 2)]
+    if total <= 19:
+        return ['10', str(total - 10)]
+    return ['10', '10'] if total == 20 else ['10', '9', '2']
+
+
+def count_bucket(true_count):
+    """Index of the true count bucket that decides every deviation"""
+    return min(MAX_BUCKET, max(MIN_BUCKET, math.floor(true_count))) - MIN_BUCKET
+
+
+def table_index(state, total, dealer_value, can_double, can_split, bucket):
+    """Flat index into the compiled table"""
+    return (((((state * NUM_TOTALS + total) * NUM_DEALER + dealer_value - 2) * 2
+              + can_double) * 2 + can_split) * NUM_BUCKETS + bucket)
+
+
+class StrategyTable:
+    """Dense (state, total, dealer, can_double, can_split, bucket) -> action table"""
+
+    def __init__(self, chart=chart_strategy, indices=None, rules=None, codes=None, surrender=None):
+        """Compile the chart for the indices and rules, or take already compiled codes"""
+        self.indices = dict(indices or DEFAULT_INDICES)
+        self.rules = rules or DEFAULT_RULES
+        if codes is None:
+            codes, surrender = self._compile(chart)
+        self.codes = list(codes)
+        self.actions = [ACTIONS[code] for code in self.codes]
+        # (total, dealer, bucket) -> surrender hard two-card total; None without late surrender
+        self.surrender = None if surrender is None else [bool(flag) for flag in surrender]
+
+    def _compile(self, chart):
+        codes = [None] * (NUM_STATES * NUM_TOTALS * NUM_DEALER * 2 * 2 * NUM_BUCKETS)
+        for state in (HARD, SOFT, PAIR):
+            for total in range(NUM_TOTALS):
+                cards = representative_cards(state, total)
+                for dealer_value in range(2, 12):
+                    dealer_upcard = 'A' if dealer_value == 11 else str(dealer_value)
+                    for can_double in (0, 1):
+                        for can_split in (0, 1):
+                            for bucket in range(NUM_BUCKETS):
+                                action = "HIT"
+                                if cards is not None:
+                                    # Hard/soft entries are only used for hands that are not a splittable pair
+                                    action = chart(cards, dealer_upcard, bucket + MIN_BUCKET,
+                                                   bool(can_double), bool(can_split) and state == PAIR,
+                                                   self.indices, self.rules)
+                                index = table_index(state, total, dealer_value, can_double, can_split, bucket)
+                                codes[index] = ACTION_CODES[action]
+        surrender = None
+        if self.rules.late_surrender:
+            surrender = [int(surrender_chart(total, dealer_value, bucket + MIN_BUCKET, self.rules))
+                         for total in range(NUM_TOTALS) for dealer_value in range(2, 12)
+                         for bucket in range(NUM_BUCKETS)]
+        return codes, surrender
+
+    def lookup(self, state, total, dealer_value, can_double, can_split, true_count):
+        """Recommendation for an already classified hand"""
+        return self.actions[table_index(state, total, dealer_value, int(can_double), int(can_split),
+                                        count_bucket(true_count))]
+
+    def recommend(self, player_cards, dealer_upcard, true_count, can_double=True, can_split=False,
+                  can_surrender=False):
+        """Same answer as chart_strategy() for a list of cards or a Hand
+
+        dealer_upcard may be a rank string or a rank index. With can_surrender
+        (a two-card hand under late surrender) hard hands may be surrendered.
+        """
+        if isinstance(player_cards, Hand):
+            if can_split and player_cards.pair:
+                state, total = PAIR, player_cards.ranks[0]
+            else:
+                state, total = (SOFT if player_cards.soft else HARD), player_cards.total
+        elif can_split and len(player_cards) == 2 and player_cards[0] == player_cards[1]:
+            state, total = PAIR, PAIR_INDEX[player_cards[0]]
+        else:
+            total, aces = _raw_total(player_cards)
+            state = SOFT if total <= 21 and aces > 0 else HARD
+            while total > 21 and aces > 0:
+                total -= 10
+                aces -= 1
+        dealer_value = RANK_VALUES[dealer_upcard] if isinstance(dealer_upcard, int) else card_value(dealer_upcard)
+        bucket = count_bucket(true_count)
+        if can_surrender and state == HARD and self.surrender is not None:
+            if self.surrender[(total * NUM_DEALER + dealer_value - 2) * NUM_BUCKETS + bucket]:
+                return "SURRENDER"
+        return self.actions[table_index(state, total, dealer_value, int(can_double), int(can_split), bucket)]
+
+
+def table_key(indices=None, rules=None):
+    """Hash naming the compiled table of a ruleset and set of indices"""
+    text = json.dumps([TABLE_VERSION, sorted((indices or DEFAULT_INDICES).items())], sort_keys=True)
+    return f"{ruleset_key(rules or DEFAULT_RULES)}-{hashlib.sha1(text.encode()).hexdigest()[:8]}"
+
+
+def save_table(table, path):
+    """Write a compiled table (written to a temporary file first, so readers never see half of one)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = {'version': TABLE_VERSION, 'rules': table.rules._asdict(), 'indices': table.indices,
+            'codes': "".join(map(str, table.codes)),
+            'surrender': None if table.surrender is None else "".join(str(int(f)) for f in table.surrender)}
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w') as f:
+        json.dump(data, f)
+    os.replace(temporary, path)
+
+
+def load_table(path, indices=None, rules=None):
+    """Compiled table written by save_table(), or None if it is missing or unreadable"""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        if data['version'] != TABLE_VERSION:
+            return None
+        surrender = data['surrender']
+        return StrategyTable(indices=indices, rules=rules, codes=[int(c) for c in data['codes']],
+                             surrender=None if surrender is None else [int(c) for c in surrender])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+_strategy_tables = {}
+
+
+def get_strategy_table(indices=None, rules=None, cache_dir=CACHE_DIR):
+    """Shared table for a set of deviation indices and a ruleset
+
+    Compiled on first use ever and cached on disk; later processes read it back.
+    """
+    key = table_key(indices, rules)
+    table = _strategy_tables.get(key)
+    if table is None:
+        path = os.path.join(cache_dir, f"strategy_{key}.json") if cache_dir else None
+        table = load_table(path, indices, rules) if path else None
+        if table is None:
+            table = StrategyTable(indices=indices, rules=rules)
+            if path:
+                try:
+                    save_table(table, path)
+                except OSError:
+                    pass    # a read-only checkout compiles in every process instead
+        _strategy_tables[key] = table
+    return table
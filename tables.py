@@ -0,0 +1,288 @@
+"""
+Many tables tracked at once in one process, on asyncio.
+
+A TableManager hosts independent engines, one per table, each with its own
+shoe, count and undo journal. Cards seen at a table are counted outside any
+round (add_rank_to_dealt), the way a spotter counts a table they are not
+playing. A table can also be played: 'deal' events feed the cards of the
+round in dealing order (opening a round when none is open), and 'action'
+and 'insurance' events answer its decisions; cards sent past a decision are
+held and dealt as soon as the next card is due.
+
+All tables share one bounded event queue drained by a single task: there
+are no per-table threads or tasks, and submitting to a full queue waits,
+so a fast feed slows down instead of piling up.
+
+The task applies every event already queued as one batch, recomputes the
+status of the tables that changed and only then notifies subscribers, once
+per batch with just the changed tables. The summary is ranked by true count
+and best_table() names the table to join: the highest count at or above
+WONG_IN, the count at which the engine's wonging advice says to stay.
+
+Console dashboard (one line per input, table by name or number):
+    python tables.py --tables 8 --decks 6
+    > 3 K 5 9 A          cards seen at table T3
+    > T3 undo            take back the last card
+    > T3 shuffle         new shoe
+    > add Pit2-7         start tracking another table
+    > add Pit3-1 s17     ... with other rules (rules.py)
+
+Every table can have its own Ruleset. Strategy tables are compiled once per
+ruleset and cached on disk (strategy_table.py), so adding a table with
+rules seen before costs no compilation.
+"""
+import argparse
+import asyncio
+import sys
+from collections import namedtuple
+
+from cards import card_name, parse_cards
+from count_systems import DEFAULT_SYSTEM, SYSTEM_NAMES
+from engine import BlackjackEngine
+from rules import DEFAULT_RULES, RULESET_NAMES, describe, get_ruleset
+from strategy_table import find_indices
+
+# True count from which a table is worth joining (the engine's "STAY" advice)
+WONG_IN = 2
+QUEUE_SIZE = 1024
+
+# One input for a table: kind is 'cards' (seen, value: rank indices), 'deal' (played, rank indices),
+# 'action', 'insurance', 'undo' or 'shuffle'; source is whoever sent it, handed back with errors
+TableEvent = namedtuple('TableEvent', ['table', 'kind', 'value', 'source'], defaults=(None,))
+
+# prompt is the input the table's round waits for (None between rounds), recommendation the chart
+# action when that input is the player's decision, rules the table's ruleset (rules.describe())
+TableStatus = namedtuple('TableStatus', ['name', 'true_count', 'running_count', 'decks_remaining',
+                                         'penetration', 'bet', 'cards_seen', 'prompt', 'recommendation',
+                                         'rules'])
+
+
+class TableManager:
+    """Independent count states for many tables, updated from one event queue"""
+
+    def __init__(self, total_decks=6, count_system=DEFAULT_SYSTEM, queue_size=QUEUE_SIZE, rules=DEFAULT_RULES):
+        self.total_decks = total_decks
+        self.count_system = count_system
+        self.rules = rules          # ruleset of tables added without their own
+        self.queue_size = queue_size
+        self.tables = {}        # name -> BlackjackEngine
+        self.status = {}        # name -> TableStatus, recomputed only when the table changes
+        self.subscribers = []   # callbacks taking the list of changed TableStatus
+        self.events = 0
+        self.pending = {}       # name -> cards of a 'deal' held past a decision
+        self._changed = set()
+        self._queue = None
+
+    def add_table(self, name, total_decks=None, rules=None):
+        """Start tracking a table with a fresh shoe (and its own Ruleset, default the manager's)"""
+        if name in self.tables:
+            raise ValueError(f"Table {name} is already tracked")
+        if rules is None:
+            rules = self.rules._replace(decks=total_decks or self.total_decks)
+        elif total_decks:
+            rules = rules._replace(decks=total_decks)
+        indices = find_indices(rules.decks, self.count_system, rules)
+        self.tables[name] = BlackjackEngine(rules.decks, 1, indices=indices, count_system=self.count_system,
+                                            rules=rules)
+        self.pending[name] = []
+        self._changed.add(name)
+
+    def remove_table(self, name):
+        del self.tables[name]
+        del self.pending[name]
+        self.status.pop(name, None)
+        self._changed.discard(name)
+
+    def resolve(self, table):
+        """Table name from a name or a 1-based table number"""
+        if table in self.tables:
+            return table
+        if str(table).isdigit() and 1 <= int(table) <= len(self.tables):
+            return list(self.tables)[int(table) - 1]
+        raise ValueError(f"Unknown table {table}")
+
+    def apply(self, event):
+        """Apply one event to its table (statuses are refreshed by flush())"""
+        name = self.resolve(event.table)
+        engine = self.tables[name]
+        if event.kind == 'cards':
+            # Checked as a whole first, so a bad sequence leaves the table untouched
+            for rank in set(event.value):
+                if event.value.count(rank) > engine.shoe[rank]:
+                    raise ValueError(f"Table {name}: not enough {card_name(rank)} left in the shoe")
+            for rank in event.value:
+                engine.add_rank_to_dealt(rank)
+        elif event.kind == 'deal':
+            if engine.prompt is None:
+                engine.start_round()
+            if engine.prompt.kind != 'card':
+                raise ValueError(f"Table {name}: {engine.prompt.text.strip()}")
+            self._deal(name, list(event.value))
+        elif event.kind in ('action', 'insurance'):
+            if engine.prompt is None:
+                raise ValueError(f"Table {name}: no round is waiting for a decision")
+            engine.feed(engine.prompt.kind if event.kind == 'action' else 'insurance', event.value)
+            if self.pending[name] and engine.prompt is not None and engine.prompt.kind == 'card':
+                held, self.pending[name] = self.pending[name], []
+                self._deal(name, held)
+        elif event.kind == 'undo':
+            self.pending[name] = []
+            engine.undo_last_action()
+        elif event.kind == 'shuffle':
+            self.pending[name] = []
+            engine.reset_game()
+        else:
+            raise ValueError(f"Unknown table event {event.kind}")
+        self.events += 1
+        self._changed.add(name)
+
+    def _deal(self, name, ranks):
+        _, used = self.tables[name].feed_cards(ranks)
+        self.pending[name] = ranks[used:]
+
+    def flush(self):
+        """Recompute the changed tables' status and tell subscribers; returns the changed statuses"""
+        changed = [self._table_status(name) for name in self._changed if name in self.tables]
+        self._changed.clear()
+        for status in changed:
+            self.status[status.name] = status
+        if changed:
+            for callback in self.subscribers:
+                callback(changed)
+        return changed
+
+    def _table_status(self, name):
+        engine = self.tables[name]
+        prompt = engine.prompt
+        recommendation = None
+        if prompt is not None and prompt.kind == 'action' and engine.decision is not None:
+            recommendation = engine.decision.action
+        return TableStatus(name, engine.get_true_count(), engine.running_count, engine.get_remaining_decks(),
+                           engine.get_deck_penetration(), engine.get_bet_amount(), len(engine.cards_dealt),
+                           prompt.text.strip() if prompt is not None else None, recommendation,
+                           describe(engine.rules))
+
+    def ranking(self):
+        """Table statuses, highest true count first"""
+        return sorted(self.status.values(), key=lambda status: status.true_count, reverse=True)
+
+    def best_table(self):
+        """Status of the table to join, or None if no table has reached WONG_IN"""
+        best = max(self.status.values(), key=lambda status: status.true_count, default=None)
+        return best if best is not None and best.true_count >= WONG_IN else None
+
+    # ------------------------------------------------------------------
+    # asyncio
+    # ------------------------------------------------------------------
+
+    @property
+    def queue(self):
+        # Created on first use so it belongs to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.queue_size)
+        return self._queue
+
+    async def submit(self, event):
+        """Queue an event; waits while the queue is full"""
+        await self.queue.put(event)
+
+    async def run(self, on_error=None):
+        """Apply queued events forever, one batch and one flush per wake-up
+
+        A ValueError from an event is passed to on_error(error, event) when
+        given (the event is skipped), otherwise it ends the task.
+        """
+        while True:
+            events = [await self.queue.get()]
+            while not self.queue.empty():
+                events.append(self.queue.get_nowait())
+            for event in events:
+                try:
+                    self.apply(event)
+                except ValueError as e:
+                    if on_error is None:
+                        raise
+                    on_error(e, event)
+                finally:
+                    self.queue.task_done()
+            self.flush()
+
+
+def parse_command(manager, line):
+    """TableEvent (or ('add', name[, ruleset])) from one dashboard input line; ValueError if it is not understood"""
+    words = line.split(None, 1)
+    if len(words) < 2:
+        raise ValueError("Enter: <table> <cards> | <table> undo | <table> shuffle | add <name> [rules]")
+    table, rest = words
+    if table.lower() == 'add':
+        return ('add',) + tuple(rest.split())
+    table = manager.resolve(table)
+    command = rest.strip().lower()
+    if command in ('undo', 'shuffle'):
+        return TableEvent(table, command, None)
+    return TableEvent(table, 'cards', parse_cards(rest))
+
+
+def format_summary(manager):
+    """Ranked table summary with the best table to join"""
+    lines = [f"{'#':>3} {'Table':<10} {'TC':>7} {'RC':>5} {'Decks':>6} {'Pen %':>6} {'Bet':>5}  Rules"]
+    for rank, status in enumerate(manager.ranking(), 1):
+        lines.append(f"{rank:>3} {status.name:<10} {status.true_count:>+7.2f} {status.running_count:>5} "
+                     f"{status.decks_remaining:>6.1f} {status.penetration:>6.1f} {status.bet:>5}  {status.rules}")
+    best = manager.best_table()
+    if best is not None:
+        lines.append(f"Join {best.name}: true count {best.true_count:+.2f}, bet {best.bet}")
+    else:
+        lines.append(f"No table at a true count of {WONG_IN}+ yet")
+    return "\n".join(lines)
+
+
+async def dashboard(manager):
+    """Read table input from stdin and print the ranking whenever a batch changed it"""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    manager.subscribers.append(lambda changed: print("\n" + format_summary(manager)))
+    worker = asyncio.create_task(manager.run(on_error=lambda e, event: print(e)))
+    manager.flush()
+    while True:
+        line = (await reader.readline()).decode()
+        if not line or line.strip().lower() in ('quit', 'exit'):
+            break
+        if not line.strip():
+            continue
+        try:
+            command = parse_command(manager, line)
+        except ValueError as e:
+            print(e)
+            continue
+        if isinstance(command, TableEvent):
+            await manager.submit(command)
+            continue
+        try:
+            rules = get_ruleset(command[2], manager.total_decks) if len(command) > 2 else None
+            manager.add_table(command[1], rules=rules)
+        except ValueError as e:
+            print(e)
+            continue
+        manager.flush()
+    await manager.queue.join()
+    worker.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track the count at several tables at once")
+    parser.add_argument('--tables', type=int, default=4, help="tables to start with (named T1, T2, ...)")
+    parser.add_argument('--decks', type=int, default=6, help="decks in each shoe")
+    parser.add_argument('--system', choices=SYSTEM_NAMES, default=DEFAULT_SYSTEM, help="count system")
+    parser.add_argument('--rules', choices=RULESET_NAMES, default='h17', help="table rules (rules.py)")
+    args = parser.parse_args()
+
+    manager = TableManager(args.decks, args.system, rules=get_ruleset(args.rules, args.decks))
+    for number in range(1, args.tables + 1):
+        manager.add_table(f"T{number}")
+    asyncio.run(dashboard(manager))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the risk of ruin and bankroll trajectory analysis
+"""
+import math
+
+import numpy as np
+
+from bankroll import TrajectoryStats, analytic_summary, simulate_trajectories
+from bet_ramp import RAMP_BUCKETS, BetRamp
+from ramp_optimizer import BucketStats
+
+
+def coin_stats(win_probability, rounds=10000):
+    """Bucket stats where every round is +1/-1 per unit bet, all in bucket 0"""
+    stats = BucketStats()
+    wins = int(rounds * win_probability)
+    stats.outcomes[0] = {1.0: wins, -1.0: rounds - wins}
+    stats.rows[0] = [rounds, float(2 * wins - rounds), float(rounds)]
+    for bucket in range(1, RAMP_BUCKETS):
+        stats.rows[bucket] = [0, 0.0, 0.0]
+    return stats
+
+
+def test_analytic_figures():
+    """N0 and risk of ruin follow their closed forms"""
+    print("Testing bankroll analysis...")
+    stats = coin_stats(0.51)
+    flat = BetRamp([], 2, "flat")
+    summary = analytic_summary(stats, flat, 100, 10 ** 7)
+    ev, variance = 2 * 0.02, 4 * (1 - 0.02 ** 2)
+    assert abs(summary['ev_per_round'] - ev) < 1e-12
+    assert abs(summary['n0'] - variance / ev ** 2) < 1e-6
+    assert abs(summary['risk_of_ruin'] - math.exp(-2 * ev * 100 / variance)) < 1e-12
+    # A very long session approaches the never-ending one
+    assert abs(summary['session_risk_of_ruin'] - summary['risk_of_ruin']) < 1e-3
+    assert analytic_summary(stats, flat, 100, 100)['session_risk_of_ruin'] < summary['risk_of_ruin']
+    print("✓ N0 and risk of ruin")
+
+
+def test_streaming_percentiles():
+    """Merged fixed histograms give the percentiles of all samples, within a bin"""
+    rng = np.random.default_rng(0)
+    samples = rng.normal(1000, 100, 200000)
+    total = TrajectoryStats([1], 0, 2000, bins=4000)
+    for part in np.array_split(samples, 10):
+        batch = TrajectoryStats([1], 0, 2000, bins=4000)
+        batch.add(0, part, part < 700)
+        batch.trajectories = part.size
+        total.merge(batch)
+    assert total.histograms.shape == (1, 4000)
+    for q in (5, 50, 95):
+        assert abs(total.percentile(0, q) - np.percentile(samples, q)) < 1.0
+    assert abs(total.ruin_rate(0) - np.mean(samples < 700)) < 1e-12
+    print("✓ Streaming percentiles")
+
+
+def test_simulated_ruin_matches_analytic():
+    """Replayed sessions ruin about as often as the first-passage formula predicts"""
+    stats = coin_stats(0.49)
+    flat = BetRamp([], 1, "flat")
+    trajectories = simulate_trajectories(stats, flat, 20, 400, 20000, workers=1, seed=2, batch_lanes=5000)
+    summary = analytic_summary(stats, flat, 20, 400)
+    assert trajectories.trajectories == 20000
+    assert abs(trajectories.ruin_rate(-1) - summary['session_risk_of_ruin']) < 0.05
+    median = trajectories.percentile(len(trajectories.checkpoints) - 1, 50)
+    assert median < 20
+    print(f"✓ Simulated ruin {trajectories.ruin_rate(-1):.3f} vs analytic {summary['session_risk_of_ruin']:.3f}")
+
+
+if __name__ == "__main__":
+    test_analytic_figures()
+    test_streaming_percentiles()
+    test_simulated_ruin_matches_analytic()
+    print("\n🎉 Bankroll tests passed!")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the vectorized batch simulator against the engine
+"""
+import random
+
+import numpy as np
+
+from batch_simulator import (RANK_VALUES, TAG_MATRIX, BatchShoes, StrategyLookup, hand_value, is_soft, play_round,
+                             run_batch_simulation)
+from engine import BlackjackEngine, CARD_RANKS
+from rules import RULESET_NAMES, get_ruleset
+from simulator import build_shoe, play_shoe
+
+
+class ScriptedShoes(BatchShoes):
+    """Batch lanes dealt from fixed shuffled shoes instead of random draws"""
+
+    def __init__(self, shoes, total_decks, num_players, penetration, rules=None):
+        super().__init__(len(shoes), total_decks, num_players, penetration, np.random.default_rng(0), rules=rules)
+        self.shoes = shoes
+        self.position = np.zeros(len(shoes), dtype=np.int64)
+
+    def draw(self, mask):
+        ranks = np.full(self.n, -1, dtype=np.int64)
+        for lane in self.lanes[mask]:
+            rank = self.shoes[lane][self.position[lane]]
+            self.position[lane] += 1
+            self.composition[lane, rank] -= 1
+            self.running_counts[lane] += TAG_MATRIX[rank]
+            self.remaining[lane] -= 1
+            ranks[lane] = rank
+        return ranks
+
+
+class RoundLog:
+    """Stands in for SimulationStats, keeping every (true count, bet, payout)"""
+
+    def __init__(self):
+        self.rounds = []
+        self.shoes = 0
+
+    def record(self, true_count, bet, payout):
+        self.rounds.append((true_count, bet, payout))
+
+
+def test_vectorized_hand_evaluation():
+    """hand_value/is_soft agree with calculate_hand_value/is_soft_hand"""
+    print("Testing vectorized hand evaluation...")
+    game = BlackjackEngine(1, 1)
+    rng = random.Random(3)
+    hands = [[rng.choice(CARD_RANKS) for _ in range(rng.randint(1, 6))] for _ in range(2000)]
+
+    raw = np.array([sum(int(RANK_VALUES[CARD_RANKS.index(c)]) for c in hand) for hand in hands])
+    aces = np.array([hand.count('A') for hand in hands])
+
+    assert list(hand_value(raw, aces)) == [game.calculate_hand_value(hand) for hand in hands]
+    assert list(is_soft(raw, aces)) == [game.is_soft_hand(hand) for hand in hands]
+    print("✓ Vectorized hand values match the engine")
+
+
+def test_batch_run():
+    """Every requested shoe is played and the report is populated"""
+    stats = run_batch_simulation(total_decks=2, num_players=3, num_shoes=50, lanes=20, seed=5)
+    assert stats.shoes >= 50
+    assert stats.rounds > 0
+    assert sum(row[0] for row in stats.by_true_count.values()) == stats.rounds
+    print("✓ Batch simulation completed")
+
+
+def play_scripted(shoes, total_decks, num_players, rules=None):
+    """Play the shoes in batch lanes and through the engine; returns the number of rounds compared"""
+    batch = ScriptedShoes(shoes, total_decks, num_players, 0.75, rules)
+    strategy = StrategyLookup(rules=rules)
+    logs = [[] for _ in shoes]
+    done = np.zeros(len(shoes), dtype=bool)
+    while True:
+        done |= (batch.total_cards - batch.remaining) >= batch.cut_card
+        alive = ~done
+        if not alive.any():
+            break
+        true_count, bet, payout = play_round(batch, strategy, alive)
+        for lane in batch.lanes[alive]:
+            logs[lane].append((float(true_count[lane]), int(bet[lane]), int(payout[lane])))
+
+    rounds = 0
+    game = BlackjackEngine(total_decks, num_players, rules=rules)
+    for lane, shoe in enumerate(shoes):
+        log = RoundLog()
+        play_shoe(game, shoe, 0.75, log)
+        assert log.rounds == logs[lane], (total_decks, num_players, rules, lane)
+        assert len(game.cards_dealt) == batch.position[lane]
+        rounds += len(log.rounds)
+    return rounds
+
+
+def test_scripted_shoes_match_engine():
+    """Dealt the same shoes, the batch lanes play and settle every round exactly like the engine"""
+    rng = random.Random(11)
+    rounds = 0
+    for total_decks, num_players in ((6, 1), (2, 3)):
+        shoes = [build_shoe(total_decks, rng) for _ in range(30)]
+        rounds += play_scripted(shoes, total_decks, num_players)
+    print(f"✓ {rounds} scripted rounds: same true counts, bets, payouts and cards as the engine")
+
+
+def test_scripted_shoes_match_engine_rules():
+    """Every ruleset (S17, resplits, surrender, 6:5, no DAS) plays exactly like the engine's"""
+    rng = random.Random(12)
+    rounds = 0
+    for name in RULESET_NAMES:
+        for total_decks, num_players in ((6, 1), (2, 2)):
+            shoes = [build_shoe(total_decks, rng) for _ in range(20)]
+            rounds += play_scripted(shoes, total_decks, num_players, get_ruleset(name, total_decks))
+    stats = run_batch_simulation(total_decks=2, num_players=2, num_shoes=20, lanes=10, seed=5,
+                                 rules=get_ruleset('s17-ls', 2))
+    assert stats.rounds > 0
+    print(f"✓ {rounds} scripted rounds under {len(RULESET_NAMES)} rulesets match the engine")
+
+
+if __name__ == "__main__":
+    test_vectorized_hand_evaluation()
+    test_batch_run()
+    test_scripted_shoes_match_engine()
+    test_scripted_shoes_match_engine_rules()
+    print("\n🎉 Batch simulator tests passed!")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the benchmark suite and its baseline comparison
+"""
+import json
+
+from benchmarks import BENCHMARKS, DEFAULT_BASELINE, compare, run_benchmarks
+
+
+def test_results_are_machine_readable():
+    """Every benchmark is timed or skipped with a reason, and the results round-trip through JSON"""
+    print("Testing benchmarks...")
+    results = run_benchmarks(['true_count', 'add_undo', 'gui_update_displays'], repeat=1, min_time=0.01)
+    assert set(results['benchmarks']) | set(results['skipped']) == {'true_count', 'add_undo',
+                                                                     'gui_update_displays'}
+    assert results['benchmarks']['add_undo']['seconds_per_op'] > 0
+    assert json.loads(json.dumps(results)) == results
+    print(f"✓ Timed {len(results['benchmarks'])} benchmarks, skipped {sorted(results['skipped'])}")
+
+
+def test_baseline_comparison():
+    """A benchmark slower than the stored baseline beyond its tolerance is flagged"""
+    with open(DEFAULT_BASELINE) as f:
+        baseline = json.load(f)
+    assert set(baseline['benchmarks']) <= set(BENCHMARKS)
+    results = json.loads(json.dumps(baseline))
+    for name, result in results['benchmarks'].items():
+        result['seconds_per_op'] *= 2                           # a machine half as fast...
+    results['benchmarks']['full_shoe']['relative'] *= 1.3       # ...and a real slowdown
+    results['benchmarks']['hand_value']['relative'] *= 1.3      # within the per-decision spread
+    results['benchmarks']['true_count']['relative'] *= 1.6
+    results['benchmarks']['new_path'] = {'seconds_per_op': 1.0, 'ops_per_second': 1.0, 'relative': 1.0}
+    rows = {name: (ratio, regressed) for name, ratio, regressed in compare(results, baseline, 0.25)}
+    assert rows['full_shoe'][1] and abs(rows['full_shoe'][0] - 1.3) < 1e-9
+    assert rows['true_count'][1] and not rows['hand_value'][1]
+    assert {name for name, (_, regressed) in rows.items() if regressed} == {'full_shoe', 'true_count'}
+    assert rows['new_path'] == (None, False)
+    print("✓ Regressions flagged against the baseline, relative to the calibration")
+
+
+def test_cleanup_after_timing():
+    """A benchmark's cleanup step runs once it has been timed"""
+    cleaned = []
+    BENCHMARKS['cleanup_probe'] = lambda: (lambda: None, 1, lambda: cleaned.append(True))
+    try:
+        results = run_benchmarks(['cleanup_probe'], repeat=1, min_time=0.01)
+    finally:
+        del BENCHMARKS['cleanup_probe']
+    assert cleaned == [True] and results['benchmarks']['cleanup_probe']['relative'] > 0
+    print("✓ Cleanup runs after timing")
+
+
+if __name__ == "__main__":
+    test_results_are_machine_readable()
+    test_baseline_comparison()
+    test_cleanup_after_timing()
+    print("\n🎉 Benchmark tests passed!")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the bet ramp data and the ramp optimizer
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from batch_simulator import BatchShoes
+from bet_ramp import DEFAULT_RAMP, RAMP_BUCKETS, BetRamp, load_ramp, save_ramp
+from engine import BlackjackEngine
+from ramp_optimizer import (BucketStats, collect_bucket_stats, evaluate_ramp, load_cached_stats, optimize_ramp,
+                            stats_config)
+from rules import get_ruleset
+
+TRUE_COUNTS = [-4.2, -0.01, 0.0, 0.01, 0.99, 1.0, 1.01, 2.0, 2.5, 3.0, 3.5, 4.0, 4.01, 5.0, 5.01, 9.7]
+
+
+def chain_bet(true_count, balance):
+    """The if-chain get_bet_amount used before the ramp became data"""
+    if true_count <= 1:
+        return 1
+    elif true_count <= 2:
+        return 2
+    elif true_count <= 3:
+        return 4
+    elif true_count <= 4:
+        return 6
+    elif true_count <= 5:
+        return 8
+    return min(10, balance // 20)
+
+
+def synthetic_stats():
+    """Bucket stats with a known edge per bucket: -1% at or below +0, +0.5% more per bucket above"""
+    stats = BucketStats()
+    for bucket in range(RAMP_BUCKETS):
+        n = 1000 * (RAMP_BUCKETS - bucket)
+        mean = -0.01 + 0.005 * bucket
+        stats.rows[bucket] = [n, mean * n, 1.3 * n]
+    return stats
+
+
+def test_default_ramp_matches_chain():
+    """The default ramp bets and explains exactly like the old if-chains"""
+    print("Testing bet ramp...")
+    game = BlackjackEngine(6, 1)
+    for true_count in TRUE_COUNTS:
+        for balance in (1000, 150, 10):
+            assert DEFAULT_RAMP.units(true_count, balance) == chain_bet(true_count, balance)
+    game.start_round()
+    assert game.current_bet == 1 and game.get_bet_reason() == "Minimum bet (unfavorable count)"
+    assert DEFAULT_RAMP.reason(4.5) == "8 units (excellent positive count)"
+    assert DEFAULT_RAMP.reason(5.01) == "Maximum bet (extremely favorable count)"
+    print("✓ Default ramp matches the original bet sizing")
+
+
+def test_batch_bets_follow_ramp():
+    """The vectorized simulator reads the same ramp"""
+    rng = np.random.default_rng(1)
+    true_count = np.array(TRUE_COUNTS * 3)
+    custom = BetRamp([(0, 2, "low"), (3, 5, "mid")], 25, "high")
+    for ramp in (DEFAULT_RAMP, custom):
+        shoes = BatchShoes(len(true_count), 2, 1, 0.75, rng, ramp=ramp)
+        shoes.balance[:] = [1000, 150, 10] * len(TRUE_COUNTS)
+        expected = [ramp.units(tc, balance) for tc, balance in zip(true_count, shoes.balance)]
+        assert list(shoes.bet_amount(true_count)) == expected
+    print("✓ Batch simulator bets follow the ramp")
+
+
+def test_search_uses_cached_stats():
+    """Ramps are scored from bucket moments in milliseconds and respect the table limits"""
+    stats = synthetic_stats()
+    metrics = evaluate_ramp(BetRamp([], 1, "flat"), stats, 1000)
+    expected_ev = sum(row[1] for row in stats.rows) / stats.rounds
+    assert abs(metrics['ev_per_round'] - expected_ev) < 1e-12
+
+    start = time.perf_counter()
+    ramp = optimize_ramp(stats, 1000, 1, 12, 'score')
+    elapsed = time.perf_counter() - start
+    units = [step.units for step in ramp.steps] + [ramp.top_units]
+    assert units == sorted(units) and units[0] == 1 and all(1 <= bet <= 12 for bet in units)
+    assert units[-1] > units[0]
+    assert evaluate_ramp(ramp, stats, 1000)['score'] >= evaluate_ramp(DEFAULT_RAMP, stats, 1000)['score']
+    assert elapsed < 0.1, elapsed
+
+    safe = optimize_ramp(stats, 1000, 1, 12, 'win_rate', max_ror=0.05)
+    assert evaluate_ramp(safe, stats, 1000)['risk_of_ruin'] <= 0.05
+    print(f"✓ Ramp search in {elapsed * 1000:.1f} ms")
+
+
+def test_simulated_stats_and_engine_ramp():
+    """Simulated stats round-trip through disk and a proposed ramp drives the engine"""
+    stats = collect_bucket_stats(total_decks=2, num_shoes=5, workers=1, seed=3)
+    assert stats.rounds > 0 and stats.shoes == 5
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'stats.json')
+        stats.save(path)
+        assert BucketStats.load(path).rows == stats.rows
+        assert load_cached_stats(path, stats_config(2)).rows == stats.rows
+        # Stats simulated with other settings are not reused
+        assert load_cached_stats(path, stats_config(2, num_players=3)) is None
+        assert load_cached_stats(path, stats_config(2, penetration=0.8)) is None
+        assert load_cached_stats(path, stats_config(2, tc_resolution='half_deck')) is None
+        assert load_cached_stats(path, stats_config(2, rules=get_ruleset('s17', 2))) is None
+        assert load_cached_stats(path, stats_config(2, count_system='hi_lo')) is None
+        hi_lo = collect_bucket_stats(total_decks=2, num_shoes=5, workers=1, seed=3, count_system='hi_lo')
+        assert hi_lo.config == stats_config(2, count_system='hi_lo') and hi_lo.rows != stats.rows
+        assert load_cached_stats(os.path.join(folder, 'missing.json'), stats_config(2)) is None
+
+        ramp = optimize_ramp(synthetic_stats(), 2000, 2, 20, 'score')
+        ramp_path = os.path.join(folder, 'ramp.json')
+        save_ramp(ramp, ramp_path)
+        assert load_ramp(ramp_path) == ramp
+
+    game = BlackjackEngine(6, 1, bet_ramp=ramp)
+    for card in ['2', '3', '4', '5', '6'] * 4:
+        game.add_card_to_dealt(card)
+    true_count = game.get_true_count()
+    game.start_round()
+    assert game.current_bet == ramp.units(true_count, game.player_balance)
+    assert game.get_bet_reason() == ramp.reason(true_count)
+    print("✓ Engine bets with the proposed ramp")
+
+
+if __name__ == "__main__":
+    test_default_ramp_matches_chain()
+    test_batch_bets_follow_ramp()
+    test_search_uses_cached_stats()
+    test_simulated_stats_and_engine_ramp()
+    print("\n🎉 Bet ramp tests passed!")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script to validate bulk card-sequence entry
+"""
+import random
+
+from cards import RANK_INDEX, parse_cards
+from engine import BlackjackEngine
+from mainActivity import BlackjackGameGUI
+from simulator import build_shoe
+from test_gui_flow import FakeGUI
+from test_undo import snapshot
+
+
+def test_sequence_matches_single_cards():
+    """A whole deal fed at once routes every card to the same hand as one at a time"""
+    print("Testing bulk card entry...")
+    assert parse_cards("k 5,9 A 1 10") == [12, 4, 8, 0, 0, 9]
+    try:
+        parse_cards("K 5 X 11")
+        assert False, "invalid cards accepted"
+    except ValueError as e:
+        assert "X, 11" in str(e)
+
+    ranks = build_shoe(6, random.Random(2))
+    bulk, single = BlackjackEngine(6, 6), BlackjackEngine(6, 6)
+    for game in (bulk, single):
+        game.start_round()
+    notices, used = bulk.feed_cards(ranks[:40])
+    for rank in ranks[:used]:
+        single.feed_rank(rank)
+    assert used >= 13 and bulk.prompt.kind != 'card'
+    assert snapshot(bulk) == snapshot(single)
+    print(f"✓ {used} cards routed in dealing order, stopped at: {bulk.prompt.text.strip()}")
+
+
+def test_sequence_validated_in_one_batch():
+    """A sequence with more of a rank than the shoe holds changes nothing"""
+    game = BlackjackEngine(1, 2)
+    game.start_round()
+    before = snapshot(game)
+    try:
+        game.feed_cards([RANK_INDEX['A']] * 3 + [RANK_INDEX['5']] * 5)
+        assert False, "over-drawn sequence accepted"
+    except ValueError as e:
+        assert "5" in str(e) and "A" not in str(e)
+    assert snapshot(game) == before
+    print("✓ Sequence rejected as a whole when the shoe runs short")
+
+
+def test_gui_holds_cards_past_a_decision():
+    """The GUI deals a sequence with one refresh and keeps the rest for after the decision"""
+    gui = FakeGUI()
+    game = BlackjackGameGUI(6, 1, gui)
+    game.play_round()
+    refreshes = len(gui.fields)
+    # Player 10 6, dealer 10, then the player's hit card and the dealer's hole card
+    game.submit(parse_cards("10 6 10 5 7"))
+    assert len(gui.fields) == refreshes + 1 and gui.fields[-1] == ()
+    assert game.prompt.kind == 'action' and game.pending_cards == [4, 6]
+    game.submit('hit')
+    assert game.player_hands['Player 1'] == ['10', '6', '5'] and game.pending_cards == [6]
+    game.submit('stand')
+    assert game.dealer_cards == ['10', '7'] and game.pending_cards == []
+    assert game.prompt is None and game.settlement.payout > 0
+    print("✓ Held cards dealt after the decision")
+
+
+if __name__ == "__main__":
+    test_sequence_matches_single_cards()
+    test_sequence_validated_in_one_batch()
+    test_gui_holds_cards_past_a_decision()
+    print("\n🎉 Bulk entry tests passed!")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the local card-feed socket API
+"""
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from card_feed import CardFeedServer, FeedClient, device_message
+from engine import BlackjackEngine
+from simulator import build_shoe
+from tables import TableManager
+
+
+async def start(path=None):
+    manager = TableManager(6)
+    manager.add_table('T1')
+    return await CardFeedServer(manager, port=0, path=path).start()
+
+
+def test_round_over_the_feed():
+    """Cards and actions sent by one client update the table; a subscriber gets count and advice"""
+    print("Testing card feed...")
+
+    async def run():
+        server = await start()
+        watcher = await FeedClient.connect(port=server.port)
+        device = await FeedClient.connect(port=server.port)
+        await watcher.send(subscribe=['T1'])
+        await asyncio.sleep(0.01)
+        await device.send(table='T1', cards='10 6 10')
+        update = await watcher.receive()
+        engine = BlackjackEngine(6, 1)
+        engine.start_round()
+        engine.feed_cards([9, 5, 9])
+        assert update['recommendation'] == engine.decision.action
+        assert update['running_count'] == engine.running_count and update['true_count'] == engine.get_true_count()
+
+        # A bad event is reported to its sender only, and later events still apply in order
+        await device.send(table='T1', action='fold')
+        assert 'Unknown action' in (await device.receive())['error']
+        await device.send(table='T1', card='K')
+        assert 'Your choice' in (await device.receive())['error']
+        await device.send(**device_message('T1', 'stand'))
+        await device.send(**device_message('T1', '7'))
+        while (update := await watcher.receive())['prompt'] is not None:
+            pass
+        assert update['recommendation'] is None and server.manager.tables['T1'].settlement is not None
+        for client in (watcher, device):
+            await client.close()
+        await server.close()
+    asyncio.run(run())
+    print("✓ Round played over the socket with pushed recommendations")
+
+
+def test_ordered_fast_stream():
+    """A fast stream of events is applied in order, each update pushed in well under a millisecond"""
+
+    async def run():
+        server = await start()
+        client = await FeedClient.connect(port=server.port)
+        await client.send(subscribe=True)
+        cards = build_shoe(6, random.Random(5))[:200]
+        engine = BlackjackEngine(6, 1)
+        start_time = time.perf_counter()
+        for rank in cards:
+            await client.send(table='T2', seen=str(['A', '2', '3', '4', '5', '6', '7', '8', '9', '10',
+                                                     'J', 'Q', 'K'][rank]))
+            update = await client.receive()
+            engine.add_rank_to_dealt(rank)
+            assert update['table'] == 'T2' and update['running_count'] == engine.running_count
+        elapsed = (time.perf_counter() - start_time) / len(cards)
+        await client.close()
+        await server.close()
+        return elapsed
+    elapsed = asyncio.run(run())
+    assert elapsed < 0.01
+    print(f"✓ 200 events in order, {elapsed * 1e6:.0f} us round trip per event")
+
+
+def test_unix_socket():
+    """The same protocol works over a Unix-domain socket"""
+    if not hasattr(asyncio, 'start_unix_server'):
+        print("⚠ Unix sockets not available, skipped")
+        return
+
+    async def run(path):
+        server = await start(path)
+        client = await FeedClient.connect(path=path)
+        await client.send(subscribe=['T1'])
+        await client.send(table='T1', seen='5 6')
+        update = await client.receive()
+        await client.close()
+        await server.close()
+        return update
+    with tempfile.TemporaryDirectory() as folder:
+        update = asyncio.run(run(os.path.join(folder, 'feed.sock')))
+    assert update['cards_seen'] == 2
+    print("✓ Unix-domain socket feed")
+
+
+if __name__ == "__main__":
+    test_round_over_the_feed()
+    test_ordered_fast_stream()
+    test_unix_socket()
+    print("\n🎉 Card feed tests passed!")
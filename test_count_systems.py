@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the count system tag matrix and per-system true counts
+"""
+import random
+
+import numpy as np
+
+from batch_simulator import BatchShoes, run_batch_simulation
+from cards import RANK_INDEX
+from count_systems import SYSTEMS, get_count_matrix
+from engine import BlackjackEngine
+from simulator import build_shoe
+
+
+def test_packed_counts_match_tags():
+    """One packed add per card keeps every system's running count, and undo takes it back"""
+    print("Testing count systems...")
+    rng = random.Random(4)
+    game = BlackjackEngine(2, 1)
+    cards = build_shoe(2, rng)[:80]
+    for rank in cards:
+        game.add_rank_to_dealt(rank)
+    for system in SYSTEMS:
+        expected = sum(system.tags[name] for name in (list(RANK_INDEX)[rank] for rank in cards))
+        assert game.get_running_counts()[system.name] == expected
+    assert game.running_count == game.get_running_counts()['omega_ii']
+    assert game.counts == game.count_matrix.count_shoe(game.shoe, 2)
+    for _ in cards:
+        game.undo_last_action()
+    assert set(game.get_running_counts().values()) == {0}
+    print("✓ Packed running counts match every tag table")
+
+
+def test_true_count_per_system():
+    """Balanced systems divide by decks left; KO and the ace side count are corrected first"""
+    game = BlackjackEngine(6, 1, count_system='hi_lo')
+    for card in ['2', '3', '4', '5', '6', '7', '7', 'K', 'A', 'A']:
+        game.add_card_to_dealt(card)
+    decks = game.cards_remaining / 52
+    counts = game.get_true_counts()
+    assert game.get_true_count() == counts['hi_lo'] == round(2 / decks, 2)
+    assert counts['ko'] == round((4 - 4 * 10 / 52) / decks, 2)
+    assert counts['omega_ii'] == round(8 / decks, 2)
+    # Two aces gone: the side count lowers the Omega II count by 2 per missing ace
+    assert counts['omega_ii_asc'] == round((8 + 2 * (22 - game.cards_remaining / 13)) / decks, 2)
+
+    # The selected system drives bets and deviations: four aces out are negative for Hi-Lo only
+    game = BlackjackEngine(6, 1)
+    for card in ['A', 'A', 'A', 'A', '2']:
+        game.add_card_to_dealt(card)
+    assert game.get_true_count() > 0 > game.get_true_counts()['hi_lo']
+    assert game.get_basic_strategy(['10', '6'], '10', False, False)[0] == "STAND"
+    game.set_count_system('hi_lo')
+    assert game.get_basic_strategy(['10', '6'], '10', False, False)[0] == "HIT"
+    ramp = game.bet_ramp
+    game.start_round()
+    assert game.current_bet == ramp.units(game.get_true_counts()['hi_lo'], 1000)
+    print("✓ True count, bet and deviations follow the selected system")
+
+
+def test_batch_counts_and_comparison():
+    """Lane counts match the matrix, and comparing systems reuses the same hands"""
+    rng = np.random.default_rng(3)
+    shoes = BatchShoes(50, 2, 1, 0.75, rng, count_system='ko')
+    for _ in range(40):
+        shoes.draw(np.ones(50, dtype=bool))
+    matrix = get_count_matrix()
+    dealt = 8 - shoes.composition
+    assert (shoes.running_counts == dealt @ np.array(matrix.tags)).all()
+    lane = 7
+    expected = [matrix.true_count(i, int(shoes.running_counts[lane, i]), shoes.tc_divisors[shoes.remaining[lane]],
+                                  int(shoes.remaining[lane]), int(shoes.composition[lane, 0]), 2)
+                for i in range(len(matrix.systems))]
+    assert list(shoes.true_counts()[lane]) == expected
+    assert shoes.true_count()[lane] == expected[matrix.index['ko']]
+
+    plain = run_batch_simulation(2, 1, 200, lanes=100, seed=5)
+    compared = run_batch_simulation(2, 1, 200, lanes=100, seed=5, compare=True)
+    assert compared.total_payout == plain.total_payout
+    rounds, bet, payout, _ = compared.by_system['omega_ii']
+    assert (rounds, bet, payout) == (plain.rounds, plain.total_bet, plain.total_payout)
+    assert set(compared.by_system) == set(matrix.names)
+    print(f"✓ {len(matrix.names)} systems compared on the same shoes")
+
+
+if __name__ == "__main__":
+    test_packed_counts_match_tags()
+    test_true_count_per_system()
+    test_batch_counts_and_comparison()
+    print("\n🎉 Count system tests passed!")
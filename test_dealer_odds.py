@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the exact dealer outcome probabilities
+"""
+import time
+
+from dealer_odds import OUTCOMES, DealerOdds, value_composition
+from engine import BlackjackEngine
+
+NAMES = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10']
+
+
+def brute_force(game, composition, cards):
+    """Enumerate every dealer draw with the engine's own hand rules"""
+    total = game.calculate_hand_value(cards)
+    if total > 21:
+        return {'bust': 1.0}
+    if len(cards) == 2 and total == 21:
+        return {'blackjack': 1.0}
+    if len(cards) >= 2 and (total > 17 or (total == 17 and not game.is_soft_hand(cards))):
+        return {total: 1.0}
+    remaining = sum(composition)
+    result = {}
+    for slot, count in enumerate(composition):
+        if count:
+            rest = list(composition)
+            rest[slot] -= 1
+            for outcome, p in brute_force(game, rest, cards + [NAMES[slot]]).items():
+                result[outcome] = result.get(outcome, 0) + p * count / remaining
+    return result
+
+
+def test_matches_brute_force():
+    """Memoized distribution equals full enumeration on a small shoe"""
+    print("Testing dealer probabilities...")
+    game = BlackjackEngine(1, 1)
+    odds = DealerOdds()
+    composition = (2, 1, 2, 2, 2, 1, 2, 2, 1, 6)
+    for upcard, row in odds.all_upcards(composition).items():
+        rest = list(composition)
+        rest[upcard] -= 1
+        expected = brute_force(game, rest, [NAMES[upcard]])
+        for outcome, p in zip(OUTCOMES, row):
+            assert abs(p - expected.get(outcome, 0)) < 1e-12, (upcard, outcome)
+    print("✓ Exact distribution matches enumeration")
+
+
+def test_all_upcards_fast():
+    """All ten upcards of a fresh 8-deck shoe are solved well under 100 ms"""
+    odds = DealerOdds()
+    start = time.perf_counter()
+    rows = odds.all_upcards(value_composition([32] * 13))
+    elapsed = time.perf_counter() - start
+    assert len(rows) == 10 and elapsed < 0.1, elapsed
+    for row in rows.values():
+        assert abs(sum(row) - 1) < 1e-9
+    print(f"✓ Ten upcards in {elapsed * 1000:.1f} ms")
+
+
+def test_engine_follows_dealer_hand():
+    """Engine reports odds for the dealer's live hand, including after the hole card"""
+    game = BlackjackEngine(6, 1)
+    assert game.get_dealer_outcomes() is None
+    game.start_round()
+    for card in ['10', '9', '6']:
+        game.feed_card(card)
+    upcard = game.get_dealer_outcomes()
+    assert 0.4 < upcard['bust'] < 0.5 and upcard['blackjack'] == 0
+    game.feed_action('s')
+    game.feed_card('10')
+    assert game.get_dealer_outcomes()[17] > 0.05
+    print("✓ Engine dealer outcomes")
+
+
+if __name__ == "__main__":
+    test_matches_brute_force()
+    test_all_upcards_fast()
+    test_engine_follows_dealer_hand()
+    print("\n🎉 Dealer probability tests passed!")
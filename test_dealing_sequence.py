@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the dealing order and round flow of the headless engine
+"""
+from cards import ACE, RANK_INDEX
+from engine import BlackjackEngine
+
+
+def feed_all(game, events):
+    """Feed a list of raw inputs to whatever the engine is prompting for"""
+    notices = []
+    for value in events:
+        notices.extend(game.feed(game.prompt.kind, value))
+    return notices
+
+
+def test_dealing_order():
+    """First cards, second cards, then the dealer upcard"""
+    print("Testing dealing sequence...")
+    game = BlackjackEngine(6, 3)
+    game.start_round()
+
+    targets = []
+    for card in ['2', '3', '4', '5', '6', '7', '9']:
+        targets.append(game.prompt.target)
+        game.feed_card(card)
+
+    assert targets == ['Player 1', 'Player 2', 'Player 3',
+                       'Player 1', 'Player 2', 'Player 3', 'dealer'], targets
+    assert game.player_hands['Player 1'] == ['2', '5']
+    assert game.player_hands['Player 3'] == ['4', '7']
+    assert game.dealer_cards == ['9']
+    assert game.prompt.kind == 'action'
+    print("✓ Cards routed in dealing order")
+
+
+def test_full_round_settlement():
+    """Hit, bust, dealer draws and payout are applied without any input()"""
+    game = BlackjackEngine(1, 2)
+    game.start_round()
+    notices = feed_all(game, ['10', '10', '6', '9', '7',   # P1 16, P2 19, dealer 7
+                              'h', '5',                    # P1 hits to 21
+                              's',                         # P1 stands
+                              's',                         # P2 stands
+                              '10'])                       # dealer 17, stands
+
+    settlement = notices[-1].data
+    assert settlement.outcomes == {'Player 1': 'player', 'Player 2': 'player'}
+    assert settlement.payout == 1
+    assert game.player_balance == 1001
+    assert game.prompt is None
+    print("✓ Round settled headlessly")
+
+
+def test_split_and_double():
+    """Main player split hands are dealt, played and paid separately"""
+    game = BlackjackEngine(6, 1)
+    game.start_round()
+    feed_all(game, ['8', '8', '6'])
+    assert game.decision.action == 'SPLIT'
+
+    feed_all(game, ['p', '3', '2',     # split, second cards to each hand
+                    'd', '10',         # double 11 -> 21
+                    's',               # stand on 10
+                    '10', '10'])       # dealer 16 then busts
+
+    assert game.player_results == {'Player 1_hand1': 'double', 'Player 1_hand2': 'stand'}
+    assert game.settlement.payout == 3
+    print("✓ Split and double settled")
+
+
+def test_invalid_input_rejected():
+    """Cards not left in the shoe raise ValueError"""
+    game = BlackjackEngine(1, 1)
+    game.start_round()
+    game.shoe[ACE] = 0
+    try:
+        game.feed_card('A')
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    print("✓ Invalid input rejected")
+
+
+def test_shoe_tracks_dealt_cards():
+    """Composition, running count and cards remaining move together on deal and undo"""
+    game = BlackjackEngine(2, 1)
+    game.start_round()
+    feed_all(game, ['5', 'k', '1'])
+    assert game.shoe[RANK_INDEX['5']] == 7 and game.shoe[RANK_INDEX['K']] == 7 and game.shoe[ACE] == 7
+    assert game.running_count == 2 - 2 + 0
+    assert game.cards_remaining == 101 and sum(game.shoe) == 101
+    assert game.deck['K'] == 7
+    assert game.undo_last_action().value == ACE
+    assert game.shoe[ACE] == 8 and game.cards_remaining == 102
+    print("✓ Shoe composition and count stay consistent")
+
+
+if __name__ == "__main__":
+    test_dealing_order()
+    test_full_round_settlement()
+    test_split_and_double()
+    test_invalid_input_rejected()
+    test_shoe_tracks_dealt_cards()
+    print("\n🎉 Dealing sequence tests passed!")
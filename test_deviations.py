@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script to validate simulated deviation indices and loading them into the strategy
+"""
+import os
+import tempfile
+
+from deviations import SCENARIOS, break_even, index_table, run_deviations, write_index_table
+from engine import BlackjackEngine
+from strategy_table import DEFAULT_INDICES, MAX_BUCKET, StrategyTable, chart_strategy, load_indices
+
+
+def test_break_even_fit():
+    """A linear EV advantage is crossed where the line says"""
+    print("Testing deviation index fit...")
+    buckets = {}
+    for bucket in range(-3, 8):
+        tc = bucket + 0.5
+        diff = 0.01 * (tc - 2.3)
+        n = 1000
+        # [samples, sum of TC, sum of differences, sum of squares] with a per-sample variance of 0.0004
+        buckets[bucket] = [n, tc * n, diff * n, (diff * diff + 0.0004) * n]
+    assert abs(break_even(buckets) - 2.3) < 1e-9
+
+    falling = {bucket: [n, s, -d, q] for bucket, (n, s, d, q) in buckets.items()}
+    assert break_even(falling) is None
+    print("✓ Break-even count recovered")
+
+
+def test_generated_table_loads():
+    """A short run writes a table the strategy can compile"""
+    stats = run_deviations(total_decks=1, num_shoes=3, stride=13, workers=1, seed=7)
+    table = index_table(stats, 1, 0.75, 'exact')
+    assert set(table['indices']) == set(SCENARIOS) == set(DEFAULT_INDICES)
+    assert all(table['samples'][name] > 0 for name in SCENARIOS)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'omega_ii_1d.json')
+        write_index_table(table, path)
+        indices = load_indices(path)
+    assert all(index <= MAX_BUCKET for index in indices.values())
+    print(f"✓ Generated indices load ({stats.samples('16v10')} samples per play)")
+
+
+def test_strategy_follows_indices():
+    """Compiled table and engine honour a loaded index instead of the default"""
+    indices = dict(DEFAULT_INDICES, **{'16v10': 3, '12v2': -2})
+    table = StrategyTable(indices=indices)
+    assert table.recommend(['10', '6'], '10', 2.99) == "HIT"
+    assert table.recommend(['10', '6'], '10', 3.0) == "STAND"
+    assert table.recommend(['10', '2'], '2', -2.5) == "HIT"
+    assert table.recommend(['10', '2'], '2', -2.0) == "STAND"
+    assert chart_strategy(['10', '6'], '10', 2.99, indices=indices) == "HIT"
+
+    game = BlackjackEngine(6, 1, indices=indices)
+    assert game.get_basic_strategy(['10', '6'], '10', False, False)[0] == "HIT"
+    assert BlackjackEngine(6, 1).get_basic_strategy(['10', '6'], '10', False, False)[0] == "STAND"
+    print("✓ Strategy uses the loaded indices")
+
+
+if __name__ == "__main__":
+    test_break_even_fit()
+    test_generated_table_loads()
+    test_strategy_follows_indices()
+    print("\n🎉 Deviation index tests passed!")
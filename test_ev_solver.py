@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the composition-dependent EV solver
+"""
+from engine import BlackjackEngine
+from ev_solver import EVSolver
+
+NAMES = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10']
+SCORE = {'player': 1, 'dealer': -1, 'push': 0}
+
+
+def draw(composition):
+    """(probability, slot, composition after the draw) for every card left"""
+    remaining = sum(composition)
+    for slot, count in enumerate(composition):
+        if count:
+            rest = list(composition)
+            rest[slot] -= 1
+            yield count / remaining, slot, rest
+
+
+def brute_stand(game, composition, player, dealer):
+    """Play the dealer out card by card and settle with determine_winner"""
+    total = game.calculate_hand_value(dealer)
+    if len(dealer) >= 2 and (total > 17 or (total == 17 and not game.is_soft_hand(dealer))):
+        return SCORE[game.determine_winner(player, dealer, "stand")]
+    return sum(p * brute_stand(game, rest, player, dealer + [NAMES[slot]])
+               for p, slot, rest in draw(composition))
+
+
+def brute_hit(game, composition, player, dealer):
+    ev = 0.0
+    for p, slot, rest in draw(composition):
+        cards = player + [NAMES[slot]]
+        if game.calculate_hand_value(cards) > 21:
+            ev -= p
+        else:
+            ev += p * max(brute_stand(game, rest, cards, dealer), brute_hit(game, rest, cards, dealer))
+    return ev
+
+
+def brute_double(game, composition, player, dealer):
+    ev = 0.0
+    for p, slot, rest in draw(composition):
+        cards = player + [NAMES[slot]]
+        if game.calculate_hand_value(cards) > 21:
+            ev -= 2 * p
+        else:
+            ev += 2 * p * brute_stand(game, rest, cards, dealer)
+    return ev
+
+
+def test_matches_enumeration():
+    """Exact solver equals full enumeration on a small shoe"""
+    print("Testing EV solver...")
+    game = BlackjackEngine(1, 1)
+    solver = EVSolver(dealer_depth=None)
+    composition = (1, 1, 2, 1, 1, 1, 1, 1, 1, 4)
+    for hand, upcard in [([9, 3], 9), ([4, 6], 5), ([0, 4], 8), ([1, 6], 3)]:
+        evs = solver.action_evs(composition, hand, upcard, True, False)
+        player, dealer = [NAMES[slot] for slot in hand], [NAMES[upcard]]
+        assert abs(evs['STAND'] - brute_stand(game, composition, player, dealer)) < 1e-12
+        assert abs(evs['HIT'] - brute_hit(game, composition, player, dealer)) < 1e-12
+        assert abs(evs['DOUBLE'] - brute_double(game, composition, player, dealer)) < 1e-12
+    print("✓ Hit/stand/double match enumeration")
+
+
+def test_known_decisions():
+    """Fresh 6-deck shoe gives the textbook choices"""
+    solver = EVSolver()
+
+    def evs(hand, upcard, can_split=False):
+        composition = [24] * 9 + [96]
+        for slot in hand + [upcard]:
+            composition[slot] -= 1
+        return solver.action_evs(tuple(composition), hand, upcard, True, can_split)
+
+    assert max(evs([9, 5], 9).items(), key=lambda item: item[1])[0] == 'HIT'
+    assert max(evs([5, 3], 4).items(), key=lambda item: item[1])[0] == 'DOUBLE'
+    assert max(evs([7, 7], 5, True).items(), key=lambda item: item[1])[0] == 'SPLIT'
+    assert max(evs([9, 9], 5, True).items(), key=lambda item: item[1])[0] == 'STAND'
+    print("✓ Textbook decisions")
+
+
+def test_engine_action_evs():
+    """The engine solves the live decision with its legal actions"""
+    game = BlackjackEngine(6, 1)
+    game.start_round()
+    for card in ['8', '8', '10']:
+        game.feed_card(card)
+    evs = game.get_action_evs()
+    assert set(evs) == {'HIT', 'STAND', 'DOUBLE', 'SPLIT'}
+    assert game.decision.action in evs
+    print("✓ Engine action EVs")
+
+
+if __name__ == "__main__":
+    test_matches_enumeration()
+    test_known_decisions()
+    test_engine_action_evs()
+    print("\n🎉 EV solver tests passed!")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the streaming JSON-lines batch mode
+"""
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tracemalloc
+
+from cards import card_name
+from engine import BlackjackEngine
+from event_stream import EventStream, write_jsonl
+from simulator import build_shoe, choose_other_action
+
+
+def record_shoes(shoes, seed, players=2, cards_first=False):
+    """JSON lines of recorded play from `shoes` shoes, with the (recommendation, payout) the engine saw
+
+    Cards are sent in runs up to each decision, or with cards_first as one
+    message per round followed by the round's actions.
+    """
+    rng = random.Random(seed)
+    engine = BlackjackEngine(6, players)
+    expected = []
+    lines = []
+    for _ in range(shoes):
+        if lines:
+            lines.append(json.dumps({'shuffle': True}))
+            balance, round_number = engine.player_balance, engine.round_number
+            engine.reset_game()
+            engine.player_balance, engine.round_number = balance, round_number
+        shoe = build_shoe(6, rng)
+        position = 0
+        while position < 200:
+            engine.start_round()
+            cards, actions, events = [], [], []
+            while engine.prompt is not None:
+                prompt = engine.prompt
+                if prompt.kind == 'card':
+                    cards.append(card_name(shoe[position]))
+                    engine.feed_rank(shoe[position])
+                    position += 1
+                    continue
+                if cards:
+                    events.append({'cards': " ".join(cards)})
+                    cards = []
+                if prompt.kind == 'action':
+                    expected.append(('decision', engine.decision.action))
+                    action = rng.choice(engine.decision.actions)
+                elif prompt.kind == 'other_action':
+                    action = choose_other_action(engine, prompt)
+                else:
+                    action = None
+                actions.append({'action': action} if action else {'insurance': False})
+                events.append(actions[-1])
+                engine.feed(prompt.kind, action or 'n')
+            if cards:
+                events.append({'cards': " ".join(cards)})
+            expected.append(('settlement', engine.settlement.payout, engine.settlement.balance))
+            if cards_first:
+                dealt = " ".join(event['cards'] for event in events if 'cards' in event)
+                events = [{'cards': dealt}] + actions
+            lines.extend(json.dumps(event) for event in events)
+    return lines, expected
+
+
+def outputs(records):
+    """Comparable view of the decision and settlement records"""
+    return [('decision', r['recommendation']) if r['type'] == 'decision' else
+            ('settlement', r['payout'], r['balance'])
+            for r in records if r['type'] in ('decision', 'settlement')]
+
+
+def test_recorded_play_matches_the_engine():
+    """Every decision and settlement of recorded shoes comes out as the engine saw it"""
+    print("Testing JSON-lines stream...")
+    lines, expected = record_shoes(3, seed=4)
+    output = io.StringIO()
+    write_jsonl(EventStream(6, 2).run(lines), output)
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert outputs(records) == expected
+    summary = records[-1]
+    assert summary['type'] == 'summary' and summary['errors'] == 0 and not summary['round_open']
+    decision = next(r for r in records if r['type'] == 'decision')
+    assert {'true_count', 'running_count', 'bet', 'wonging', 'line'} <= set(decision)
+
+    # A round's cards sent in one go are held across its decisions
+    lines, expected = record_shoes(2, seed=5, cards_first=True)
+    assert outputs(EventStream(6, 2).run(lines)) == expected
+    print(f"✓ {len(expected)} decisions and settlements match the engine, cards sent in runs or per round")
+
+
+def test_bad_lines_are_reported_and_skipped():
+    """Malformed or out-of-turn lines give an error record and leave the state untouched"""
+    lines = ['{"cards": "10 6"}', 'not json', '{"action": "hit"}', '["K"]', '{"seen": "K K K K K K K K K '
+             'K K K K K K K K K K K K K K K K"}', '', '{"cards": "9"}', '{"action": "stand"}', '{"card": "8"}']
+    records = list(EventStream(6, 1).run(lines))
+    errors = [r['line'] for r in records if r['type'] == 'error']
+    assert errors == [2, 3, 4, 5]
+    assert [r['type'] for r in records if r['type'] != 'error'] == ['decision', 'settlement', 'summary']
+    assert records[-1]['events'] == 4
+    print("✓ Errors reported per line, the stream carries on")
+
+
+def test_memory_stays_flat():
+    """Twenty shoes take no more memory than two"""
+    peaks = []
+    for shoes in (2, 20):
+        lines, _ = record_shoes(shoes, seed=6)
+        tracemalloc.start()
+        for _ in EventStream(6, 2).run(iter(lines)):
+            pass
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    assert peaks[1] < peaks[0] * 1.5, peaks
+    print(f"✓ Peak memory {peaks[0] // 1024} KiB for 2 shoes, {peaks[1] // 1024} KiB for 20")
+
+
+def test_console_flag():
+    """main.py --jsonl - pipes stdin to JSON lines on stdout"""
+    lines, expected = record_shoes(1, seed=7)
+    main = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    result = subprocess.run([sys.executable, main, '--jsonl', '-', '--players', '2'],
+                            input="\n".join(lines), capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert outputs(json.loads(line) for line in result.stdout.splitlines()) == expected
+    print("✓ main.py --jsonl streams stdin to stdout")
+
+
+if __name__ == "__main__":
+    test_recorded_play_matches_the_engine()
+    test_bad_lines_are_reported_and_skipped()
+    test_memory_stays_flat()
+    test_console_flag()
+    print("\n🎉 Event stream tests passed!")
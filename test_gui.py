@@ -38,9 +38,9 @@ def test_gui_fixes():
         assert hasattr(gui, 'submit_action'), "Missing submit_action method"
         print("✓ submit_action method exists")
         
-        # Test wait_for_input method exists
-        assert hasattr(gui, 'wait_for_input'), "Missing wait_for_input method"
-        print("✓ wait_for_input method exists")
+        # Test show_prompt method exists
+        assert hasattr(gui, 'show_prompt'), "Missing show_prompt method"
+        print("✓ show_prompt method exists")
         
         # Test enable/disable action buttons methods
         assert hasattr(gui, 'enable_action_buttons'), "Missing enable_action_buttons method"
@@ -67,7 +67,7 @@ if __name__ == "__main__":
         print("\n🎉 All GUI fixes appear to be working correctly!")
         print("\nKey fixes implemented:")
         print("1. ✓ submit_action now handles 'other_action' input type")
-        print("2. ✓ wait_for_input enables action buttons for 'other_action'")
+        print("2. ✓ show_prompt enables action buttons for 'other_action'")
         print("3. ✓ Keyboard shortcuts work for both 'action' and 'other_action'")
         print("4. ✓ Added Bust button for other players")
         print("5. ✓ submit_card handles text input for other player actions")
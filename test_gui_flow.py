@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the event-driven GUI round flow (no game thread)
+"""
+import random
+
+from cards import card_name
+from engine import BlackjackEngine
+from mainActivity import BlackjackGameGUI
+from simulator import build_shoe, choose_other_action
+from test_render import FakeRoot
+from test_undo import snapshot
+
+
+class FakeGUI:
+    """Records what the game asks of the GUI"""
+
+    def __init__(self):
+        self.root = FakeRoot()
+        self.prompts = []
+        self.fields = []
+        self.statuses = []
+        self.recommendation = None
+        self.round_finished = lambda: None
+
+    def show_prompt(self, text, kind):
+        self.prompts.append((kind, text))
+
+    def refresh(self, *fields):
+        self.fields.append(fields)
+
+    def update_status(self, message):
+        self.statuses.append(message)
+
+    def update_strategy_display(self, action, color_name):
+        self.recommendation = action
+
+    def update_ev_display(self, evs, action):
+        pass
+
+
+def answer(game, shoe, position, rng):
+    """The input a player would submit for the game's prompt"""
+    prompt = game.prompt
+    if prompt.kind == 'card':
+        return card_name(shoe[position]), position + 1
+    if prompt.kind == 'action':
+        return rng.choice(game.decision.actions), position
+    if prompt.kind == 'other_action':
+        return choose_other_action(game, prompt), position
+    return rng.choice(('y', 'n')), position
+
+
+def test_inputs_advance_the_round_directly():
+    """Each submitted input is applied before submit returns, with the next prompt already shown"""
+    print("Testing GUI round flow...")
+    rng = random.Random(8)
+    shoe = build_shoe(6, rng)
+    gui = FakeGUI()
+    game = BlackjackGameGUI(6, 3, gui)
+    engine = BlackjackEngine(6, 3)
+    position = 0
+    for _ in range(10):
+        game.play_round()
+        engine.start_round()
+        while game.prompt is not None:
+            assert gui.prompts[-1] == (game.prompt.kind, game.prompt.text)
+            value, position = answer(game, shoe, position, rng)
+            engine.feed(engine.prompt.kind, value)
+            game.submit(value)
+            assert snapshot(game) == snapshot(engine)
+            if game.decision is not None:
+                assert gui.recommendation == game.decision.action
+        # A settled round hands over to the continue dialog on the Tk loop
+        assert list(gui.root.scheduled.values()) == [gui.round_finished]
+        gui.root.run()
+    print(f"✓ 10 rounds played through submit(), {len(gui.prompts)} prompts, no thread")
+
+
+def test_undo_and_restart():
+    """Undo and restart are inputs like any other and re-prompt from the restored state"""
+    gui = FakeGUI()
+    game = BlackjackGameGUI(2, 1, gui)
+    game.play_round()
+    start = snapshot(game)
+    for card in ('10', '5', '9'):
+        game.submit(card)
+    game.submit('UNDO')
+    assert gui.prompts[-1] == ('card', "Enter dealer's upcard: ")
+    game.submit('restart')
+    assert snapshot(game) == start and gui.statuses[-1] == "Round restarted"
+    print("✓ Undo and restart re-prompt without a thread hop")
+
+
+if __name__ == "__main__":
+    test_inputs_advance_the_round_directly()
+    test_undo_and_restart()
+    print("\n🎉 GUI flow tests passed!")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test script to validate incremental Hand evaluation against the list-based functions
+"""
+import random
+
+from cards import ACE, RANK_INDEX
+from engine import BlackjackEngine, CARD_RANKS
+from hand import Hand
+
+
+def test_hand_matches_list_evaluation():
+    """Value and soft flag after every append match calculate_hand_value/is_soft_hand"""
+    print("Testing incremental Hand...")
+    game = BlackjackEngine(1, 1)
+    rng = random.Random(11)
+    for _ in range(3000):
+        cards = []
+        hand = Hand()
+        for _ in range(rng.randint(1, 7)):
+            card = rng.choice(CARD_RANKS)
+            cards.append(card)
+            hand.append(RANK_INDEX[card])
+            assert hand.total == game.calculate_hand_value(cards), cards
+            assert hand.soft == game.is_soft_hand(cards), cards
+            assert game.calculate_hand_value(hand) == hand.total
+    print("✓ Incremental values match list evaluation")
+
+
+def test_hand_behaves_like_list():
+    """Existing display and comparison code keeps working"""
+    hand = Hand.from_names(['8', '8'])
+    assert hand == ['8', '8'] and hand.pair
+    assert repr(hand) == "['8', '8']"
+    assert list(hand) == ['8', '8'] and hand[0] == '8' and len(hand) == 2
+    hand.append(ACE)
+    assert not hand.pair and hand.total == 17 and not hand.soft
+    print("✓ Hand behaves like a card list")
+
+
+if __name__ == "__main__":
+    test_hand_matches_list_evaluation()
+    test_hand_behaves_like_list()
+    print("\n🎉 Hand tests passed!")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the opt-in profiler and its fixed-size histograms
+"""
+import random
+
+from engine import BlackjackEngine
+from profiling import ENGINE_PROBES, NUM_BINS, Histogram, LatencyProbe, Profiler
+from render import Renderer
+from simulator import SimulationStats, build_shoe, play_shoe
+from test_render import FakeLabel, FakeRoot
+
+
+def test_histogram_percentiles():
+    """Percentiles come from fixed log bins, within one bin of the exact value"""
+    print("Testing profiler...")
+    histogram = Histogram()
+    durations = [i * 1e-6 for i in range(1, 1001)]     # 1us .. 1ms
+    random.Random(1).shuffle(durations)
+    for seconds in durations:
+        histogram.record(seconds)
+    histogram.record(100.0)                             # beyond the last bin
+    assert len(histogram.bins) == NUM_BINS and histogram.count == 1001
+    for q, exact in ((50, 500e-6), (95, 950e-6)):
+        assert exact <= histogram.percentile(q) <= exact * 2 ** 0.25 * 1.001
+    assert histogram.percentile(100) == histogram.max == 100.0
+    print("✓ Percentiles within one bin from a fixed 100-bin histogram")
+
+
+def test_instrumented_engine():
+    """Probes count every call while installed and leave no trace once removed"""
+    shoe = build_shoe(6, random.Random(4))
+    plain, profiled = BlackjackEngine(6, 2), BlackjackEngine(6, 2)
+    profiler = Profiler()
+    profiler.instrument(profiled, ENGINE_PROBES)
+    plain_stats, profiled_stats = SimulationStats(), SimulationStats()
+    play_shoe(plain, shoe, 0.75, plain_stats)
+    play_shoe(profiled, shoe, 0.75, profiled_stats)
+    assert profiled_stats.total_payout == plain_stats.total_payout
+    histograms = profiler.histograms
+    assert histograms['count_update'].count == len(profiled.cards_dealt)
+    assert histograms['strategy'].count > 0 and histograms['dealer_play'].count > 0
+    assert 'Probe' in profiler.report() and 'count_update' in profiler.report()
+
+    profiler.uninstrument()
+    assert not set(ENGINE_PROBES.values()) & set(vars(profiled))
+    calls = histograms['count_update'].count
+    profiled.add_card_to_dealt('5')
+    assert histograms['count_update'].count == calls
+    print(f"✓ {calls} count updates timed; probes removed cleanly")
+
+
+def test_latency_probe():
+    """Input latency is recorded at the first redraw and when the recommendation is drawn"""
+    root = FakeRoot()
+    renderer = Renderer(root)
+    profiler = Profiler()
+    probe = LatencyProbe(profiler)
+    renderer.on_flush = probe.flushed
+    renderer.add('counts', FakeLabel(), lambda: "Running Count: 1")
+    renderer.add('strategy', FakeLabel(), lambda: "HIT")
+
+    probe.start()
+    renderer.invalidate('counts')
+    root.run()
+    assert profiler.histograms['gui.input_to_screen'].count == 1
+    assert 'gui.input_to_recommendation' not in profiler.histograms
+    renderer.invalidate('strategy')
+    root.run()
+    renderer.invalidate('strategy')
+    root.run()
+    assert profiler.histograms['gui.input_to_recommendation'].count == 1
+    assert profiler.histograms['gui.input_to_screen'].count == 1
+    print("✓ Keystroke-to-screen and keystroke-to-recommendation latency recorded once per input")
+
+
+if __name__ == "__main__":
+    test_histogram_percentiles()
+    test_instrumented_engine()
+    test_latency_probe()
+    print("\n🎉 Profiling tests passed!")
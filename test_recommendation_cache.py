@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the LRU recommendation cache
+"""
+from engine import BlackjackEngine
+from recommendation_cache import RecommendationCache
+
+
+def test_lru_eviction_and_epochs():
+    """The least recently used entry goes first, and a new epoch drops everything"""
+    print("Testing recommendation cache...")
+    cache = RecommendationCache(max_entries=2)
+    epoch = cache.epoch(0.4, 300)
+    assert cache.get('a', epoch) is None
+    cache.put('a', 1)
+    cache.get('b', epoch)
+    cache.put('b', 2)
+    assert cache.get('a', epoch) == 1          # 'a' is now the most recently used
+    cache.get('c', epoch)
+    cache.put('c', 3)
+    assert cache.get('b', epoch) is None and cache.get('a', epoch) == 1 and len(cache) == 2
+    # Same bucket and class: still valid; another bucket or class: invalidated
+    assert cache.epoch(0.9, 290) == epoch
+    assert cache.get('a', cache.epoch(1.1, 300)) is None and len(cache) == 0
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.invalidations) == (2, 5, 1, 1)
+    assert abs(stats.hit_rate - 2 / 7) < 1e-9 and "hit rate" in cache.report()
+    print("✓ LRU eviction, epoch invalidation and hit-rate stats")
+
+
+def test_engine_serves_repeats():
+    """A repeated decision is served from the cache until the count bucket or composition class moves"""
+    game = BlackjackEngine(6, 1)
+    game.recommendation_cache = RecommendationCache()
+    game.start_round()
+    for card in ['10', '6', '9']:
+        game.feed_card(card)
+    first = game.get_action_evs()
+    again = game.get_action_evs()
+    assert again == first and again is not first
+    assert game.recommendation_cache.stats()[:2] == (1, 1)
+
+    # A neutral card leaves bucket and class alone: served from the cache, close to a fresh solve
+    game.add_card_to_dealt('8')
+    cached = game.get_action_evs()
+    game.recommendation_cache, cache = None, game.recommendation_cache
+    fresh = game.get_action_evs()
+    game.recommendation_cache = cache
+    assert cache.hits == 2 and cached == first
+    assert all(abs(cached[action] - fresh[action]) < 0.01 for action in fresh)
+
+    # Enough tens to move the true count bucket invalidate the entry
+    for _ in range(6):
+        game.add_card_to_dealt('K')
+    game.get_action_evs()
+    assert cache.invalidations == 1 and cache.misses == 2
+
+    game.reset_game()
+    assert len(cache) == 0
+    print(f"✓ Engine repeats served from the cache ({cache.stats().hit_rate:.0%} hit rate)")
+
+
+if __name__ == "__main__":
+    test_lru_eviction_and_epochs()
+    test_engine_serves_repeats()
+    print("\n🎉 Recommendation cache tests passed!")
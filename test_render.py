@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the dirty-tracked, frame-coalesced GUI rendering
+"""
+from mainActivity import BlackjackGameGUI
+from render import Renderer
+
+
+class FakeRoot:
+    """Collects after() callbacks instead of running a Tk event loop"""
+
+    def __init__(self):
+        self.scheduled = {}
+        self.delays = []
+
+    def after(self, ms, callback):
+        self.delays.append(ms)
+        self.scheduled[len(self.delays)] = callback
+        return len(self.delays)
+
+    def after_cancel(self, after_id):
+        self.scheduled.pop(after_id, None)
+
+    def run(self):
+        pending, self.scheduled = self.scheduled, {}
+        for callback in pending.values():
+            callback()
+
+
+class FakeLabel:
+    def __init__(self):
+        self.configs = []
+
+    def config(self, **options):
+        self.configs.append(options)
+
+
+def test_marks_coalesce_into_one_flush():
+    """Many marks before the frame is drawn cost one flush; unchanged labels are not touched"""
+    print("Testing GUI rendering...")
+    root = FakeRoot()
+    renderer = Renderer(root)
+    state = {'count': 0, 'dealer': 'Cards: []'}
+    count, dealer = FakeLabel(), FakeLabel()
+    renders = []
+    renderer.add('counts', count, lambda: renders.append('counts') or f"Running Count: {state['count']}")
+    renderer.add('dealer', dealer, lambda: {'text': state['dealer'], 'fg': 'white'})
+
+    for card in range(30):
+        state['count'] += 1
+        renderer.invalidate('counts')
+    assert len(root.scheduled) == 1
+    root.run()
+    assert renderer.flushes == 1 and renders == ['counts']
+    assert count.configs == [{'text': "Running Count: 30"}] and dealer.configs == []
+
+    # A full redraw only reconfigures labels whose text changed
+    state['dealer'] = 'Cards: [10]'
+    renderer.invalidate()
+    assert renderer.flush() == 1
+    assert len(count.configs) == 1 and dealer.configs == [{'text': 'Cards: [10]', 'fg': 'white'}]
+    print("✓ 30 card marks drawn in one flush")
+
+
+def test_flushes_are_a_frame_apart():
+    """A mark right after a flush waits for the next frame; removed fields are not drawn"""
+    root = FakeRoot()
+    renderer = Renderer(root, frame_ms=50)
+    label = FakeLabel()
+    renderer.add('Player 2', label, lambda: "Cards: []")
+    renderer.invalidate('Player 2')
+    root.run()
+    renderer.invalidate('Player 2')
+    assert root.delays[0] == 0 and 30 < root.delays[1] <= 50
+    renderer.remove('Player 2')
+    root.run()
+    assert renderer.flushes == 2 and len(label.configs) == 1
+    print("✓ Flushes are at least one frame apart")
+
+
+def test_fed_input_marks_only_its_fields():
+    """A card marks the counts and the seat it went to, not every player"""
+    game = BlackjackGameGUI(6, 6, gui=None)
+    game.start_round()
+    prompt = game.prompt
+    notices = game.feed_rank(9)
+    assert game.changed_fields(prompt, notices) == {'money', 'Player 1', 'counts', 'odds'}
+    while game.prompt.target != 'dealer':
+        game.feed_rank(4)
+    prompt = game.prompt
+    assert game.changed_fields(prompt, game.feed_rank(0)) == {'money', 'dealer', 'counts', 'odds'}
+    print("✓ Fed cards mark only the fields they change")
+
+
+if __name__ == "__main__":
+    test_marks_coalesce_into_one_flush()
+    test_flushes_are_a_frame_apart()
+    test_fed_input_marks_only_its_fields()
+    print("\n🎉 Rendering tests passed!")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script to validate configurable table rules
+"""
+import os
+import tempfile
+
+import strategy_table
+from engine import BlackjackEngine, CARD_RANKS
+from main import BlackjackGame
+from mainActivity import BlackjackGameGUI
+from rules import DEFAULT_RULES, get_ruleset, ruleset_key
+from strategy_table import StrategyTable, chart_strategy, get_strategy_table, load_table, table_key
+from tables import TableManager
+
+
+def play(game, events):
+    """Feed a scripted round: card strings, or (action) tuples for decisions"""
+    game.start_round()
+    for event in events:
+        if isinstance(event, tuple):
+            game.feed_action(event[0])
+        else:
+            game.feed_card(event)
+    return game
+
+
+def test_dealer_soft_17_and_payout():
+    """S17 dealers stand on soft 17, H17 dealers draw; 6:5 pays less on a blackjack"""
+    print("Testing table rules...")
+    s17 = play(BlackjackEngine(6, 1, rules=get_ruleset('s17')), ['10', '7', '6', ('s',), 'A'])
+    assert s17.prompt is None and s17.settlement.outcomes == {'Player 1': 'push'}
+    h17 = play(BlackjackEngine(6, 1), ['10', '7', '6', ('s',), 'A'])
+    assert h17.prompt.kind == 'card' and h17.prompt.target == 'dealer'
+
+    for name, expected in (('h17', 7), ('downtown', 6)):
+        game = BlackjackEngine(6, 1, rules=get_ruleset(name))
+        game.current_bet = 5
+        assert game.hand_payout("blackjack", "blackjack") == expected
+    print("✓ S17 stands on soft 17, 6:5 pays 6 on a bet of 5")
+
+
+def test_late_surrender():
+    """Surrender is offered on a first two-card hand, recommended on 16v10 and void against a blackjack"""
+    rules = get_ruleset('h17-ls')
+    game = play(BlackjackEngine(6, 1, rules=rules), ['10', '6', 'K'])
+    assert "surrender" in game.decision.actions and game.decision.action == "SURRENDER"
+    game.current_bet = 4     # payouts are whole units: an odd bet loses the odd unit on a surrender
+    evs = game.get_action_evs()
+    assert -0.6 < evs['SURRENDER'] < -0.5 and evs['SURRENDER'] > evs['HIT']
+    game.feed_action('r')
+    game.feed_card('7')
+    assert game.settlement.outcomes == {'Player 1': 'surrender'} and game.settlement.payout == -2
+
+    game = play(BlackjackEngine(6, 1, rules=rules), ['10', '6', 'K', ('surrender',), 'A'])
+    assert game.settlement.outcomes == {'Player 1': 'dealer'}
+    game = play(BlackjackEngine(6, 1, rules=rules), ['5', '2', 'K', ('h',), '2'])
+    assert "surrender" not in game.decision.actions     # first two cards only
+
+    game = play(BlackjackEngine(6, 1), ['10', '6', 'K'])
+    assert "surrender" not in game.decision.actions
+    try:
+        game.feed_action('surrender')
+        assert False, "surrender accepted without late surrender"
+    except ValueError:
+        pass
+    print("✓ Late surrender offered, settled at half the bet and void against a blackjack")
+
+
+def test_resplits_and_das():
+    """Pairs split up to max_hands (undoing back cleanly); no DAS takes double away from split hands"""
+    game = play(BlackjackEngine(6, 1, rules=get_ruleset('h17-ls')), ['8', '8', '6', ('p',), '8', '5'])
+    assert "split" in game.decision.actions
+    before = {key: list(hand) for key, hand in game.player_hands.items()}
+    game.feed_action('p')
+    for card in ['3', '9']:
+        game.feed_card(card)
+    assert game.hand_keys('Player 1') == ['Player 1_hand1', 'Player 1_hand2', 'Player 1_hand3']
+    assert [game.player_hands[key].cards for key in game.hand_keys('Player 1')] == [['8', '3'], ['8', '5'],
+                                                                                     ['8', '9']]
+    for _ in range(3):
+        game.undo_last_action()
+    assert {key: list(hand) for key, hand in game.player_hands.items()} == before
+
+    default = play(BlackjackEngine(6, 1), ['8', '8', '6', ('p',), '8', '5'])
+    assert "split" not in default.decision.actions and "double" in default.decision.actions
+    no_das = play(BlackjackEngine(6, 1, rules=get_ruleset('no-das')), ['8', '8', '6', ('p',), '3', '5'])
+    assert no_das.decision.actions == ["hit", "stand"] and no_das.decision.action == "HIT"
+    table = StrategyTable(rules=get_ruleset('no-das'))
+    assert [table.recommend(['6', '6'], upcard, 0, True, True) for upcard in ('2', '3', '7')] == ["HIT", "SPLIT",
+                                                                                                "HIT"]
+    assert table.recommend(['4', '4'], '5', 0, True, True) == "HIT"
+    print("✓ Split to four hands with undo, no double after split without DAS")
+
+
+def test_tables_cached_per_ruleset():
+    """Each ruleset compiles its own table once, to disk, and later loads give the same answers"""
+    rules = get_ruleset('s17-ls')
+    assert ruleset_key(rules) == ruleset_key(get_ruleset('s17-ls')) != ruleset_key(DEFAULT_RULES)
+    assert table_key(rules=rules) != table_key(rules=get_ruleset('s17'))
+    strategy_table._strategy_tables.pop(table_key(rules=rules), None)     # compiled by an earlier test
+    with tempfile.TemporaryDirectory() as cache_dir:
+        table = get_strategy_table(rules=rules, cache_dir=cache_dir)
+        path = os.path.join(cache_dir, f"strategy_{table_key(rules=rules)}.json")
+        assert os.path.exists(path)
+        assert get_strategy_table(rules=rules, cache_dir=cache_dir) is table
+
+        loaded = load_table(path, rules=rules)
+        assert loaded.codes == table.codes and loaded.surrender == table.surrender
+        assert loaded.codes == StrategyTable(rules=rules).codes
+    for upcard in CARD_RANKS:
+        for pair in ('2', '4', '6'):
+            assert (loaded.recommend([pair, pair], upcard, 0, True, True)
+                    == chart_strategy([pair, pair], upcard, 0, True, True, rules=rules))
+    print("✓ Compiled tables keyed by ruleset hash, written once and read back")
+
+
+def test_manager_tables_with_their_own_rules():
+    """Tables of one manager can each play under a different ruleset"""
+    manager = TableManager(total_decks=6)
+    manager.add_table('A')
+    manager.add_table('B', rules=get_ruleset('downtown'))
+    manager.add_table('C', 2, get_ruleset('s17'))
+    assert manager.tables['A'].rules == DEFAULT_RULES
+    assert manager.tables['B'].rules.blackjack_payout == 1.2
+    assert manager.tables['C'].rules.decks == 2 and manager.tables['C'].total_decks == 2
+    manager.flush()
+    assert manager.status['C'].rules == "2D S17 DAS 3:2"
+    print("✓ Table manager tracks tables under different rules")
+
+
+def test_front_ends_play_their_rules():
+    """The console takes the deck count entered for its ruleset; the GUI plays the ruleset it is given"""
+    console = BlackjackGame(2, 1, rules=get_ruleset('s17-ls'))
+    assert console.rules == get_ruleset('s17-ls', 2) and console.strategy_table.rules == console.rules
+    assert BlackjackGame(4, 1).rules == DEFAULT_RULES._replace(decks=4)
+    gui = play(BlackjackGameGUI(2, 1, None, rules=get_ruleset('s17', 2)), ['10', '7', '6', ('s',), 'A'])
+    assert gui.prompt is None and gui.settlement.outcomes == {'Player 1': 'push'}
+    print("✓ Console and GUI games play the ruleset chosen for them")
+
+
+if __name__ == "__main__":
+    test_dealer_soft_17_and_payout()
+    test_late_surrender()
+    test_resplits_and_das()
+    test_tables_cached_per_ruleset()
+    test_manager_tables_with_their_own_rules()
+    test_front_ends_play_their_rules()
+    print("\n🎉 Table rules tests passed!")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the binary session log, resume and replay
+"""
+import os
+import random
+import tempfile
+import time
+
+from engine import BlackjackEngine
+from rules import get_ruleset
+from session_log import (HEADER, INDEX_ENTRY, RECORD, ReplayError, index_path, read_header, read_index, replay,
+                         resume_session, start_session)
+from simulator import build_shoe, choose_other_action
+from test_undo import snapshot
+
+
+def state(game):
+    """snapshot() without the order cards were dealt in, which a resumed session does not know"""
+    fields = list(snapshot(game))
+    fields[3] = sorted(fields[3])
+    return fields
+
+
+def play_logged(game, shoe, position, rounds, rng, undo_rate=0.0):
+    """Play scripted rounds with occasional undos; returns the next shoe position"""
+    for _ in range(rounds):
+        game.start_round()
+        while game.prompt is not None:
+            if game.game_history and rng.random() < undo_rate:
+                entry = game.undo_last_action()
+                if entry.kind == 'card':
+                    position -= 1
+                continue
+            prompt = game.prompt
+            if prompt.kind == 'card':
+                game.feed_rank(shoe[position])
+                position += 1
+            elif prompt.kind == 'action':
+                game.feed_action(rng.choice(game.decision.actions))
+            elif prompt.kind == 'other_action':
+                game.feed_action(choose_other_action(game, prompt))
+            else:
+                game.feed_insurance(rng.random() < 0.5)
+    return position
+
+
+def test_replay_reproduces_session():
+    """A recorded session replays to the same state, with bets and payouts verified"""
+    print("Testing session log...")
+    rng = random.Random(11)
+    shoe = build_shoe(6, rng)
+    game = BlackjackEngine(6, 2)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'session.bjlog')
+        log = start_session(game, path)
+        game.add_rank_to_dealt(shoe[0])     # burn card, counted outside any round
+        position = play_logged(game, shoe[1:], 0, 25, rng, undo_rate=0.05)
+        game.start_round()
+        game.feed_rank(shoe[position + 1])
+        assert game.rewind_round()
+        log.close()
+
+        size = os.path.getsize(path)
+        assert (size - HEADER.size) % RECORD.size == 0
+        rounds = len(read_index(path))
+        assert rounds >= 26 and os.path.getsize(index_path(path)) == rounds * INDEX_ENTRY.size
+
+        start = time.perf_counter()
+        replayed, count = replay(path)
+        elapsed = time.perf_counter() - start
+    assert count == (size - HEADER.size) // RECORD.size
+    assert snapshot(replayed) == snapshot(game)
+    assert replayed.prompt.target == 'Player 1' and replayed.game_history == game.game_history
+    print(f"✓ Replayed {count} events in {elapsed * 1000:.1f} ms")
+
+
+def test_resume_after_crash():
+    """A session cut off mid-round resumes where it stopped and keeps logging"""
+    rng = random.Random(3)
+    shoe = build_shoe(2, rng)
+    game = BlackjackEngine(2, 1)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'session.bjlog')
+        start_session(game, path)
+        position = play_logged(game, shoe, 0, 12, rng)
+        game.start_round()
+        for _ in range(2):
+            game.feed_rank(shoe[position])
+            position += 1
+        # Crash in the middle of writing a record
+        game.session_log.close()
+        game.session_log = None
+        with open(path, 'ab') as f:
+            f.write(b'\x01\x00')
+
+        resumed = resume_session(BlackjackEngine(2, 1), path)
+        assert state(resumed) == state(game) and resumed.phase == 'deal'
+
+        # Undo reaches the start of the resumed round
+        assert resumed.undo_last_action().kind == 'card'
+        resumed.feed_rank(shoe[position - 1])
+        for engine in (game, resumed):
+            engine.feed_rank(shoe[position])
+        assert state(resumed) == state(game)
+
+        # The resumed engine keeps appending to the same log
+        resumed.session_log.close()
+        replayed, _ = replay(path)
+    assert state(replayed) == state(resumed)
+    print("✓ Crashed session resumed from the last round")
+
+
+def test_rules_travel_with_the_log():
+    """A session under other rules replays and resumes under them, and not under the defaults"""
+    for name in ('s17-ls', 'downtown'):
+        rules = get_ruleset(name, 2)
+        rng = random.Random(8)
+        shoe = build_shoe(2, rng)
+        game = BlackjackEngine(2, 1, rules=rules)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'session.bjlog')
+            start_session(game, path)
+            play_logged(game, shoe, 0, 15, rng)
+            game.session_log.close()
+            assert read_header(path).rules == rules
+
+            replayed, _ = replay(path)
+            assert replayed.rules == rules and snapshot(replayed) == snapshot(game)
+            resumed = resume_session(BlackjackEngine(2, 1, rules=rules), path)
+            assert state(resumed) == state(game)
+            resumed.session_log.close()
+            try:
+                resume_session(BlackjackEngine(2, 1), path)
+                assert False, "resumed under other rules"
+            except ReplayError:
+                pass
+    print("✓ Table rules stored in the log header")
+
+
+def test_resume_past_undone_round():
+    """Undoing back into an earlier round resumes from an earlier snapshot"""
+    rng = random.Random(9)
+    shoe = build_shoe(1, rng)
+    game = BlackjackEngine(1, 1)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'session.bjlog')
+        start_session(game, path)
+        play_logged(game, shoe, 0, 3, rng)
+        game.start_round()
+        game.undo_last_action()
+        game.undo_last_action()     # last card of the previous round
+        resumed = resume_session(BlackjackEngine(1, 1), path)
+        game.session_log.close()
+        resumed.session_log.close()
+    assert state(resumed) == state(game) and resumed.round_number == 3
+    print("✓ Undo past the last round resumes from an earlier snapshot")
+
+
+if __name__ == "__main__":
+    test_replay_reproduces_session()
+    test_resume_after_crash()
+    test_rules_travel_with_the_log()
+    test_resume_past_undone_round()
+    print("\n🎉 Session log tests passed!")
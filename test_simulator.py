@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the Monte Carlo shoe simulator
+"""
+from simulator import SimulationStats, run_simulation, tc_bucket
+
+
+def test_simulation_is_reproducible():
+    """Same seed gives the same results and every shoe is played out"""
+    print("Testing simulator...")
+    first = run_simulation(total_decks=2, num_players=2, num_shoes=6, workers=1, seed=7, chunk_shoes=2)
+    second = run_simulation(total_decks=2, num_players=2, num_shoes=6, workers=1, seed=7, chunk_shoes=2)
+
+    assert first.shoes == 6
+    assert first.rounds > 0
+    assert first.total_payout == second.total_payout
+    assert sum(row[0] for row in first.by_true_count.values()) == first.rounds
+    print("✓ Seeded simulation is reproducible")
+
+
+def test_stats_merge():
+    """Merged worker stats match recording everything in one place"""
+    a, b, combined = SimulationStats(), SimulationStats(), SimulationStats()
+    for tc, bet, payout in [(-1.5, 1, -1), (2.2, 2, 4), (0.0, 1, 0)]:
+        a.record(tc, bet, payout)
+        combined.record(tc, bet, payout)
+    b.record(9.3, 10, 15)
+    combined.record(9.3, 10, 15)
+    a.merge(b)
+
+    assert a.summary()['by_true_count'] == combined.summary()['by_true_count']
+    assert abs(a.ev_per_100() - 450.0) < 1e-9
+    assert tc_bucket(9.3) == 8 and tc_bucket(-1.5) == -2
+    print("✓ Stats merge correctly")
+
+
+if __name__ == "__main__":
+    test_simulation_is_reproducible()
+    test_stats_merge()
+    print("\n🎉 Simulator tests passed!")
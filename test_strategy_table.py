@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Exhaustive equivalence check of the compiled strategy table against the chart
+"""
+from itertools import combinations_with_replacement
+
+from engine import ACTION_COLORS, BlackjackEngine, CARD_RANKS
+from hand import Hand
+from strategy_table import StrategyTable, chart_strategy
+
+# Both sides of every deviation index, plus fractional and out-of-range counts
+TRUE_COUNTS = [-7.5, -1.0, -0.01, 0.0, 0.5, 0.99, 1.0, 1.99, 2.0, 2.5, 3.0, 3.99, 4.0, 4.99, 5.0, 5.01, 9.3]
+
+
+def all_hands():
+    """Every 2-card hand (ordered, so pairs are covered) and every 3-card hand up to 21"""
+    hands = [[a, b] for a in CARD_RANKS for b in CARD_RANKS]
+    for cards in combinations_with_replacement(CARD_RANKS, 3):
+        hands.append(list(cards))
+    return hands
+
+
+def test_table_matches_chart():
+    """Every hand/upcard/flag/count combination gives the chart's answer"""
+    print("Testing compiled strategy table...")
+    table = StrategyTable()
+    game = BlackjackEngine(1, 1)
+    checked = 0
+    for cards in all_hands():
+        if game.calculate_hand_value(cards) > 21:
+            continue
+        hand = Hand.from_names(cards)
+        for dealer_upcard in CARD_RANKS:
+            for can_double in (False, True):
+                for can_split in (False, True):
+                    for true_count in TRUE_COUNTS:
+                        expected = chart_strategy(cards, dealer_upcard, true_count, can_double, can_split)
+                        actual = table.recommend(cards, dealer_upcard, true_count, can_double, can_split)
+                        assert actual == expected, (cards, dealer_upcard, can_double, can_split, true_count)
+                        actual = table.recommend(hand, dealer_upcard, true_count, can_double, can_split)
+                        assert actual == expected, (hand, dealer_upcard, can_double, can_split, true_count)
+                        checked += 1
+    print(f"✓ {checked} decisions identical to the chart")
+
+
+# Default (H17, DAS) pair splits at a true count of 0, written out from the original chart
+BASELINE_SPLITS = {
+    'A': ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'A'],
+    '2': ['2', '3', '4', '5', '6', '7'],
+    '3': ['2', '3', '4', '5', '6', '7'],
+    '4': ['5', '6'],
+    '5': [],
+    '6': ['2', '3', '4', '5', '6', '7'],
+    '7': ['2', '3', '4', '5', '6', '7'],
+    '8': ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'A'],
+    '9': ['2', '3', '4', '5', '6', '8', '9'],
+    '10': [],
+}
+
+
+def test_default_table_pinned():
+    """The default compiled table splits pairs exactly as the original chart did"""
+    table = StrategyTable()
+    game = BlackjackEngine(6, 1)
+    for pair, splits in BASELINE_SPLITS.items():
+        for dealer_upcard in ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'A']:
+            split = table.recommend([pair, pair], dealer_upcard, 0, True, True) == "SPLIT"
+            assert split == (dealer_upcard in splits), (pair, dealer_upcard)
+    assert game.get_basic_strategy(['6', '6'], '7', True, True)[0] == "SPLIT"
+    assert game.get_basic_strategy(['4', '4'], '5', True, True)[0] == "SPLIT"
+    print("✓ Default pair splits match the original chart")
+
+
+def test_engine_uses_table():
+    """get_basic_strategy returns the chart action and its display color"""
+    game = BlackjackEngine(6, 1)
+    for _ in range(15):
+        game.add_card_to_dealt('4')  # running count 30, TC +5.25
+    assert game.get_basic_strategy(['10', '10'], '6', True, True) == ("SPLIT", ACTION_COLORS["SPLIT"])
+    assert game.get_basic_strategy(['10', '6'], '10', True, False) == ("STAND", ACTION_COLORS["STAND"])
+    game = BlackjackEngine(6, 1)
+    for _ in range(3):
+        game.add_card_to_dealt('K')  # running count -6
+    assert game.get_basic_strategy(['10', '6'], 'K', True, False) == ("HIT", ACTION_COLORS["HIT"])
+    print("✓ Engine reads the compiled table")
+
+
+if __name__ == "__main__":
+    test_table_matches_chart()
+    test_default_table_pinned()
+    test_engine_uses_table()
+    print("\n🎉 Strategy table tests passed!")
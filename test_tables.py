@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script to validate multi-table tracking on asyncio
+"""
+import asyncio
+import random
+
+from engine import BlackjackEngine
+from simulator import build_shoe
+from tables import WONG_IN, TableEvent, TableManager, format_summary, parse_command
+
+
+def test_tables_match_single_engines():
+    """Twenty tables fed through one queue end up where twenty separate engines do"""
+    print("Testing table manager...")
+    rng = random.Random(6)
+    manager = TableManager(6)
+    engines = {}
+    shoes = {}
+    for number in range(1, 21):
+        name = f"T{number}"
+        manager.add_table(name)
+        engines[name] = BlackjackEngine(6, 1)
+        shoes[name] = build_shoe(6, rng)
+    batches = []
+    manager.subscribers.append(lambda changed: batches.append([status.name for status in changed]))
+
+    async def feed():
+        worker = asyncio.create_task(manager.run())
+        for position in range(0, 60, 3):
+            for name in rng.sample(sorted(engines), 5):
+                cards = shoes[name][:3]
+                del shoes[name][:3]
+                for rank in cards:
+                    engines[name].add_rank_to_dealt(rank)
+                await manager.submit(TableEvent(name, 'cards', cards))
+            await asyncio.sleep(0)
+        await manager.submit(TableEvent('T4', 'undo', None))
+        engines['T4'].undo_last_action()
+        await manager.queue.join()
+        worker.cancel()
+    asyncio.run(feed())
+
+    for name, engine in engines.items():
+        status = manager.status[name]
+        assert (status.running_count, status.true_count) == (engine.running_count, engine.get_true_count())
+    # Subscribers hear about the changed tables only, once per batch
+    assert all(len(batch) <= 5 for batch in batches[1:]) and len(batches) <= 22
+    ranking = manager.ranking()
+    assert [status.true_count for status in ranking] == sorted((s.true_count for s in ranking), reverse=True)
+    print(f"✓ 20 tables, {manager.events} events, {len(batches)} batched updates")
+
+
+def test_best_table_and_commands():
+    """The best table is the highest count at WONG_IN or above; bad input leaves a table untouched"""
+    manager = TableManager(1)
+    for name in ('A', 'B'):
+        manager.add_table(name)
+    manager.flush()
+    assert manager.best_table() is None
+    manager.apply(parse_command(manager, "2 2 3 4 5 6 4 5 6"))
+    manager.apply(parse_command(manager, "A 5"))
+    manager.flush()
+    assert manager.best_table().name == 'B' and manager.best_table().true_count >= WONG_IN
+    assert "Join B" in format_summary(manager)
+    try:
+        manager.apply(parse_command(manager, "A 5 5 5 5"))
+        assert False, "over-drawn sequence accepted"
+    except ValueError:
+        pass
+    assert manager.tables['A'].shoe[4] == 3
+    assert parse_command(manager, "add Pit-3") == ('add', 'Pit-3')
+    print("✓ Best table surfaced and bad input rejected")
+
+
+def test_back_pressure():
+    """Submitting to a full queue waits until the worker drains it"""
+    manager = TableManager(6, queue_size=2)
+    manager.add_table('T1')
+
+    async def feed():
+        for _ in range(2):
+            await manager.submit(TableEvent('T1', 'cards', [4]))
+        blocked = asyncio.create_task(manager.submit(TableEvent('T1', 'cards', [4])))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        worker = asyncio.create_task(manager.run())
+        await blocked
+        await manager.queue.join()
+        worker.cancel()
+    asyncio.run(feed())
+    assert manager.status['T1'].cards_seen == 3
+    print("✓ Full queue applies back-pressure")
+
+
+if __name__ == "__main__":
+    test_tables_match_single_engines()
+    test_best_table_and_commands()
+    test_back_pressure()
+    print("\n🎉 Table manager tests passed!")
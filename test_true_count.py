@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the cached true count and its resolutions
+"""
+import random
+
+from cards import card_name
+from engine import BlackjackEngine, true_count_divisors
+from simulator import build_shoe
+
+
+def test_cached_true_count_tracks_deals_and_undo():
+    """The cached value always equals the count recomputed from the shoe"""
+    print("Testing cached true count...")
+    rng = random.Random(3)
+    game = BlackjackEngine(6, 1)
+    for rank in build_shoe(6, rng)[:250]:
+        game.add_card_to_dealt(card_name(rank))
+        expected = round(game.running_count / (sum(game.shoe) / 52), 2)
+        assert game.get_true_count() == expected
+        if rng.random() < 0.2:
+            game.undo_last_action()
+            assert game.get_true_count() == round(game.running_count / (sum(game.shoe) / 52), 2)
+    print("✓ Cached true count matches the shoe")
+
+
+def test_resolutions():
+    """Half-deck and full-deck estimates round decks remaining before dividing"""
+    half = true_count_divisors(2, 'half_deck')
+    full = true_count_divisors(2, 'full_deck')
+    assert half[104] == 2 and half[70] == 1.5 and half[10] == 0.5 and half[0] == 0
+    assert full[70] == 1 and full[80] == 2 and full[10] == 1
+
+    game = BlackjackEngine(2, 1, 'half_deck')
+    game.start_round()
+    for card in ['2'] * 8 + ['3'] * 8 + ['4'] * 8 + ['5'] * 8 + ['6']:
+        game.add_card_to_dealt(card)
+    # 33 cards dealt: 71 left -> 1.5 decks; running count 8 + 8 + 16 + 16 + 2 = 50
+    assert game.get_true_count() == round(50 / 1.5, 2)
+    game.set_tc_resolution('full_deck')
+    assert game.get_true_count() == 50.0
+    game.set_tc_resolution('exact')
+    assert game.get_true_count() == round(50 / (71 / 52), 2)
+
+    try:
+        BlackjackEngine(2, 1, 'quarter_deck')
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    print("✓ True count resolutions")
+
+
+if __name__ == "__main__":
+    test_cached_true_count_tracks_deals_and_undo()
+    test_resolutions()
+    print("\n🎉 True count tests passed!")
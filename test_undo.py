@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script to validate the undo journal and round checkpoints
+"""
+import random
+
+from cards import RANK_INDEX
+from engine import BlackjackEngine
+from simulator import build_shoe, choose_other_action
+
+
+def snapshot(game):
+    """Everything undo has to put back"""
+    return (list(game.shoe), game.running_count, game.cards_remaining, list(game.cards_dealt),
+            {key: (list(hand), hand.total, hand.doubled) for key, hand in game.player_hands.items()},
+            dict(game.player_results), list(game.dealer_cards), game.player_balance,
+            game.round_number, game.current_bet, game.phase, game.prompt, game.decision,
+            game.settlement, game.insurance_taken)
+
+
+def play_events(game, shoe, rounds, rng):
+    """Play scripted rounds, returning the state before every event"""
+    states = []
+    position = 0
+    for _ in range(rounds):
+        states.append(snapshot(game))
+        game.start_round()
+        while game.prompt is not None:
+            states.append(snapshot(game))
+            prompt = game.prompt
+            if prompt.kind == 'card':
+                game.feed_rank(shoe[position])
+                position += 1
+            elif prompt.kind == 'action':
+                game.feed_action(rng.choice(game.decision.actions))
+            elif prompt.kind == 'other_action':
+                game.feed_action(choose_other_action(game, prompt))
+            else:
+                game.feed_insurance(rng.random() < 0.5)
+    return states
+
+
+def test_undo_restores_every_event():
+    """Undoing events one by one walks back through every earlier state"""
+    print("Testing undo journal...")
+    rng = random.Random(5)
+    game = BlackjackEngine(6, 3)
+    states = play_events(game, build_shoe(6, rng), 25, rng)
+    while states:
+        assert game.undo_last_action() is not None
+        assert snapshot(game) == states.pop()
+    assert game.undo_last_action() is None
+    assert game.cards_remaining == 312 and game.player_balance == 1000
+    print("✓ Every event undone exactly")
+
+
+def test_undo_removes_last_card_dealt():
+    """Undo takes back the most recent card, not the first card of that rank"""
+    game = BlackjackEngine(1, 1)
+    game.start_round()
+    for card in ['K', '5', 'K']:
+        game.feed_card(card)
+    game.undo_last_action()
+    assert game.cards_dealt == [RANK_INDEX['K'], RANK_INDEX['5']]
+    assert game.prompt.target == 'dealer'
+    print("✓ Last card undone")
+
+
+def test_rewind_round():
+    """Rewinding restores the round start and the round can be replayed"""
+    rng = random.Random(8)
+    game = BlackjackEngine(8, 2)
+    shoe = build_shoe(8, rng)
+    play_events(game, shoe, 40, rng)
+
+    game.start_round()
+    start = snapshot(game)
+    for card in ['5', '6', 'A', '9', '10']:
+        game.feed_card(card)
+    game.feed_action('d')
+    game.feed_card('2')
+    assert game.rewind_round()
+    assert snapshot(game) == start
+
+    # Undo before the rewound round still works
+    game.undo_last_action()
+    assert game.prompt is None and game.round_number == 40
+    print("✓ Round rewind restores the checkpoint")
+
+
+if __name__ == "__main__":
+    test_undo_restores_every_event()
+    test_undo_removes_last_card_dealt()
+    test_rewind_round()
+    print("\n🎉 Undo tests passed!")